@@ -1,10 +1,20 @@
 import os
-from dotenv import load_dotenv
 
+_loaded = False
 
- 
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-PANTRY_ID = os.getenv("PANTRY_ID")
 
-print("configuration package loaded successfully")
\ No newline at end of file
+def init():
+    """Load the .env file once; safe to call repeatedly."""
+    global _loaded
+    if not _loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _loaded = True
+
+
+def __getattr__(name):
+    # Settings are read on first access, so importing the package has no side effects
+    if name in ("OPENAI_API_KEY", "PANTRY_ID"):
+        init()
+        return os.getenv(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
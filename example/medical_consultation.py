@@ -1,5 +1,6 @@
 import sys
 import os
+import asyncio
 from datetime import datetime
 
 
@@ -63,23 +64,25 @@ def main():
     try:
         # Initialize medical advisor
         print("\nInitializing medical advisor system...")
-        advisor = medical_advisor.Advisor(api_key)
+        advisor = medical_advisor.AsyncAdvisor(api_key)
         
         # Example consultation
         symptoms = "Fever of 38.5°C, persistent dry cough, and fatigue for 3 days"
         print(f"\nAnalyzing symptoms: {symptoms}")
         print("=" * 80)
         
-        # Get medical analysis
-        analysis = advisor.analyze_symptoms(symptoms)
+        # Run the medical analysis and treatment planning concurrently
+        print("\nGenerating analysis and treatment plan...")
+        consultation = asyncio.run(
+            advisor.consult(symptoms, "Upper respiratory infection", "standard")
+        )
+        analysis = consultation["analysis"]
+        plan = consultation["treatment_plan"]
+        
         print("\nMedical Analysis:")
         print("=" * 80)
         print(analysis["analysis"])
         
-        # Get treatment plan
-        print("\nGenerating treatment plan...")
-        plan = advisor.get_treatment_plan("Upper respiratory infection", "standard")
-        
         # Print service recommendations
         print_services(plan["available_services"])
         
@@ -8,6 +8,7 @@ import src
 from notes.basket_manager import add_to_basket_async, load_user_basket, edit_illness_async, delete_illness_async
 
 from src import medical_advisor
+from src.medical_advisor.tracing import tracer
 
 # Load environment variables from the .env file
 dotenv_path = Path(".env")
@@ -78,38 +79,45 @@ if page == "Consultation":
         symptoms = st.text_area("Enter symptoms:", "Headache, burning sensation when urinating, sores on the penis")
 
         if st.button("Analyze Symptoms"):
-            # Initialize medical advisor
-            st.write("\nInitializing medical advisor system...")
-            advisor = medical_advisor.Advisor(api_key)
-
-            # Get medical analysis
-            analysis = advisor.analyze_symptoms(symptoms)
-            st.write("\n### Medical Analysis:")
-            st.write("=" * 80)
-            st.write(analysis["analysis"])
-
-            # Get treatment plan
-            st.write("\nGenerating treatment plan...")
-            plan = advisor.get_treatment_plan("STI", "standard")
-
-            # Print service recommendations
-            print_services(plan["available_services"])
-
-            # Print treatment plan
-            st.write("\n### Recommended Treatment Plan:")
-            st.write("=" * 80)
-            st.write(plan["treatment_plan"])
-
-            # Save consultation
-            consultation_data = {
-                "symptoms": symptoms,
-                "analysis": analysis,
-                "treatment_plan": plan,
-                "consultation_date": datetime.now().isoformat(),
-            }
-
-            report_path = advisor.save_consultation(consultation_data)
-            st.write(f"\nDetailed consultation report saved to: {report_path}")
+            # Trace every step of this consultation under one ID
+            with tracer.consultation():
+                # Get the process-wide medical advisor
+                st.write("\nInitializing medical advisor system...")
+                advisor = medical_advisor.get_advisor(api_key)
+
+                # Stream the medical analysis as it is generated
+                st.write("\n### Medical Analysis:")
+                st.write("=" * 80)
+                analysis_stream = advisor.analyze_symptoms_stream(symptoms)
+                st.write_stream(analysis_stream)
+                analysis = analysis_stream.result
+
+                # Get treatment plan
+                st.write("\nGenerating treatment plan...")
+                plan_stream = advisor.get_treatment_plan_stream("STI", "standard")
+                if "error" in plan_stream.result:
+                    st.error(plan_stream.result["error"])
+                    st.stop()
+
+                # Print service recommendations
+                print_services(plan_stream.result["available_services"])
+
+                # Stream treatment plan
+                st.write("\n### Recommended Treatment Plan:")
+                st.write("=" * 80)
+                st.write_stream(plan_stream)
+                plan = plan_stream.result
+
+                # Save consultation
+                consultation_data = {
+                    "symptoms": symptoms,
+                    "analysis": analysis,
+                    "treatment_plan": plan,
+                    "consultation_date": datetime.now().isoformat(),
+                }
+
+                report_path = advisor.save_consultation(consultation_data)
+                st.write(f"\nDetailed consultation report saved to: {report_path}")
 
     except Exception as e:
         st.error(f"Error during consultation: {str(e)}")
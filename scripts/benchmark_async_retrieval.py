@@ -0,0 +1,142 @@
+"""Script to benchmark the async advisor's retrieval strategies.
+
+AsyncAdvisor sends every category's queries for a condition in one
+collection query, run in a single worker thread, so the embedding function
+is called once per consultation. This script compares that with the
+alternative of one concurrent query per category behind a semaphore. A
+synthetic catalog is embedded with the offline hashed n-gram backend, so
+no API calls are made. ``--embedding-latency-ms`` adds a fixed delay to
+each embedding call to stand in for the round trip to a remote embedding
+API.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "src"))
+
+from medical_advisor.embeddings import HashedNgramEmbeddingFunction
+from medical_advisor.search_priorities import SEARCH_PRIORITIES
+
+DEPARTMENTS = ["LABORATORY", "RADIOLOGY", "PHARMACY", "WARD 1", "ICU", "DENTAL", "E.N.T", "CASUALTY"]
+CATEGORIES = ["diagnostic", "treatment", "monitoring"]
+
+
+class DelayedEmbeddingFunction(HashedNgramEmbeddingFunction):
+    """Hashed n-gram embeddings with a fixed delay per call."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, input):
+        self.calls += 1
+        time.sleep(self.latency)
+        return super().__call__(input)
+
+
+def make_collection(size: int, embedding_func):
+    """Ephemeral Chroma collection of service-like documents."""
+    import chromadb
+
+    phrases = [query for priorities in SEARCH_PRIORITIES.values()
+               for queries in priorities.values() for query in queries]
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(
+        name=f"async_bench_{uuid.uuid4().hex[:8]}", embedding_function=embedding_func
+    )
+    for start in range(0, size, 1000):
+        ids = [f"service_{i}" for i in range(start, min(size, start + 1000))]
+        collection.add(
+            ids=ids,
+            documents=[
+                f"Medical service: {phrases[i % len(phrases)]} {i}\n"
+                f"Department: {DEPARTMENTS[i % len(DEPARTMENTS)]}\nService code: SVC{i:06d}"
+                for i in range(start, start + len(ids))
+            ],
+            metadatas=[{"department": DEPARTMENTS[i % len(DEPARTMENTS)]} for i in range(start, start + len(ids))]
+        )
+    return collection
+
+
+async def batched(collection, queries_by_category, n_results):
+    """One query for all categories in one worker thread, as AsyncAdvisor does."""
+    queries = [query for queries in queries_by_category.values() for query in queries]
+    return await asyncio.to_thread(collection.query, query_texts=queries, n_results=n_results,
+                                   include=["metadatas"])
+
+
+async def per_category(collection, queries_by_category, n_results, semaphore):
+    """One concurrent query per category, at most ``semaphore`` at a time."""
+    async def run(queries):
+        async with semaphore:
+            return await asyncio.to_thread(collection.query, query_texts=queries, n_results=n_results,
+                                           include=["metadatas"])
+
+    return await asyncio.gather(*(run(queries) for queries in queries_by_category.values()))
+
+
+async def time_strategy(strategy, consultations, repeats):
+    """Per-consultation latencies in seconds."""
+    latencies = []
+    for _ in range(repeats):
+        for queries_by_category in consultations:
+            start = time.perf_counter()
+            await strategy(queries_by_category)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(args):
+    embedding_func = DelayedEmbeddingFunction(args.embedding_latency_ms / 1000)
+    collection = make_collection(args.size, embedding_func)
+    consultations = [
+        {category: priorities[category] for category in CATEGORIES}
+        for priorities in SEARCH_PRIORITIES.values()
+    ]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    strategies = {
+        "batched": lambda queries: batched(collection, queries, args.n_results),
+        f"per-category (x{args.concurrency})": lambda queries: per_category(
+            collection, queries, args.n_results, semaphore
+        ),
+    }
+
+    # Warm up the index before timing
+    await strategies["batched"](consultations[0])
+
+    print(f"{args.size} services, {len(consultations)} condition types, {args.repeats} runs each, "
+          f"{args.embedding_latency_ms:g} ms per embedding call\n")
+    print(f"{'strategy':<22}{'p50 ms':>9}{'p95 ms':>9}{'mean ms':>9}{'embeds':>8}")
+    for name, strategy in strategies.items():
+        embedding_func.calls = 0
+        latencies = await time_strategy(strategy, consultations, args.repeats)
+        print(
+            f"{name:<22}{np.percentile(latencies, 50) * 1000:>9.2f}{np.percentile(latencies, 95) * 1000:>9.2f}"
+            f"{np.mean(latencies) * 1000:>9.2f}{embedding_func.calls / len(latencies):>8.1f}"
+        )
+    print("\nLatencies are per consultation; 'embeds' is embedding calls per consultation.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched against per-category async retrieval")
+    parser.add_argument("--size", type=int, default=5000, help="services in the synthetic catalog")
+    parser.add_argument("--n-results", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=3, help="per-category queries in flight at once")
+    parser.add_argument("--embedding-latency-ms", type=float, default=50.0,
+                        help="delay added to each embedding call; 0 for local embeddings only")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Script to benchmark service retrieval quality and latency.
+
+Each labelled condition in data/benchmarks/retrieval_cases.json is run
+through the advisor's retrieval and scoring path under every requested
+retrieval configuration. The script reports consultation latency
+(p50/p95/p99), Chroma queries per consultation and recall@k / nDCG@k of
+the recommended service codes against the expected ones, and writes the
+results as JSON so runs can be compared with ``--compare``.
+
+Conditions are classified with their labelled type unless ``--classify``
+is given. The recommendation cache is bypassed so every consultation hits
+the index.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "src"))
+
+from medical_advisor.config import HYBRID_LEXICAL_RESULTS, REPORTS_DIR, RRF_K, SERVICE_QUERY_RESULTS
+from medical_advisor.lexical_index import HybridRetriever
+
+DEFAULT_CASES = project_root / "data" / "benchmarks" / "retrieval_cases.json"
+
+# Retrieval configurations that can be benchmarked
+CONFIGURATIONS = {
+    "vector": {"index": "chroma", "hybrid": False},
+    "hybrid": {"index": "chroma", "hybrid": True},
+    "memory": {"index": "memory", "hybrid": False},
+    "memory+hybrid": {"index": "memory", "hybrid": True},
+}
+
+
+class CountingCollection:
+    """Collection wrapper that counts vector queries and the texts they embed."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.queries = 0
+        self.query_texts = 0
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def query(self, query_texts=None, **kwargs):
+        self.queries += 1
+        self.query_texts += len(query_texts or kwargs.get("query_embeddings") or [])
+        return self.collection.query(query_texts=query_texts, **kwargs)
+
+
+def normalize_code(code: str) -> str:
+    """Service codes are compared ignoring case and whitespace."""
+    return "".join(str(code).split()).upper()
+
+
+def ranked_codes(results: dict) -> list:
+    """Unique recommended service codes, in the order they are presented."""
+    codes = []
+    for service in results.get("services", []):
+        code = normalize_code(service["code"])
+        if code not in codes:
+            codes.append(code)
+    return codes
+
+
+def recall_at_k(ranked: list, relevant: set, k: int) -> float:
+    return len(set(ranked[:k]) & relevant) / len(relevant) if relevant else 0.0
+
+
+def ndcg_at_k(ranked: list, relevant: set, k: int) -> float:
+    """Binary-relevance nDCG of the top ``k`` codes."""
+    dcg = sum(1.0 / math.log2(rank + 2) for rank, code in enumerate(ranked[:k]) if code in relevant)
+    ideal = sum(1.0 / math.log2(rank + 2) for rank in range(min(k, len(relevant))))
+    return dcg / ideal if ideal else 0.0
+
+
+def percentiles_ms(samples: list) -> dict:
+    samples_ms = np.asarray(samples) * 1000
+    return {
+        "p50": float(np.percentile(samples_ms, 50)),
+        "p95": float(np.percentile(samples_ms, 95)),
+        "p99": float(np.percentile(samples_ms, 99)),
+        "mean": float(samples_ms.mean())
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def build_collection(manager, collection, settings: dict):
+    """Wrap the base collection for a configuration; returns (collection, counter)."""
+    if settings["index"] == "memory":
+        collection = manager.get_memory_index(collection)
+    counter = CountingCollection(collection)
+    if not settings["hybrid"]:
+        return counter, counter
+    if manager.lexical_index is None:
+        raise RuntimeError("Hybrid retrieval needs the SQLite FTS5 lexical index")
+    retriever = HybridRetriever(
+        counter,
+        manager.lexical_index,
+        vector_results=settings["n_results"],
+        lexical_results=HYBRID_LEXICAL_RESULTS,
+        rrf_k=RRF_K
+    )
+    return retriever, counter
+
+
+def run_configuration(advisor, manager, chroma_collection, name: str, settings: dict, cases: list, args):
+    """Run every case under one configuration and collect latency and quality."""
+    collection, counter = build_collection(manager, chroma_collection, settings)
+    advisor.collection = collection
+    advisor.n_results = settings["n_results"]
+    k_values = args.k
+
+    def consult(case):
+        with contextlib.redirect_stdout(io.StringIO()):
+            if args.classify:
+                condition_type = advisor._classify_condition(case["condition"])
+            else:
+                condition_type = case["condition_type"]
+            return advisor._build_recommendations(condition_type, case["condition"], args.budget_level)
+
+    for _ in range(args.warmup):
+        for case in cases:
+            consult(case)
+
+    counter.queries = counter.query_texts = 0
+    latencies = []
+    case_results = []
+    for case in cases:
+        relevant = {normalize_code(code) for code in case["expected_codes"]}
+        results = None
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            results = consult(case)
+            latencies.append(time.perf_counter() - start)
+
+        ranked = ranked_codes(results)
+        case_results.append({
+            "condition": case["condition"],
+            "condition_type": case["condition_type"],
+            "recall": {str(k): recall_at_k(ranked, relevant, k) for k in k_values},
+            "ndcg": {str(k): ndcg_at_k(ranked, relevant, k) for k in k_values},
+            "retrieved": ranked[:max(k_values)],
+            "missed": sorted(relevant - set(ranked))
+        })
+
+    consultations = len(cases) * args.repeats
+    return {
+        "name": name,
+        "settings": settings,
+        "consultations": consultations,
+        "latency_ms": percentiles_ms(latencies),
+        "chroma_queries_per_consultation": counter.queries / consultations,
+        "query_texts_per_consultation": counter.query_texts / consultations,
+        "recall": {str(k): float(np.mean([c["recall"][str(k)] for c in case_results])) for k in k_values},
+        "ndcg": {str(k): float(np.mean([c["ndcg"][str(k)] for c in case_results])) for k in k_values},
+        "cases": case_results
+    }
+
+
+def print_results(results: list, k_values: list):
+    header = f"{'configuration':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'texts':>7}"
+    header += "".join(f"{f'R@{k}':>8}" for k in k_values) + "".join(f"{f'nDCG@{k}':>9}" for k in k_values)
+    print(header)
+    for r in results:
+        latency = r["latency_ms"]
+        print(
+            f"{r['name']:<22}{latency['p50']:>9.2f}{latency['p95']:>9.2f}{latency['p99']:>9.2f}"
+            f"{r['chroma_queries_per_consultation']:>9.2f}{r['query_texts_per_consultation']:>7.1f}"
+            + "".join(f"{r['recall'][str(k)]:>8.3f}" for k in k_values)
+            + "".join(f"{r['ndcg'][str(k)]:>9.3f}" for k in k_values)
+        )
+
+
+def print_comparison(results: list, previous_path: str, k_values: list):
+    """Print changes against a previous run, for configurations present in both."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {r["name"]: r for r in json.load(f)["configurations"]}
+
+    print(f"\nChange against {previous_path}:")
+    for r in results:
+        before = previous.get(r["name"])
+        if before is None:
+            print(f"{r['name']:<22}not in previous run")
+            continue
+        changes = [
+            f"p50 {r['latency_ms']['p50'] - before['latency_ms']['p50']:+.2f}ms",
+            f"p95 {r['latency_ms']['p95'] - before['latency_ms']['p95']:+.2f}ms",
+            f"queries {r['chroma_queries_per_consultation'] - before['chroma_queries_per_consultation']:+.2f}"
+        ]
+        for k in k_values:
+            if str(k) in before["recall"]:
+                changes.append(f"R@{k} {r['recall'][str(k)] - before['recall'][str(k)]:+.3f}")
+                changes.append(f"nDCG@{k} {r['ndcg'][str(k)] - before['ndcg'][str(k)]:+.3f}")
+        print(f"{r['name']:<22}" + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark service retrieval latency and quality")
+    parser.add_argument("--cases", default=str(DEFAULT_CASES), help="labelled cases JSON")
+    parser.add_argument("--configs", default="vector,hybrid",
+                        help=f"comma-separated configurations from: {', '.join(CONFIGURATIONS)}")
+    parser.add_argument("--n-results", default=str(SERVICE_QUERY_RESULTS),
+                        help="comma-separated results per search query")
+    parser.add_argument("--k", default="5,10,20", help="comma-separated k values for recall@k and nDCG@k")
+    parser.add_argument("--budget-level", default="advanced", choices=("basic", "standard", "advanced"),
+                        help="budget level filter applied to retrieval")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed passes over all cases first")
+    parser.add_argument("--classify", action="store_true",
+                        help="classify conditions with the advisor instead of using the labelled type")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint, e.g. a replaying OpenAIStandIn")
+    parser.add_argument("--output", help="results JSON (default: reports/benchmarks/retrieval_<time>.json)")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args()
+    args.k = [int(k) for k in args.k.split(",")]
+
+    names = args.configs.split(",")
+    unknown = [name for name in names if name not in CONFIGURATIONS]
+    if unknown:
+        print(f"Error: unknown configurations {unknown}. Choose from {', '.join(CONFIGURATIONS)}")
+        return
+
+    with open(args.cases, encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+
+    env_path = project_root / "config" / ".env"
+    load_dotenv(env_path)
+    # A placeholder key is enough when nothing is sent to OpenAI
+    api_key = os.getenv("OPENAI_API_KEY") or "offline"
+
+    from medical_advisor.advisor import Advisor
+    from medical_advisor.services import ServiceManager
+
+    manager = ServiceManager(api_key, base_url=args.base_url)
+    advisor = Advisor(api_key, service_manager=manager, base_url=args.base_url)
+    chroma_collection = manager.chroma_client.get_collection(
+        name=manager.live_collection_name(), embedding_function=manager.embedding_func
+    )
+    # Bring the lexical index up to date before any hybrid configuration runs
+    manager.get_retriever(chroma_collection)
+
+    print(f"{len(cases)} cases, {args.repeats} timed runs each, "
+          f"{manager.embedding_backend} embeddings ({manager.embedding_func.model_name})\n")
+
+    results = []
+    for name in names:
+        for n_results in (int(n) for n in args.n_results.split(",")):
+            settings = {**CONFIGURATIONS[name], "n_results": n_results}
+            label = f"{name}/n{n_results}"
+            try:
+                results.append(run_configuration(advisor, manager, chroma_collection, label, settings, cases, args))
+            except Exception as e:
+                print(f"Error benchmarking {label}: {e}")
+    print_results(results, args.k)
+
+    output = Path(args.output) if args.output else (
+        REPORTS_DIR / "benchmarks" / f"retrieval_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "created": datetime.now().isoformat(),
+            "git_commit": git_commit(),
+            "cases_file": str(args.cases),
+            "cases": len(cases),
+            "embedding_backend": manager.embedding_backend,
+            "embedding_model": manager.embedding_func.model_name,
+            "catalog_version": manager.get_catalog_version(chroma_collection),
+            "budget_level": args.budget_level,
+            "classified": args.classify,
+            "repeats": args.repeats,
+            "k": args.k,
+            "configurations": results
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        print_comparison(results, args.compare, args.k)
+
+    advisor.close()
+    manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Script to benchmark the in-memory vector index against Chroma.
+
+Random unit vectors stand in for service embeddings, so no API calls are
+made. For each catalog size both indexes answer the same batches of
+queries; the script reports open time, query latency and the recall of
+Chroma's approximate results against the exact in-memory ones.
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "src"))
+
+from medical_advisor.vector_index import InMemoryServiceIndex, write_snapshot
+
+DEPARTMENTS = ["LABORATORY", "RADIOLOGY", "PHARMACY", "WARD 1", "ICU", "DENTAL", "E.N.T", "CASUALTY"]
+
+
+def make_catalog(size: int, dimension: int, rng: np.random.Generator):
+    """Random embeddings and service-like metadata."""
+    embeddings = rng.standard_normal((size, dimension), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    ids = [f"service_{i}" for i in range(size)]
+    prices = rng.integers(50, 50000, size)
+    metadatas = [
+        {
+            "code": f"SVC{i:06d}",
+            "description": f"Service {i}",
+            "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+            "price": float(prices[i])
+        }
+        for i in range(size)
+    ]
+    return ids, embeddings, metadatas
+
+
+def percentile_ms(samples, pct):
+    return float(np.percentile(samples, pct)) * 1000
+
+
+def time_queries(query_fn, batches):
+    """Run each batch once and return per-batch latencies in seconds."""
+    latencies = []
+    for batch in batches:
+        start = time.perf_counter()
+        query_fn(batch)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def benchmark_size(size: int, args, rng: np.random.Generator):
+    import chromadb
+
+    ids, embeddings, metadatas = make_catalog(size, args.dimension, rng)
+    batches = [
+        rng.standard_normal((args.batch_size, args.dimension), dtype=np.float32)
+        for _ in range(args.batches)
+    ]
+    where = {"department": "LABORATORY"}
+    work_dir = Path(tempfile.mkdtemp(prefix="vector_index_bench_"))
+
+    try:
+        # In-memory index from a snapshot
+        write_snapshot(work_dir / "snapshot", ids, embeddings, metadatas, {})
+        start = time.perf_counter()
+        index = InMemoryServiceIndex.from_snapshot(work_dir / "snapshot")
+        memory_open = time.perf_counter() - start
+        memory_query = lambda batch, **kw: index.query(
+            query_embeddings=batch, n_results=args.n_results, include=["metadatas"], **kw
+        )
+
+        # Chroma collection with the same embeddings
+        client = chromadb.PersistentClient(path=str(work_dir / "chroma"))
+        collection = client.create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+        max_batch = client.get_max_batch_size() if hasattr(client, "get_max_batch_size") else 5000
+        start = time.perf_counter()
+        for i in range(0, size, max_batch):
+            collection.add(
+                ids=ids[i:i + max_batch],
+                embeddings=embeddings[i:i + max_batch],
+                metadatas=metadatas[i:i + max_batch]
+            )
+        chroma_build = time.perf_counter() - start
+        chroma_query = lambda batch, **kw: collection.query(
+            query_embeddings=batch, n_results=args.n_results, include=["metadatas"], **kw
+        )
+        chroma_query(batches[0])  # load the HNSW index before timing
+
+        results = {"size": size, "memory_open_ms": memory_open * 1000, "chroma_build_s": chroma_build}
+        for label, kwargs in (("all", {}), ("filtered", {"where": where})):
+            for name, query_fn in (("memory", memory_query), ("chroma", chroma_query)):
+                latencies = time_queries(lambda batch: query_fn(batch, **kwargs), batches)
+                results[f"{name}_{label}_p50_ms"] = percentile_ms(latencies, 50)
+                results[f"{name}_{label}_p95_ms"] = percentile_ms(latencies, 95)
+
+        # Recall of Chroma's approximate neighbours against exact search
+        hits = 0
+        total = 0
+        for batch in batches:
+            exact = memory_query(batch)["ids"]
+            approx = chroma_query(batch)["ids"]
+            for exact_ids, approx_ids in zip(exact, approx):
+                hits += len(set(exact_ids) & set(approx_ids))
+                total += len(exact_ids)
+        results["chroma_recall"] = hits / total if total else 0.0
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark InMemoryServiceIndex against Chroma")
+    parser.add_argument("--sizes", default="5000,50000,500000", help="comma-separated catalog sizes")
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--batch-size", type=int, default=21, help="queries per batch (one consultation)")
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--n-results", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"Dimension {args.dimension}, {args.batches} batches of {args.batch_size} queries, top {args.n_results}")
+    header = (f"{'rows':>8}{'open ms':>9}{'mem p50':>9}{'mem p95':>9}{'chr p50':>9}{'chr p95':>9}"
+              f"{'mem flt':>9}{'chr flt':>9}{'recall':>8}{'build s':>9}")
+    print(header)
+    for size in (int(s) for s in args.sizes.split(",")):
+        try:
+            r = benchmark_size(size, args, rng)
+        except MemoryError:
+            print(f"{size:>8}  out of memory")
+            continue
+        print(
+            f"{r['size']:>8}{r['memory_open_ms']:>9.1f}"
+            f"{r['memory_all_p50_ms']:>9.2f}{r['memory_all_p95_ms']:>9.2f}"
+            f"{r['chroma_all_p50_ms']:>9.2f}{r['chroma_all_p95_ms']:>9.2f}"
+            f"{r['memory_filtered_p50_ms']:>9.2f}{r['chroma_filtered_p50_ms']:>9.2f}"
+            f"{r['chroma_recall']:>8.3f}{r['chroma_build_s']:>9.1f}"
+        )
+    print("\nLatencies are per batch; 'flt' columns use a department where filter.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Script to check that package imports stay within the import-time budget.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` and
+its cumulative import time is compared against the budget. Exits non-zero
+if any module is over budget.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "src"))
+
+from medical_advisor.config import IMPORT_TIME_BUDGET_MS
+
+DEFAULT_MODULES = [
+    "medical_advisor",
+    "medical_advisor.config",
+    "medical_advisor.service_priority",
+    "medical_advisor.advisor",
+    "config"
+]
+
+
+def measure_import(module: str = None):
+    """Import ``module`` in a subprocess and return per-module cumulative times in ms.
+
+    With no module, only the interpreter's own startup imports are measured.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(project_root / "src"), str(project_root)])
+    code = f"import {module}" if module else "pass"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(project_root), env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative) / 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check package import times")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to show per module")
+    args = parser.parse_args()
+
+    # Modules loaded at interpreter startup (site, .pth hooks) are not ours
+    startup = set(measure_import())
+
+    over_budget = []
+    for module in args.modules:
+        try:
+            timings = measure_import(module)
+        except Exception as e:
+            print(f"{module}: import failed: {e}")
+            over_budget.append(module)
+            continue
+
+        total = timings.get(module, 0.0)
+        status = "OK" if total <= args.budget_ms else "OVER BUDGET"
+        print(f"\n{module}: {total:.1f} ms (budget {args.budget_ms:.0f} ms) {status}")
+        slowest = sorted(
+            ((name, ms) for name, ms in timings.items() if name != module and name not in startup),
+            key=lambda item: item[1], reverse=True
+        )[:args.top]
+        for name, ms in slowest:
+            print(f"  {ms:8.1f} ms  {name}")
+
+        if total > args.budget_ms:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"\nImport-time budget exceeded by: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("\nAll imports within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Script to measure recall and memory of compressed embedding snapshots.
+
+Each compression variant (float16, int8, PCA + dtype) is compared against
+the full-precision index. It reports the storage size, batch query latency
+and recall@k of the variant's top-k against the exact float32 top-k.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "src"))
+
+from medical_advisor.compression import EmbeddingCodec
+from medical_advisor.vector_index import InMemoryServiceIndex
+
+DEFAULT_VARIANTS = "float16,int8,pca256,pca256+float16,pca256+int8,pca128+int8"
+
+
+def parse_variant(variant: str) -> EmbeddingCodec:
+    """Build a codec from names like 'int8', 'pca256' or 'pca256+int8'."""
+    dtype = "float32"
+    pca_dimension = None
+    for part in variant.split("+"):
+        if part.startswith("pca"):
+            pca_dimension = int(part[3:])
+        else:
+            dtype = part
+    return EmbeddingCodec(dtype, pca_dimension)
+
+
+def load_catalog(args):
+    """Full-precision embeddings and IDs, from a snapshot or the live collection."""
+    if args.snapshot:
+        index = InMemoryServiceIndex.from_snapshot(args.snapshot, mmap=False)
+        if index.codec.info() != {"dtype": "float32", "pca_dimension": None}:
+            raise ValueError("Evaluate against an uncompressed snapshot")
+        return index.ids, np.asarray(index.embeddings), None
+
+    from medical_advisor.services import ServiceManager
+
+    load_dotenv(project_root / "config" / ".env")
+    manager = ServiceManager(os.getenv("OPENAI_API_KEY"))
+    collection = manager.chroma_client.get_collection(
+        name=manager.live_collection_name(), embedding_function=manager.embedding_func
+    )
+    data = collection.get(include=["embeddings"])
+    return data["ids"], np.asarray(data["embeddings"], dtype=np.float32), manager.embedding_func
+
+
+def query_sets(embeddings: np.ndarray, embedding_func, args, rng: np.random.Generator):
+    """Catalog rows with noise added, plus the advisor's search queries if they can be embedded."""
+    sample = embeddings[rng.choice(len(embeddings), min(args.queries, len(embeddings)), replace=False)]
+    noisy = sample + rng.standard_normal(sample.shape).astype(np.float32) * args.noise / np.sqrt(sample.shape[1])
+    sets = {"catalog": noisy}
+
+    if embedding_func is not None and not args.offline:
+        from medical_advisor.search_priorities import SEARCH_PRIORITIES
+        texts = list(dict.fromkeys(
+            query for categories in SEARCH_PRIORITIES.values()
+            for queries in categories.values() for query in queries
+        ))
+        sets["search"] = np.asarray(embedding_func(texts), dtype=np.float32)
+    return sets
+
+
+def evaluate(index: InMemoryServiceIndex, queries: np.ndarray, exact_ids, k_values, batch_size: int):
+    """Recall@k against ``exact_ids`` and per-batch latency."""
+    k_max = max(k_values)
+    latencies = []
+    found = []
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        began = time.perf_counter()
+        found.extend(index.query(query_embeddings=batch, n_results=k_max, include=[])["ids"])
+        latencies.append(time.perf_counter() - began)
+
+    recall = {}
+    for k in k_values:
+        hits = sum(len(set(a[:k]) & set(e[:k])) for a, e in zip(found, exact_ids))
+        recall[k] = hits / (k * len(exact_ids))
+    return recall, float(np.median(latencies)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate compressed embedding storage")
+    parser.add_argument("--snapshot", help="uncompressed snapshot directory (default: the live collection)")
+    parser.add_argument("--variants", default=DEFAULT_VARIANTS)
+    parser.add_argument("--k", default="3,10", help="comma-separated k values for recall@k")
+    parser.add_argument("--queries", type=int, default=500, help="catalog rows sampled as queries")
+    parser.add_argument("--noise", type=float, default=0.5, help="noise added to sampled rows")
+    parser.add_argument("--batch-size", type=int, default=21)
+    parser.add_argument("--offline", action="store_true", help="skip embedding the search queries")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    k_values = [int(k) for k in args.k.split(",")]
+    ids, embeddings, embedding_func = load_catalog(args)
+    print(f"Catalog: {len(ids)} services, {embeddings.shape[1]} dimensions")
+
+    baseline_codec = EmbeddingCodec()
+    baseline = InMemoryServiceIndex(baseline_codec.fit_encode(embeddings), ids, {}, codec=baseline_codec)
+    baseline_bytes = baseline.embeddings.nbytes
+
+    results = []
+    for set_name, queries in query_sets(embeddings, embedding_func, args, rng).items():
+        exact_ids = []
+        for start in range(0, len(queries), args.batch_size):
+            exact_ids.extend(baseline.query(
+                query_embeddings=queries[start:start + args.batch_size], n_results=max(k_values), include=[]
+            )["ids"])
+        _, baseline_ms = evaluate(baseline, queries, exact_ids, k_values, args.batch_size)
+
+        print(f"\nQueries: {set_name} ({len(queries)})")
+        print(f"{'variant':<18}{'MB':>8}{'ratio':>7}{'p50 ms':>9}" + "".join(f"{f'R@{k}':>8}" for k in k_values))
+        print(f"{'float32':<18}{baseline_bytes / 1e6:>8.2f}{1.0:>7.1f}{baseline_ms:>9.2f}"
+              + "".join(f"{1.0:>8.3f}" for _ in k_values))
+
+        for variant in args.variants.split(","):
+            codec = parse_variant(variant)
+            matrix = codec.fit_encode(embeddings)
+            index = InMemoryServiceIndex(matrix, ids, {}, codec=codec)
+            stored_bytes = matrix.nbytes + sum(
+                a.nbytes for a in (codec.mean, codec.components, codec.scales) if a is not None
+            )
+            recall, latency_ms = evaluate(index, queries, exact_ids, k_values, args.batch_size)
+            print(f"{variant:<18}{stored_bytes / 1e6:>8.2f}{baseline_bytes / stored_bytes:>7.1f}{latency_ms:>9.2f}"
+                  + "".join(f"{recall[k]:>8.3f}" for k in k_values))
+            results.append({
+                "queries": set_name,
+                "variant": variant,
+                "bytes": int(stored_bytes),
+                "compression_ratio": baseline_bytes / stored_bytes,
+                "p50_batch_ms": latency_ms,
+                "baseline_p50_batch_ms": baseline_ms,
+                "recall": {str(k): v for k, v in recall.items()}
+            })
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
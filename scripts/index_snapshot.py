@@ -0,0 +1,61 @@
+"""Script to export the live services collection to a snapshot, or import one.
+
+A snapshot directory holds the embeddings as a memory-mappable .npy
+array, IDs and metadata as columnar JSON, the documents, and an info file
+with the embedding model, catalog version and file checksums. Copy it to
+another node and import it there to provision that node without calling
+the embedding API:
+
+    python scripts/index_snapshot.py export snapshots/catalog
+    python scripts/index_snapshot.py import snapshots/catalog
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "src"))
+
+from medical_advisor.services import ServiceManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import a services index snapshot")
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument("path", help="snapshot directory")
+    args = parser.parse_args()
+
+    env_path = project_root / "config" / ".env"
+    load_dotenv(env_path)
+    # Stored embeddings are copied as they are, so no real key is needed
+    api_key = os.getenv("OPENAI_API_KEY") or "offline"
+
+    manager = ServiceManager(api_key)
+    try:
+        if args.command == "export":
+            name = manager.live_collection_name()
+            try:
+                collection = manager.chroma_client.get_collection(name=name)
+            except Exception:  # ValueError, or NotFoundError on newer Chroma
+                print(f"Error: collection {name} not found; load services first")
+                sys.exit(1)
+            # Full precision and dimension, so the snapshot can be imported into Chroma
+            manager.export_snapshot(collection, Path(args.path), portable=True)
+            print(f"Catalog {manager.get_catalog_version(collection)}, "
+                  f"{(collection.metadata or {}).get('embedding_model')} embeddings")
+        else:
+            num_services = manager.import_snapshot(Path(args.path))
+            print(f"\nSuccess! {num_services} medical services are live.")
+    except Exception as e:
+        print(f"\nError: {str(e)}")
+        sys.exit(1)
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Script to run the local OpenAI stand-in.
+
+Record a cassette against the real API:
+
+    python scripts/openai_standin.py --mode record
+
+then replay it offline, with synthetic latency:
+
+    python scripts/openai_standin.py --mode replay --latency-ms 400 --token-latency-ms 15
+
+Point the advisors at it with ``OPENAI_BASE_URL=http://127.0.0.1:8765/v1``
+or by passing ``base_url`` to Advisor, ChromaMedicalAdvisor or ServiceManager.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "src"))
+
+from medical_advisor.config import STANDIN_CASSETTE, STANDIN_PORT
+from medical_advisor.openai_standin import STANDIN_MODES, Cassette, OpenAIStandIn
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded OpenAI responses locally")
+    parser.add_argument("--mode", choices=STANDIN_MODES, default="replay")
+    parser.add_argument("--cassette", default=str(STANDIN_CASSETTE))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=STANDIN_PORT)
+    parser.add_argument("--upstream", default="https://api.openai.com/v1", help="API recorded from")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra latency, up to this much")
+    parser.add_argument("--token-latency-ms", type=float, default=0.0, help="per completion token")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the latency jitter")
+    args = parser.parse_args()
+    
+    api_key = None
+    if args.mode == "record":
+        env_path = project_root / "config" / ".env"
+        load_dotenv(env_path)
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            print(f"Error: OPENAI_API_KEY not found in {env_path}; record mode calls the real API")
+            return
+    
+    cassette = Cassette(args.cassette)
+    standin = OpenAIStandIn(
+        cassette,
+        mode=args.mode,
+        api_key=api_key,
+        upstream_url=args.upstream,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        token_latency_ms=args.token_latency_ms,
+        seed=args.seed
+    )
+    print(f"OpenAI stand-in ({args.mode}) serving {len(cassette)} recorded responses from {args.cassette}")
+    print(f"Set OPENAI_BASE_URL={standin.base_url}")
+    
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+        print(f"\nStats: {standin.stats}")
+        if args.mode == "record":
+            print(f"Cassette saved to {args.cassette} ({len(cassette)} responses)")
+
+if __name__ == "__main__":
+    main()
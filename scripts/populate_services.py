@@ -1,5 +1,6 @@
 """Script to populate medical services database."""
 
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -10,28 +11,67 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root / "src"))
 
 from medical_advisor.services import ServiceManager
+from medical_advisor.config import EMBEDDING_BACKEND, INGEST_CONCURRENCY, INGEST_TOKENS_PER_MINUTE
+from medical_advisor.embeddings import EMBEDDING_BACKENDS
 
 def main():
+    parser = argparse.ArgumentParser(description="Populate the medical services collection")
+    parser.add_argument("--embedding-backend", choices=EMBEDDING_BACKENDS,
+                        help="embeddings used for the rebuilt collection (hashed_ngram runs offline); "
+                             f"defaults to {EMBEDDING_BACKEND}, or the collection's backend with --incremental")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only write new, changed and removed services instead of rebuilding")
+    parser.add_argument("--reembed", action="store_true",
+                        help="re-embed the live collection with --embedding-backend, without downtime")
+    parser.add_argument("--rollback", action="store_true",
+                        help="point readers back at the previous collection version")
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY,
+                        help="embedding batches computed at once")
+    parser.add_argument("--tokens-per-minute", type=int, default=INGEST_TOKENS_PER_MINUTE,
+                        help="OpenAI embedding token rate limit (0 disables it)")
+    args = parser.parse_args()
+    
+    if args.reembed and not args.embedding_backend:
+        print("Error: --reembed needs --embedding-backend")
+        return
+    
+    # Incremental updates, re-embeds and rollbacks start from the existing collection's embeddings
+    if args.reembed or args.rollback or (args.incremental and not args.embedding_backend):
+        backend = None
+    else:
+        backend = args.embedding_backend or EMBEDDING_BACKEND
+    target_backend = args.embedding_backend if args.reembed else backend
+    
     # Load environment variables
     env_path = project_root / "config" / ".env"
-    if not env_path.exists():
-        print(f"Error: .env file not found at {env_path}")
-        return
-        
     load_dotenv(env_path)
     api_key = os.getenv("OPENAI_API_KEY")
     
-    if not api_key:
+    # Local embeddings need no API key, so catalogs can be ingested offline
+    if not api_key and target_backend == "openai":
         print(f"Error: OPENAI_API_KEY not found in {env_path}")
         return
     
     try:
         # Initialize manager and load services
         print("\nInitializing service manager...")
-        manager = ServiceManager(api_key)
+        manager = ServiceManager(api_key, embedding_backend=backend)
+        manager.ingest_concurrency = args.concurrency
+        manager.ingest_tokens_per_minute = args.tokens_per_minute or None
+        print(f"Using {manager.embedding_backend} embeddings")
+        
+        if args.rollback:
+            live = manager.rollback()
+            print(f"\nReaders now use {live}")
+            return
+        
+        if args.reembed:
+            num_services = manager.reembed(args.embedding_backend)
+            print(f"\nSuccess! Re-embedded {num_services} medical services with {args.embedding_backend}.")
+            return
         
         print("\nLoading medical services...")
-        num_services = manager.load_services()
+        num_services = manager.load_services(incremental=args.incremental)
         
         print(f"\nSuccess! Loaded {num_services} medical services into the database.")
         
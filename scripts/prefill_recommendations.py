@@ -0,0 +1,39 @@
+"""Script to prefill the recommendation cache for every known condition type."""
+
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "src"))
+
+from medical_advisor.advisor import Advisor
+
+def main():
+    # Load environment variables
+    env_path = project_root / "config" / ".env"
+    load_dotenv(env_path)
+    api_key = os.getenv("OPENAI_API_KEY")
+    
+    if not api_key:
+        print(f"Error: OPENAI_API_KEY not found in {env_path}")
+        return
+    
+    try:
+        print("\nInitializing medical advisor system...")
+        advisor = Advisor(api_key)
+        
+        print("\nPrefilling recommendation cache...")
+        count = advisor.prefill_recommendations()
+        
+        print(f"\nSuccess! Cached {count} recommendation sets.")
+        
+    except Exception as e:
+        print(f"\nError prefilling recommendations: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
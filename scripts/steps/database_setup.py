@@ -97,15 +97,13 @@ class DatabaseSetup:
             self.logger.error(f"Database setup failed: {str(e)}")
             return False
             
-    def migrate_data(self, conn: sqlite3.Connection, df: pd.DataFrame, collection):
+    def migrate_data(self, conn: sqlite3.Connection, df: pd.DataFrame, collection, batch_size: int = 500):
         """Migrate cleaned data to database"""
         # First, insert departments
-        departments = df['department'].unique()
-        for dept in departments:
-            conn.execute(
-                "INSERT OR IGNORE INTO departments (name) VALUES (?)",
-                (dept,)
-            )
+        conn.executemany(
+            "INSERT OR IGNORE INTO departments (name) VALUES (?)",
+            ((dept,) for dept in df['department'].unique())
+        )
             
         # Get department IDs
         dept_ids = {
@@ -113,33 +111,36 @@ class DatabaseSetup:
             conn.execute("SELECT name, id FROM departments").fetchall()
         }
         
-        # Insert services
-        for _, row in df.iterrows():
-            cursor = conn.execute(
+        # Insert services a batch at a time with explicit IDs, so each batch is
+        # one executemany and one ChromaDB call instead of one call per service
+        next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM services").fetchone()[0]
+        columns = ['department', 'code', 'description', 'normal_rate', 'special_rate', 'non_ea_rate']
+        for start in range(0, len(df), batch_size):
+            batch = df[columns].iloc[start:start + batch_size]
+            rows = [
+                (next_id + offset, dept_ids[department], code, description, normal_rate, special_rate, non_ea_rate)
+                for offset, (department, code, description, normal_rate, special_rate, non_ea_rate)
+                in enumerate(batch.itertuples(index=False, name=None))
+            ]
+            next_id += len(rows)
+            conn.executemany(
                 """
                 INSERT INTO services 
-                (department_id, code, description, normal_rate, special_rate, non_ea_rate)
-                VALUES (?, ?, ?, ?, ?, ?)
+                (id, department_id, code, description, normal_rate, special_rate, non_ea_rate)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    dept_ids[row['department']],
-                    row['code'],
-                    row['description'],
-                    row['normal_rate'],
-                    row['special_rate'],
-                    row['non_ea_rate']
-                )
+                rows
             )
             
             # Add to ChromaDB for semantic search
-            collection.add(
-                documents=[row['description']],
-                metadatas=[{
-                    'code': row['code'],
-                    'department': row['department'],
-                    'normal_rate': str(row['normal_rate'])
-                }],
-                ids=[str(cursor.lastrowid)]
-            )
+            if rows:
+                collection.add(
+                    ids=[str(row[0]) for row in rows],
+                    documents=[row[3] for row in rows],
+                    metadatas=[
+                        {'code': row[2], 'department': department, 'normal_rate': str(row[4])}
+                        for row, department in zip(rows, batch['department'])
+                    ]
+                )
             
         conn.commit()
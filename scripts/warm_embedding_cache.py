@@ -0,0 +1,49 @@
+"""Script to pre-warm the embedding cache with the static search queries."""
+
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add src directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root / "src"))
+
+from medical_advisor.services import ServiceManager
+from medical_advisor.search_priorities import SEARCH_PRIORITIES
+
+def main():
+    # Load environment variables
+    env_path = project_root / "config" / ".env"
+    load_dotenv(env_path)
+    api_key = os.getenv("OPENAI_API_KEY")
+    
+    if not api_key:
+        print(f"Error: OPENAI_API_KEY not found in {env_path}")
+        return
+    
+    try:
+        manager = ServiceManager(api_key)
+        
+        # Collect every query string the advisor can issue
+        queries = []
+        for categories in SEARCH_PRIORITIES.values():
+            for category_queries in categories.values():
+                queries.extend(category_queries)
+        queries = list(dict.fromkeys(queries))
+        
+        before = manager.embedding_cache.count()
+        print(f"\nEmbedding {len(queries)} search queries...")
+        manager.embedding_func(queries)
+        after = manager.embedding_cache.count()
+        
+        print(f"Added {after - before} embeddings to {manager.embedding_cache.path}")
+        print(f"Cache now holds {after} embeddings")
+        
+    except Exception as e:
+        print(f"\nError warming embedding cache: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+if __name__ == "__main__":
+    main()
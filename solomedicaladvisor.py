@@ -13,25 +13,58 @@ import re
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from config import OPENAI_API_KEY
+from src.medical_advisor.collection_alias import CollectionAlias
+from src.medical_advisor.embedding_cache import EmbeddingCache
+from src.medical_advisor.semantic_cache import SemanticCache
+from src.medical_advisor.embeddings import create_embedding_function, embedding_metadata
+from src.medical_advisor.config import (
+    RESPONSE_CACHE_THRESHOLD, RESPONSE_CACHE_THRESHOLDS, RESPONSE_CACHE_TTL, RESPONSE_CACHE_SIZE, EMBEDDING_BACKEND,
+    SERVICES_COLLECTION, COLLECTION_ALIASES_FILE
+)
+from src.medical_advisor.tracing import tracer, traced, usage_attributes
 
 class ChromaMedicalAdvisor:
-    def __init__(self, api_key: str):
-        """Initialize advisor with existing ChromaDB."""
-        self.client = openai.OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, client: openai.OpenAI = None, base_url: str = None):
+        """Initialize advisor with existing ChromaDB.
+        
+        Pass ``client`` or ``base_url`` to talk to another OpenAI-compatible
+        endpoint, such as an OpenAIStandIn.
+        """
+        self.client = client or openai.OpenAI(api_key=api_key, base_url=base_url)
         
         # Connect to existing database
         self.chroma_client = chromadb.PersistentClient(path="./db")
         
-        # Use OpenAI embeddings to match database dimension (1536)
-        self.embedding_func = chromadb.utils.embedding_functions.OpenAIEmbeddingFunction(
+        # Queries must use the embeddings the collection was built with;
+        # OpenAI embeddings are served from the on-disk cache when possible
+        self.embedding_cache = EmbeddingCache(Path("./db") / "embedding_cache.sqlite3")
+        collections = self.chroma_client.list_collections()
+        # Prefer the live version of the services collection
+        live_name = CollectionAlias(Path("./db") / COLLECTION_ALIASES_FILE).resolve(SERVICES_COLLECTION)
+        live = next((c for c in collections if c.name == live_name), collections[0] if collections else None)
+        metadata = (live.metadata or {}) if live else {}
+        self.embedding_backend = metadata.get("embedding_backend", "openai" if collections else EMBEDDING_BACKEND)
+        self.embedding_func = create_embedding_function(
+            self.embedding_backend,
             api_key=api_key,
-            model_name="text-embedding-ada-002"
+            cache=self.embedding_cache,
+            dimension=metadata.get("embedding_dimension"),
+            base_url=base_url
+        )
+        
+        # Serves stored LLM responses for near-identical inputs
+        self.response_cache = SemanticCache(
+            Path("./db") / "response_cache.sqlite3",
+            self.embedding_func,
+            threshold=RESPONSE_CACHE_THRESHOLDS.get(self.embedding_backend, RESPONSE_CACHE_THRESHOLD),
+            ttl_seconds=RESPONSE_CACHE_TTL,
+            max_entries=RESPONSE_CACHE_SIZE,
+            model_name=self.embedding_func.model_name
         )
         
         # Get existing collection
-        collections = self.chroma_client.list_collections()
-        if collections:
-            collection_name = collections[0].name
+        if live:
+            collection_name = live.name
             try:
                 # Try to get existing collection first
                 self.collection = self.chroma_client.get_collection(
@@ -42,14 +75,38 @@ class ChromaMedicalAdvisor:
                 # If it doesn't exist with embedding function, create new
                 self.collection = self.chroma_client.create_collection(
                     name=f"{collection_name}_v2",
-                    embedding_function=self.embedding_func
+                    embedding_function=self.embedding_func,
+                    metadata=embedding_metadata(self.embedding_backend, self.embedding_func)
                 )
             print(f"Connected to database collection: {self.collection.name}")
-            print(f"Using embedding model: text-embedding-ada-002")
+            print(f"Using embedding backend: {self.embedding_backend} ({self.embedding_func.model_name})")
         else:
             print("Warning: No collections found in database")
             self.collection = None
 
+    def _chat(self, purpose: str, messages: List[Dict]) -> str:
+        """Run a chat completion in a tracing span and return its text."""
+        with tracer.span("chat_completion", purpose=purpose, model="gpt-3.5-turbo") as span:
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages
+            )
+            content = response.choices[0].message.content
+            span.set(response_chars=len(content), **usage_attributes(response))
+        return content
+
+    @staticmethod
+    def _prompt_fields(meta: Dict) -> Dict:
+        """Project stored service metadata down to what is shown to the LLM."""
+        fields = {
+            'name': meta.get('code'),
+            'category': meta.get('priority'),
+            'price': meta.get('price'),
+            'department': meta.get('department'),
+            'description': meta.get('description')
+        }
+        return {key: value for key, value in fields.items() if value is not None}
+
     def query_database(self, query: str, n_results: int = 3) -> List[Dict]:
         """Query the existing database for relevant information."""
         if not self.collection:
@@ -59,23 +116,18 @@ class ChromaMedicalAdvisor:
             # Add medical context to query
             medical_query = f"medical condition or treatment: {query}"
             
-            results = self.collection.query(
-                query_texts=[medical_query],
-                n_results=n_results,
-                include=["documents", "metadatas"]
-            )
+            with tracer.span("collection_query", queries=1, n_results=n_results) as span:
+                results = self.collection.query(
+                    query_texts=[medical_query],
+                    n_results=n_results,
+                    include=["metadatas"]
+                )
+                span.set(results=len(results['metadatas'][0]) if results and results['metadatas'] else 0)
             
-            if results and results['documents']:
-                docs = []
-                for doc in results['documents'][0]:
-                    try:
-                        if isinstance(doc, str):
-                            docs.append(json.loads(doc))
-                        else:
-                            docs.append(doc)
-                    except json.JSONDecodeError:
-                        print(f"Skipping invalid document: {doc[:100]}...")
-                return docs
+            # Only the fields the prompts use; hashes, catalog versions and
+            # alternative rates would just spend prompt tokens
+            if results and results['metadatas']:
+                return [self._prompt_fields(meta) for meta in results['metadatas'][0]]
         except Exception as e:
             print(f"Database query failed: {str(e)}")
             return []
@@ -110,8 +162,13 @@ class ChromaMedicalAdvisor:
             'details': service_data
         }
 
+    @traced("relevant_questions")
     def get_relevant_questions(self, condition: str) -> List[str]:
         """Generate relevant questions based on condition."""
+        cached = self.response_cache.get("relevant_questions", condition)
+        if cached is not None:
+            return json.loads(cached)
+        
         # First check database for similar cases
         db_matches = self.query_database(f"symptoms of {condition}")
         db_context = json.dumps(db_matches[:2], indent=2) if db_matches else ""
@@ -123,16 +180,15 @@ class ChromaMedicalAdvisor:
         Focus on: symptoms, duration, severity, medical history, risk factors.
         Return ONLY a JSON array of questions."""
 
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": "Generate questions"}
-            ]
-        )
+        content = self._chat("relevant_questions", [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": "Generate questions"}
+        ])
         
         try:
-            return json.loads(response.choices[0].message.content)
+            questions = json.loads(content)
+            self.response_cache.put("relevant_questions", condition, content)
+            return questions
         except json.JSONDecodeError:
             return [
                 "How long have you been experiencing this symptom?",
@@ -142,8 +198,8 @@ class ChromaMedicalAdvisor:
                 "Are you currently taking any medications?"
             ]
 
-    def analyze_responses(self, condition: str, responses: Dict[str, str]) -> Dict:
-        """Analyze responses and generate assessment."""
+    def _assessment_completion(self, condition: str, responses: Dict[str, str]) -> str:
+        """Ask the LLM for an assessment and return the raw response text."""
         # First check database for similar cases
         db_matches = self.query_database(f"diagnosis for {condition}")
         
@@ -166,16 +222,26 @@ class ChromaMedicalAdvisor:
             "recommended_specialists": ["specialist1", "specialist2"]
         }}"""
 
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a medical advisor focusing on urinary tract and related conditions."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+        return self._chat("assessment", [
+            {"role": "system", "content": "You are a medical advisor focusing on urinary tract and related conditions."},
+            {"role": "user", "content": prompt}
+        ])
+
+    @traced("analyze_responses")
+    def analyze_responses(self, condition: str, responses: Dict[str, str]) -> Dict:
+        """Analyze responses and generate assessment."""
+        # Answers differ by a word or two between patients, so only an
+        # identical condition and questionnaire may reuse an assessment
+        cache_input = condition + "\n" + "\n".join(f"{q} {a}" for q, a in responses.items())
+        content = self.response_cache.get("analyze_responses", cache_input, exact=True)
+        cached = content is not None
+        if not cached:
+            content = self._assessment_completion(condition, responses)
         
         try:
-            assessment = json.loads(response.choices[0].message.content)
+            assessment = json.loads(content)
+            if not cached:
+                self.response_cache.put("analyze_responses", cache_input, content, exact=True)
             
             # Enhance with real service data
             enhanced = assessment.copy()
@@ -218,6 +284,7 @@ class ChromaMedicalAdvisor:
                 "services_data": {}
             }
 
+    @traced("treatment_plan")
     def generate_treatment_plan(self, assessment: Dict) -> Dict:
         """Generate treatment plans using database information."""
         # Get service costs from database
@@ -261,16 +328,13 @@ class ChromaMedicalAdvisor:
             }}
         }}"""
 
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a medical advisor focusing on urinary tract and related conditions in Kenya."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+        content = self._chat("treatment_plan", [
+            {"role": "system", "content": "You are a medical advisor focusing on urinary tract and related conditions in Kenya."},
+            {"role": "user", "content": prompt}
+        ])
         
         try:
-            return json.loads(response.choices[0].message.content)
+            return json.loads(content)
         except json.JSONDecodeError:
             # Fallback plan for UTI-like symptoms
             return {
@@ -333,6 +397,7 @@ class ChromaMedicalAdvisor:
                 }
             }
 
+    @traced("save_report")
     def save_report(self, patient_name: str, condition: str, 
                    assessment: Dict, plan: Dict, responses: Dict[str, str]) -> Tuple[Path, Path]:
         """Save detailed report to JSON and TXT files."""
@@ -489,42 +554,46 @@ def main():
         if not condition:
             continue
         
-        try:
-            # Get relevant questions
-            print("\nTo better understand your situation, please answer these questions:")
-            questions = advisor.get_relevant_questions(condition)
+        # Trace every step of this consultation under one ID
+        with tracer.consultation():
+            try:
+                # Get relevant questions
+                print("\nTo better understand your situation, please answer these questions:")
+                questions = advisor.get_relevant_questions(condition)
             
-            # Gather responses
-            responses = {}
-            for question in questions:
-                response = input(f"\n{question}\n> ").strip()
-                responses[question] = response if response else "Not provided"
+                # Gather responses
+                responses = {}
+                for question in questions:
+                    response = input(f"\n{question}\n> ").strip()
+                    responses[question] = response if response else "Not provided"
             
-            # Generate assessment
-            print("\nAnalyzing your responses...")
-            assessment = advisor.analyze_responses(condition, responses)
+                # Generate assessment
+                print("\nAnalyzing your responses...")
+                assessment = advisor.analyze_responses(condition, responses)
             
-            # Generate treatment plan
-            print("Generating treatment plans...")
-            plan = advisor.generate_treatment_plan(assessment)
+                # Generate treatment plan
+                print("Generating treatment plans...")
+                plan = advisor.generate_treatment_plan(assessment)
             
-            # Save detailed report
-            json_path, txt_path = advisor.save_report(
-                patient_name, condition, assessment, plan, responses
-            )
+                # Save detailed report
+                json_path, txt_path = advisor.save_report(
+                    patient_name, condition, assessment, plan, responses
+                )
             
-            # Show report
-            with open(txt_path, 'r', encoding='utf-8') as f:
-                print("\n" + f.read())
+                # Show report
+                with open(txt_path, 'r', encoding='utf-8') as f:
+                    print("\n" + f.read())
             
-            print(f"\nDetailed report saved to:")
-            print(f"JSON: {json_path}")
-            print(f"Text: {txt_path}")
+                print(f"\nDetailed report saved to:")
+                print(f"JSON: {json_path}")
+                print(f"Text: {txt_path}")
             
-        except Exception as e:
-            print(f"\nError: {str(e)}")
-            print("Please try again with a different description.")
+            except Exception as e:
+                print(f"\nError: {str(e)}")
+                print("Please try again with a different description.")
     
+    print("\nConsultation timings:")
+    print(tracer.format_summary())
     print("\nThank you for using Medical Advisor!")
 
 if __name__ == "__main__":
@@ -1,7 +1,26 @@
-"""Medical advisor package initialization."""
+"""Medical advisor package initialization.
 
-from .advisor import Advisor
-from .service_priority import ServicePriority
-from .services import ServiceManager
+Public classes are imported from their submodules on first access, so
+importing the package does not pull in openai, chromadb or pandas.
+"""
 
-__all__ = ['Advisor', 'ServicePriority', 'ServiceManager']
\ No newline at end of file
+import importlib
+
+_EXPORTS = {
+    'Advisor': '.advisor',
+    'AsyncAdvisor': '.async_advisor',
+    'AdvisorPool': '.advisor_pool',
+    'get_advisor': '.advisor_pool',
+    'ServicePriority': '.service_priority',
+    'ServiceManager': '.services',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
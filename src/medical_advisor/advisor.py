@@ -1,163 +1,98 @@
 import json
 from datetime import datetime
-import openai
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List, Optional
 from pathlib import Path
 from .services import ServiceManager
 from .service_priority import ServicePriority
+from .search_priorities import SEARCH_PRIORITIES
+from .condition_classifier import ConditionClassifier
+from .streaming import TokenStream, completion_tokens
+from .semantic_cache import SemanticCache
+from .prompt_builder import TreatmentPlanPromptBuilder
+from .tracing import tracer, traced, traced_tokens, usage_attributes, current_consultation_id
+from .config import (
+    CLASSIFIER_CONFIDENCE_THRESHOLD, CLASSIFIER_CACHE_SIZE, CLASSIFIER_MIN_KEYWORD_HITS,
+    TREATMENT_PLAN_TOKEN_BUDGET, RESPONSE_CACHE_THRESHOLD, RESPONSE_CACHE_THRESHOLDS, RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_SIZE, SERVICE_QUERY_RESULTS
+)
+
+if TYPE_CHECKING:
+    import openai
 
 
 class Advisor:
-    def __init__(self, api_key: str):
-        """Initialize the medical advisor system."""
-        self.client = openai.OpenAI(api_key=api_key)
-        self.service_manager = ServiceManager(api_key)
-        self.collection = self.service_manager.get_collection()
+    # Part of every recommendation cache key; bump when retrieval or scoring
+    # changes so recommendations cached by older code are not served
+    RECOMMENDATION_FORMAT = "2"
+
+    def __init__(self, api_key: str, client: "openai.OpenAI" = None,
+                 service_manager: ServiceManager = None, base_url: str = None):
+        """Initialize the medical advisor system.
+        
+        An existing OpenAI client and ServiceManager can be passed in so
+        several advisors share connections and the Chroma client.
+        ``base_url`` sends the clients created here to another
+        OpenAI-compatible endpoint, such as an OpenAIStandIn.
+        """
+        if client is None:
+            import openai
+            client = openai.OpenAI(api_key=api_key, base_url=base_url)
+        self.client = client
+        self.service_manager = service_manager or ServiceManager(api_key, base_url=base_url)
+        self.collection_name = self.service_manager.live_collection_name()
+        self.collection = self.service_manager.get_retriever(self.service_manager.get_collection())
         
         if not self.collection or self.collection.count() == 0:
             raise ValueError("Medical services database is empty. Please run populate_services.py first.")
         
         # Define search priorities
-        self.search_priorities = {
-        "respiratory": {
-            "diagnostic": [
-                "throat swab culture for respiratory infection",
-                "sputum analysis for respiratory infection",
-                "blood test complete blood count for infection",
-                "chest x-ray for respiratory infection",
-                "CT scan for lung assessment",
-                "pulmonary function test for chronic respiratory issues"
-            ],
-            "treatment": [
-                "antibiotics treatment for respiratory infection",
-                "nebulizer therapy for respiratory distress",
-                "oxygen therapy for low oxygen saturation",
-                "bronchodilator medication for airway obstruction",
-                "steroids for inflammation in severe respiratory cases",
-                "antiviral drugs for viral respiratory infections"
-            ],
-            "monitoring": [
-                "vital signs monitoring for respiratory health",
-                "oxygen saturation monitoring using pulse oximeter",
-                "respiratory rate and depth monitoring",
-                "peak expiratory flow rate monitoring for asthma"
-            ]
-        },
-        "infectious": {
-            "diagnostic": [
-                "blood culture for detecting systemic infections",
-                "urine culture for urinary tract infection",
-                "chest x-ray to identify pneumonia",
-                "PCR test for infectious diseases like COVID-19",
-                "stool analysis for gastrointestinal infections",
-                "skin biopsy for dermatological infections"
-            ],
-            "treatment": [
-                "antibiotics for bacterial infections",
-                "antiviral medications for viral infections",
-                "antipyretics for fever management",
-                "rehydration therapy for dehydration caused by infection",
-                "antifungal therapy for fungal infections",
-                "immune boosters for recurrent infections"
-            ],
-            "monitoring": [
-                "temperature monitoring every 4 hours",
-                "vital signs monitoring for infection progression",
-                "fluid balance monitoring to detect dehydration",
-                "white blood cell count monitoring for infection response"
-            ]
-        },
-        "cardiovascular": {
-            "diagnostic": [
-                "ECG for cardiac rhythm abnormalities",
-                "echocardiogram for heart function",
-                "blood test for cardiac biomarkers",
-                "angiogram for coronary artery blockages",
-                "stress test for exercise-induced cardiac issues",
-                "Doppler ultrasound for blood flow assessment"
-            ],
-            "treatment": [
-                "antihypertensive therapy for high blood pressure",
-                "anticoagulants for preventing blood clots",
-                "defibrillation for life-threatening arrhythmias",
-                "cardiac catheterization for blocked arteries",
-                "beta-blockers for arrhythmia management",
-                "lifestyle modifications for long-term cardiovascular health"
-            ],
-            "monitoring": [
-                "continuous ECG monitoring for arrhythmias",
-                "blood pressure monitoring",
-                "cholesterol level tracking for long-term care",
-                "heart rate variability monitoring"
-            ]
-        },
-        "neurological": {
-            "diagnostic": [
-                "MRI for brain and spinal cord imaging",
-                "CT scan for head trauma assessment",
-                "EEG for detecting seizures",
-                "lumbar puncture for cerebrospinal fluid analysis",
-                "nerve conduction studies for peripheral neuropathy"
-            ],
-            "treatment": [
-                "anticonvulsants for seizure management",
-                "physical therapy for rehabilitation",
-                "thrombolytics for ischemic stroke",
-                "pain management for chronic neurological conditions",
-                "surgical intervention for brain tumors"
-            ],
-            "monitoring": [
-                "neurological status checks",
-                "ICP (intracranial pressure) monitoring for head injuries",
-                "motor function assessments",
-                "cognitive status tracking"
-            ]
-        },
-        "gastrointestinal": {
-            "diagnostic": [
-                "endoscopy for upper GI tract assessment",
-                "colonoscopy for lower GI tract evaluation",
-                "stool culture for infection diagnosis",
-                "abdominal ultrasound for organ imaging",
-                "liver function tests for hepatic issues"
-            ],
-            "treatment": [
-                "probiotics for restoring gut flora",
-                "antibiotics for bacterial GI infections",
-                "acid-reducing medications for ulcers",
-                "IV fluids for severe dehydration",
-                "surgical repair for perforations or obstructions"
-            ],
-            "monitoring": [
-                "bowel movement tracking",
-                "hydration status monitoring",
-                "weight monitoring for malnutrition",
-                "pain level assessments in abdominal conditions"
-            ]
-        },
-        "dermatological": {
-            "diagnostic": [
-                "skin biopsy for identifying rashes or lesions",
-                "allergy testing for skin hypersensitivity",
-                "Wood's lamp examination for fungal infections",
-                "patch testing for contact dermatitis"
-            ],
-            "treatment": [
-                "topical steroids for inflammation",
-                "antifungal creams for fungal infections",
-                "antihistamines for allergic reactions",
-                "antibiotics for bacterial skin infections",
-                "moisturizers for eczema management"
-            ],
-            "monitoring": [
-                "skin lesion tracking",
-                "healing progress monitoring",
-                "infection site monitoring",
-                "itching and redness assessments"
-            ]
-        }
-    }
+        self.search_priorities = SEARCH_PRIORITIES
+        self.n_results = SERVICE_QUERY_RESULTS
+        self._legacy_metadata_warned = False
+        
+        # Local condition classifier consulted before the LLM
+        self.classifier = ConditionClassifier(
+            embedding_func=self.service_manager.embedding_func,
+            confidence_threshold=CLASSIFIER_CONFIDENCE_THRESHOLD,
+            cache_size=CLASSIFIER_CACHE_SIZE,
+            min_keyword_hits=CLASSIFIER_MIN_KEYWORD_HITS
+        )
+        
+        # Serves stored LLM responses for near-identical inputs, with the
+        # similarity threshold suited to the embedding backend
+        self.response_cache = SemanticCache(
+            self.service_manager.db_dir / "response_cache.sqlite3",
+            self.service_manager.embedding_func,
+            threshold=RESPONSE_CACHE_THRESHOLDS.get(self.service_manager.embedding_backend, RESPONSE_CACHE_THRESHOLD),
+            ttl_seconds=RESPONSE_CACHE_TTL,
+            max_entries=RESPONSE_CACHE_SIZE,
+            model_name=self.service_manager.embedding_func.model_name
+        )
+        
+        # Keeps treatment-plan prompts within a fixed token budget
+        self.prompt_builder = TreatmentPlanPromptBuilder(token_budget=TREATMENT_PLAN_TOKEN_BUDGET)
+
+    def refresh_collection(self) -> bool:
+        """Switch to the live collection if a reload moved the alias since it was opened.
+        
+        Returns True if the collection changed. The previous version stays
+        in place, so queries already running against it are unaffected.
+        Checking is cheap: the alias file is only re-read when it changes.
+        """
+        name = self.service_manager.live_collection_name()
+        if name == self.collection_name:
+            return False
+        collection = self.service_manager.get_collection()
+        if collection is None or collection.count() == 0:
+            return False
+        self.collection = self.service_manager.get_retriever(collection)
+        self.collection_name = name
+        print(f"Switched to collection {name}")
+        return True
 
+    def close(self):
+        """Close the response cache owned by this advisor."""
+        self.response_cache.close()
 
     def _get_search_queries(self, condition_type: str, category: str) -> List[str]:
         """Generate search queries based on condition type and category."""
@@ -169,142 +104,327 @@ class Advisor:
         else:
             return []  # Return an empty list if the condition type is not found
 
-    def get_service_recommendations(self, condition: str, budget_level: str = "standard") -> Dict:
-        """Get recommended medical services for a condition."""
+    def _classification_messages(self, condition: str) -> List[Dict]:
+        """Build the chat messages used to classify a condition.
+
+        The types offered are the SEARCH_PRIORITIES keys, the same ones the
+        local classifier returns, so both paths select the same queries.
+        """
+        types = ", ".join(self.search_priorities)
+        return [{
+            "role": "system", 
+            "content": f"Classify the medical condition into one of these types: {types} or other. "
+                       "Respond with just the type."
+        }, {
+            "role": "user", 
+            "content": f"Classify this condition: {condition}"
+        }]
+
+    def _chat(self, purpose: str, messages: List[Dict]) -> str:
+        """Run a chat completion in a tracing span and return its text."""
+        with tracer.span("chat_completion", purpose=purpose, model="gpt-3.5-turbo") as span:
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages
+            )
+            content = response.choices[0].message.content
+            span.set(response_chars=len(content), **usage_attributes(response))
+        return content
+
+    def _chat_stream(self, purpose: str, messages: List[Dict]):
+        """Start a streamed chat completion; its span ends when the stream does."""
+        span = tracer.start_span("chat_completion", purpose=purpose, model="gpt-3.5-turbo", stream=True)
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                stream=True
+            )
+        except Exception as e:
+            span.end(error=e)
+            raise
+        return traced_tokens(span, completion_tokens(response))
+
+    def _classify_condition(self, condition: str) -> str:
+        """Map a condition to a type, using the LLM only when local confidence is low."""
+        with tracer.span("classify") as span:
+            condition_type, confidence = self.classifier.classify(condition)
+            if condition_type is not None and confidence >= self.classifier.confidence_threshold:
+                span.set(source="local", condition_type=condition_type, confidence=confidence)
+                return condition_type
+
+            content = self._chat("classify", self._classification_messages(condition))
+            condition_type = content.lower().strip()
+            self.classifier.remember(condition, condition_type)
+            span.set(source="llm", condition_type=condition_type, confidence=confidence)
+            return condition_type
+
+    def _search_services(self, condition_type: str, condition: str, categories: List[str],
+                         where: Optional[Dict] = None) -> List[Dict]:
+        """Run all category queries for a condition type as one batched search.
+
+        Every query string is sent in a single ``collection.query`` call so the
+        embedding function is invoked once for the whole batch. Each result row
+        is attributed back to the category its query came from. ``where`` is
+        applied by the index, so excluded services are never retrieved.
+        """
+        queries = []
+        query_categories = []
+        for category in categories:
+            category_queries = self._get_search_queries(condition_type, category)
+            if not category_queries:
+                category_queries = [f"{category} for {condition}"]
+            queries.extend(category_queries)
+            query_categories.extend([category] * len(category_queries))
+
+        with tracer.span("collection_query", queries=len(queries), categories=categories,
+                         n_results=self.n_results, filtered=where is not None) as span:
+            query_args = {"where": where} if where else {}
+            results = self.collection.query(
+                query_texts=queries,
+                n_results=self.n_results,  # Limit results per query
+                include=["metadatas"],
+                **query_args
+            )
+            span.set(results=sum(len(metas) for metas in (results or {}).get("metadatas") or []))
+        if not results or not results.get("metadatas"):
+            print(f"No results found for condition type: {condition_type}")
+            return []
+
+        self._complete_legacy_metadata(results)
+
+        services = []
+        for query, category, metas in zip(queries, query_categories, results["metadatas"]):
+            if not metas:
+                print(f"No results found for query: {query}")
+                continue
+
+            # Add category to results
+            for meta in metas:
+                services.append({
+                    "description": meta["description"],
+                    "department": meta["department"],
+                    "price": meta["price"],
+                    "code": meta["code"],
+                    "priority": meta["priority"],
+                    "category": category
+                })
+        return services
+
+    def _complete_legacy_metadata(self, results: Dict):
+        """Fill in description and priority for collections built before they were stored.
+
+        Such collections only carry code, department and price, so the
+        description is parsed from the document and the priority computed
+        from it. Re-running populate_services.py removes the extra lookup.
+        """
+        missing = {
+            service_id
+            for ids, metas in zip(results.get("ids") or [], results["metadatas"])
+            for service_id, meta in zip(ids, metas or [])
+            if "description" not in meta or "priority" not in meta
+        }
+        if not missing:
+            return
+        if not self._legacy_metadata_warned:
+            print("Collection lacks service descriptions in metadata; re-run populate_services.py")
+            self._legacy_metadata_warned = True
+
+        stored = self.collection.get(ids=sorted(missing), include=["documents"])
+        descriptions = {}
+        for service_id, doc in zip(stored["ids"], stored.get("documents") or []):
+            descriptions[service_id] = doc.split("Medical service:")[-1].split("Department:")[0].strip()
+        for ids, metas in zip(results["ids"], results["metadatas"]):
+            for service_id, meta in zip(ids, metas or []):
+                if service_id not in missing:
+                    continue
+                meta.setdefault("description", descriptions.get(service_id, meta.get("code", "")))
+                meta.setdefault("priority", ServicePriority.get_service_priority(meta))
+
+    def _build_recommendations(self, condition_type: str, condition: str, budget_level: str,
+                               departments: List[str] = None) -> Dict:
+        """Retrieve, score and deduplicate services for a condition type."""
+        # Get prioritized search queries
+        categories = ["diagnostic", "treatment", "monitoring"]
+        where = ServicePriority.build_where(budget_level, departments)
+        try:
+            try:
+                all_results = self._search_services(condition_type, condition, categories, where)
+            except Exception:
+                # The collection may have been deleted after a reload moved the
+                # alias; retry once against the live version
+                if not self.refresh_collection():
+                    raise
+                all_results = self._search_services(condition_type, condition, categories, where)
+        except Exception as e:
+            print(f"Error querying collection for {condition_type}: {e}")
+            all_results = []
+
+        return self._score_services(all_results, categories)
+
+    def _score_services(self, all_results: List[Dict], categories: List[str]) -> Dict:
+        """Score, deduplicate and total retrieved services by category."""
+        with tracer.span("score", candidates=len(all_results)) as span:
+            formatted_results = self._score_categories(all_results, categories)
+            span.set(services=len(formatted_results["services"]))
+        return formatted_results
+
+    def _score_categories(self, all_results: List[Dict], categories: List[str]) -> Dict:
+        # Format and filter results
+        formatted_results = {
+            "services": [],
+            "total_cost": 599.0,
+            "departments": set(),
+            "categories": {
+                "diagnostic": [],
+                "treatment": [],
+                "monitoring": []
+            }
+        }
+
+        # Score and deduplicate services by category
+        for category in categories:
+            category_services = [s for s in all_results if s["category"] == category]
+            
+            # Score services
+            scored_services = []
+            for service in category_services:
+                # Use the priority class computed at ingestion as base score
+                base_score = ServicePriority.get_priority_weight(service["priority"])
+                
+                # Adjust score based on price (lower price = higher score)
+                price_factor = 1.0
+                if service["price"] <= ServicePriority.PRICE_THRESHOLDS["basic"]:
+                    price_factor = 1.5
+                
+                final_score = base_score * price_factor
+                service["relevance_score"] = final_score
+                scored_services.append(service)
+            
+            # Deduplicate similar services
+            unique_services = ServicePriority.consolidate_oxygen_services(scored_services)
+            
+            # Add to results
+            formatted_results["categories"][category] = unique_services
+            for service in unique_services:
+                formatted_results["services"].append(service)
+                formatted_results["total_cost"] += service["price"]
+                formatted_results["departments"].add(service["department"])
+        
+        formatted_results["departments"] = sorted(list(formatted_results["departments"]))
+        return formatted_results
+
+    def _recommendation_cache_key(self, budget_level: str, departments: List[str] = None):
+        """Budget and version parts of a recommendation cache key."""
+        budget_key = budget_level
+        if departments:
+            budget_key = f"{budget_level}:{','.join(sorted(departments))}"
+        catalog_version = self.service_manager.get_catalog_version(self.collection)
+        return budget_key, f"{catalog_version}/{self.RECOMMENDATION_FORMAT}"
+
+    def _get_cached_recommendations(self, condition_type: str, budget_level: str,
+                                    departments: List[str] = None) -> Optional[Dict]:
+        """Look up recommendations computed earlier against the current catalog.
+
+        Retrieval and scoring only depend on the condition type, budget level,
+        departments and catalog, so only condition types with fixed search
+        queries are cached.
+        """
+        if condition_type not in self.search_priorities:
+            return None
+        with tracer.span("recommendation_cache", condition_type=condition_type) as span:
+            budget_key, version = self._recommendation_cache_key(budget_level, departments)
+            cached = self.service_manager.recommendation_cache.get(condition_type, budget_key, version)
+            span.set(hit=cached is not None)
+        if cached is not None:
+            print(f"Using cached recommendations for {condition_type} ({budget_level})")
+        return cached
+
+    def _cache_recommendations(self, condition_type: str, budget_level: str, results: Dict,
+                               departments: List[str] = None):
+        """Store recommendations for a fixed-query condition type."""
+        if condition_type not in self.search_priorities or not results["services"]:
+            return
+        budget_key, version = self._recommendation_cache_key(budget_level, departments)
+        self.service_manager.recommendation_cache.put(condition_type, budget_key, version, results)
+
+    @traced("service_recommendations")
+    def get_service_recommendations(self, condition: str, budget_level: str = "standard",
+                                    departments: List[str] = None) -> Dict:
+        """Get recommended medical services for a condition.
+
+        Only services within the budget level's price threshold, and in
+        ``departments`` when given, are retrieved.
+        """
         try:
             print(f"\nStarting service recommendation process for condition: {condition}")
+            # Follow the services alias if a reload or rollback moved it
+            self.refresh_collection()
             
             # Determine condition type
             try:
-                type_response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{
-                        "role": "system", 
-                        "content": "Classify the medical condition into one of these types: respiratory, cardiac, digestive, musculoskeletal, neurological, endocrine, infectious, dermatological, hematological, renal, reproductive, psychiatric, immunological, oncological, pediatric, geriatric, trauma/injury or other. Respond with just the type."
-                    }, {
-                        "role": "user", 
-                        "content": f"Classify this condition: {condition}"
-                    }]
-                )
-                condition_type = type_response.choices[0].message.content.lower().strip()
+                condition_type = self._classify_condition(condition)
                 print(f"Detected condition type: {condition_type}")
             except Exception as e:
                 print(f"Error detecting condition type: {e}")
                 return {"error": "Failed to classify condition type."}
 
-            # Get prioritized search queries
-            all_results = []
-            categories = ["diagnostic", "treatment", "monitoring"]
-
-            for category in categories:
-                try:
-                    queries = self._get_search_queries(condition_type, category)
-                    if not queries:
-                        queries = [f"{category} for {condition}"]
-                    
-                    for query in queries:
-                        print(f"\nSearching for {category}: {query}")
-                        try:
-                            results = self.collection.query(
-                                query_texts=[query],
-                                n_results=3  # Limit results per query
-                            )
-                            print(f"Results: {results}")  # Log the results for debugging
-                            if not results or not results.get("documents"):
-                                print(f"No results found for query: {query}")
-                                continue
-                            
-                            # Add category to results
-                            for doc, meta in zip(results["documents"][0], results["metadatas"][0]):
-                                service_desc = doc.split("Medical service:")[1].split("Department:")[0].strip()
-                                service_info = {
-                                    "description": service_desc,
-                                    "department": meta["department"],
-                                    "price": float(meta["price"]),
-                                    "code": meta["code"],
-                                    "category": category
-                                }
-                                all_results.append(service_info)
-                        except Exception as e:
-                            print(f"Error querying collection for {query}: {e}")
-                            
-                except Exception as e:
-                    print(f"Error getting search queries for category {category}: {e}")
-
-            # Format and filter results
-            formatted_results = {
-                "services": [],
-                "total_cost": 599.0,
-                "departments": set(),
-                "categories": {
-                    "diagnostic": [],
-                    "treatment": [],
-                    "monitoring": []
-                }
-            }
+            cached = self._get_cached_recommendations(condition_type, budget_level, departments)
+            if cached is not None:
+                return cached
 
-            # Score and deduplicate services by category
-            for category in categories:
-                category_services = [s for s in all_results if s["category"] == category]
-                
-                # Score services
-                scored_services = []
-                for service in category_services:
-                    # Use priority weight as base score
-                    priority = ServicePriority.get_service_priority(service)
-                    base_score = ServicePriority.get_priority_weight(priority)
-                    
-                    # Adjust score based on price (lower price = higher score)
-                    price_factor = 1.0
-                    if float(service["price"]) <= ServicePriority.PRICE_THRESHOLDS["basic"]:
-                        price_factor = 1.5
-                    
-                    final_score = base_score * price_factor
-                    service["relevance_score"] = final_score
-                    scored_services.append(service)
-                
-                # Deduplicate similar services
-                unique_services = ServicePriority.consolidate_oxygen_services(scored_services)
-                
-                # Add to results
-                formatted_results["categories"][category] = unique_services
-                for service in unique_services:
-                    formatted_results["services"].append(service)
-                    formatted_results["total_cost"] += service["price"]
-                    formatted_results["departments"].add(service["department"])
-            
-            formatted_results["departments"] = sorted(list(formatted_results["departments"]))
+            formatted_results = self._build_recommendations(condition_type, condition, budget_level, departments)
+            self._cache_recommendations(condition_type, budget_level, formatted_results, departments)
             return formatted_results
         
         except Exception as e:
             print(f"Error in service recommendation process: {e}")
             return {"error": "Failed to generate service recommendations."}
-        
-
-
+    
+    def _symptom_messages(self, symptoms: str) -> List[Dict]:
+        """Build the chat messages used to analyze symptoms."""
+        return [{
+            "role": "system", 
+            "content": """You are a medical expert. Analyze the symptoms and provide:
+                1. Possible conditions (list the most likely ones first)
+                2. Risk level (Low, Medium, High) with explanation
+                3. Recommended immediate steps
+                4. Warning signs to watch for
+                5. Type of specialist needed (if any)
 
+                Format your response in clear sections with bullet points."""},
+            {"role": "user", "content": f"Analyze these symptoms: {symptoms}"}
+        ]
 
-            return self.search_priorities[condition_type].get(category, [])
-        return []
-    
+    @traced("analyze_symptoms")
     def analyze_symptoms(self, symptoms: str) -> Dict:
         """Analyze symptoms and provide medical assessment."""
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{
-                "role": "system", 
-                "content": """You are a medical expert. Analyze the symptoms and provide:
-                    1. Possible conditions (list the most likely ones first)
-                    2. Risk level (Low, Medium, High) with explanation
-                    3. Recommended immediate steps
-                    4. Warning signs to watch for
-                    5. Type of specialist needed (if any)
-
-                    Format your response in clear sections with bullet points."""},
-                {"role": "user", "content": f"Analyze these symptoms: {symptoms}"}
-            ]
-        )
-        return {"analysis": response.choices[0].message.content}
+        cached = self.response_cache.get("analyze_symptoms", symptoms)
+        if cached is not None:
+            return {"analysis": cached}
+        
+        analysis = self._chat("analyze_symptoms", self._symptom_messages(symptoms))
+        self.response_cache.put("analyze_symptoms", symptoms, analysis)
+        return {"analysis": analysis}
+
+    def analyze_symptoms_stream(self, symptoms: str) -> TokenStream:
+        """Stream the symptom analysis token by token.
+
+        Iterate the returned stream to receive tokens; afterwards its
+        ``result`` matches what analyze_symptoms returns. The call's span
+        ends when the stream does.
+        """
+        with tracer.consultation(), tracer.stream_span("analyze_symptoms") as span:
+            cached = self.response_cache.get("analyze_symptoms", symptoms)
+            if cached is not None:
+                span.set(cached=True)
+                return TokenStream(traced_tokens(span, [cached]), {}, "analysis")
+            
+            tokens = self._chat_stream("analyze_symptoms", self._symptom_messages(symptoms))
+            return TokenStream(
+                traced_tokens(span, tokens), {}, "analysis",
+                on_complete=lambda text: self.response_cache.put("analyze_symptoms", symptoms, text)
+            )
     
 
     def save_consultation(self, data: Dict) -> str:
@@ -318,65 +438,72 @@ class Advisor:
         
         # Add timestamp and format data
         data["timestamp"] = datetime.now().isoformat()
-        data["consultation_id"] = timestamp
+        data["consultation_id"] = current_consultation_id() or timestamp
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with tracer.span("save_report") as span:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            span.set(bytes=filepath.stat().st_size)
         
         return str(filepath)
 
-    def get_treatment_plan(self, condition: str, budget_level: str = "standard") -> Dict:
+    def prefill_recommendations(self, budget_levels: List[str] = None) -> int:
+        """Compute cached recommendations for every known condition type."""
+        budget_levels = budget_levels or list(ServicePriority.PRICE_THRESHOLDS)
+        
+        count = 0
+        for condition_type in self.search_priorities:
+            for budget_level in budget_levels:
+                print(f"Prefilling recommendations for {condition_type} ({budget_level})")
+                results = self._build_recommendations(condition_type, condition_type, budget_level)
+                if results["services"]:
+                    self._cache_recommendations(condition_type, budget_level, results)
+                    count += 1
+        return count
+
+    @traced("treatment_plan")
+    def get_treatment_plan(self, condition: str, budget_level: str = "standard",
+                           departments: List[str] = None) -> Dict:
         """Generate a comprehensive treatment plan with cost estimates."""
         # Get service recommendations first
-        services = self.get_service_recommendations(condition, budget_level)
-        
-        # Create a categorized summary of available services
-        service_summary = "\nRecommended Medical Services:"
-        
-        if services["categories"]["diagnostic"]:
-            service_summary += "\n\nDiagnostic Tests (in order of priority):"
-            for s in services["categories"]["diagnostic"]:
-                service_summary += f"\n- {s['description']} ({s['department']}) - KSH {s['price']:,.2f}"
-            
-        if services["categories"]["treatment"]:
-            service_summary += "\n\nTreatments (in order of priority):"
-            for s in services["categories"]["treatment"]:
-                service_summary += f"\n- {s['description']} ({s['department']}) - KSH {s['price']:,.2f}"
-            
-        if services["categories"]["monitoring"]:
-            service_summary += "\n\nMonitoring Services (in order of priority):"
-            for s in services["categories"]["monitoring"]:
-                service_summary += f"\n- {s['description']} ({s['department']}) - KSH {s['price']:,.2f}"
+        services = self.get_service_recommendations(condition, budget_level, departments)
+        if "error" in services:
+            return services
         
         # Generate treatment plan
-        plan_response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": f"""You are a medical expert creating a treatment plan. 
-                Consider these available services:{service_summary}
-                
-                Total estimated cost: KSH {services['total_cost']:,.2f}
-                Departments involved: {', '.join(services['departments'])}
-                Budget level: {budget_level}
-                
-                Create a {budget_level} budget treatment plan that includes:
-                1. Essential diagnostic tests (start with basic tests before advanced imaging)
-                2. Recommended treatments (prioritize cost-effective options)
-                3. Required monitoring and follow-up
-                4. Timeline for all services
-                5. Cost-saving suggestions
-                6. Important precautions
-                
-                Format your response in clear sections with bullet points.
-                Focus on essential services and cost-effective options first.Be thorough,remember that nothing can hav a cost of 0, if you see 0, use your own wisdom and decide a figure"""},
-                {"role": "user", "content": f"Create a treatment plan for: {condition}"}
-            ]
-        )
+        messages, prompt_report = self.prompt_builder.build(condition, budget_level, services)
+        treatment_plan = self._chat("treatment_plan", messages)
         
         return {
             "condition": condition,
             "budget_level": budget_level,
             "available_services": services,
-            "treatment_plan": plan_response.choices[0].message.content,
-            "total_estimated_cost": services["total_cost"]
-        }
\ No newline at end of file
+            "treatment_plan": treatment_plan,
+            "total_estimated_cost": services["total_cost"],
+            "prompt_report": prompt_report
+        }
+
+    def get_treatment_plan_stream(self, condition: str, budget_level: str = "standard",
+                                  departments: List[str] = None) -> TokenStream:
+        """Stream the treatment plan token by token.
+
+        Service recommendations are available in ``result`` straight away;
+        the plan text is added once the stream has been consumed, which is
+        also when the call's span ends. If no recommendations could be made,
+        ``result`` holds their ``error`` and the stream is empty.
+        """
+        with tracer.consultation(), tracer.stream_span("treatment_plan") as span:
+            services = self.get_service_recommendations(condition, budget_level, departments)
+            if "error" in services:
+                return TokenStream(traced_tokens(span, []), dict(services), "treatment_plan")
+            
+            messages, prompt_report = self.prompt_builder.build(condition, budget_level, services)
+            tokens = traced_tokens(span, self._chat_stream("treatment_plan", messages))
+        
+        return TokenStream(tokens, {
+            "condition": condition,
+            "budget_level": budget_level,
+            "available_services": services,
+            "total_estimated_cost": services["total_cost"],
+            "prompt_report": prompt_report
+        }, "treatment_plan")
@@ -0,0 +1,100 @@
+"""Process-wide pool of advisor resources."""
+
+import atexit
+import threading
+from typing import Dict
+
+import httpx
+import openai
+
+from .advisor import Advisor
+from .services import ServiceManager
+
+
+class AdvisorPool:
+    """Advisor resources shared across sessions and threads.
+
+    One keep-alive HTTP connection pool backs the OpenAI client, and one
+    ServiceManager holds the Chroma client, the loaded collection and the
+    on-disk caches. Construction cost is paid once per process.
+    """
+
+    def __init__(self, api_key: str, max_connections: int = 20, base_url: str = None):
+        self.api_key = api_key
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client)
+        self.service_manager = ServiceManager(api_key, base_url=base_url)
+        self._advisor = None
+        self._lock = threading.Lock()
+
+    def get_advisor(self) -> Advisor:
+        """Get the shared advisor, building it on first use.
+        
+        An existing advisor follows the services alias, so a reload or
+        rollback takes effect without restarting the process.
+        """
+        if self._advisor is None:
+            with self._lock:
+                if self._advisor is None:
+                    self._advisor = Advisor(
+                        self.api_key,
+                        client=self.client,
+                        service_manager=self.service_manager
+                    )
+                    return self._advisor
+        if self._advisor.collection_name != self.service_manager.live_collection_name():
+            with self._lock:
+                self._advisor.refresh_collection()
+        return self._advisor
+
+    def warmup(self) -> Advisor:
+        """Build the advisor and load everything it needs up front."""
+        advisor = self.get_advisor()
+        advisor.classifier.warmup()
+        return advisor
+
+    def shutdown(self):
+        """Close connections and on-disk caches."""
+        with self._lock:
+            if self._advisor is not None:
+                self._advisor.close()
+                self._advisor = None
+            self.service_manager.close()
+            self.http_client.close()
+
+
+_pools: Dict[str, AdvisorPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(api_key: str) -> AdvisorPool:
+    """Get the process-wide pool for an API key."""
+    with _pools_lock:
+        if api_key not in _pools:
+            _pools[api_key] = AdvisorPool(api_key)
+        return _pools[api_key]
+
+
+def get_advisor(api_key: str) -> Advisor:
+    """Get the process-wide shared advisor for an API key."""
+    return get_pool(api_key).get_advisor()
+
+
+def warmup(api_key: str) -> Advisor:
+    """Build and warm the shared advisor ahead of the first consultation."""
+    return get_pool(api_key).warmup()
+
+
+@atexit.register
+def shutdown():
+    """Shut down every pool in this process."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
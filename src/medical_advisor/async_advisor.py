@@ -0,0 +1,140 @@
+"""Asynchronous medical advisor with concurrent LLM and vector-search fan-out."""
+
+import asyncio
+from typing import TYPE_CHECKING, Dict, List
+
+from .advisor import Advisor
+from .tracing import tracer, traced, usage_attributes
+
+if TYPE_CHECKING:
+    import openai
+
+
+class AsyncAdvisor(Advisor):
+    """Advisor built on AsyncOpenAI.
+
+    The async API lives beside the inherited synchronous one under
+    ``a``-prefixed names (``aanalyze_symptoms``, ``aget_service_recommendations``,
+    ``aget_treatment_plan``), so an AsyncAdvisor still works wherever an
+    Advisor is expected. Symptom analysis and treatment planning run
+    concurrently in ``consult``. Chroma's client is synchronous, so service
+    retrieval runs in a worker thread as one batched query for all
+    categories rather than one concurrent query per category: that embeds
+    once per consultation and is no slower (see
+    scripts/benchmark_async_retrieval.py).
+    """
+
+    def __init__(self, api_key: str, client: "openai.OpenAI" = None,
+                 service_manager=None, async_client: "openai.AsyncOpenAI" = None,
+                 base_url: str = None):
+        """Initialize the advisor and its async OpenAI client."""
+        super().__init__(api_key, client=client, service_manager=service_manager, base_url=base_url)
+        if async_client is None:
+            import openai
+            async_client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+        self.async_client = async_client
+
+    async def _achat(self, purpose: str, messages: List[Dict]) -> str:
+        """Async counterpart of Advisor._chat."""
+        with tracer.span("chat_completion", purpose=purpose, model="gpt-3.5-turbo") as span:
+            response = await self.async_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages
+            )
+            content = response.choices[0].message.content
+            span.set(response_chars=len(content), **usage_attributes(response))
+        return content
+
+    async def _aclassify_condition(self, condition: str) -> str:
+        """Async counterpart of Advisor._classify_condition."""
+        with tracer.span("classify") as span:
+            condition_type, confidence = await asyncio.to_thread(self.classifier.classify, condition)
+            if condition_type is not None and confidence >= self.classifier.confidence_threshold:
+                span.set(source="local", condition_type=condition_type, confidence=confidence)
+                return condition_type
+
+            content = await self._achat("classify", self._classification_messages(condition))
+            condition_type = content.lower().strip()
+            self.classifier.remember(condition, condition_type)
+            span.set(source="llm", condition_type=condition_type, confidence=confidence)
+            return condition_type
+
+    @traced("analyze_symptoms")
+    async def aanalyze_symptoms(self, symptoms: str) -> Dict:
+        """Async counterpart of Advisor.analyze_symptoms."""
+        cached = await asyncio.to_thread(self.response_cache.get, "analyze_symptoms", symptoms)
+        if cached is not None:
+            return {"analysis": cached}
+
+        analysis = await self._achat("analyze_symptoms", self._symptom_messages(symptoms))
+        await asyncio.to_thread(self.response_cache.put, "analyze_symptoms", symptoms, analysis)
+        return {"analysis": analysis}
+
+    @traced("service_recommendations")
+    async def aget_service_recommendations(self, condition: str, budget_level: str = "standard",
+                                           departments: List[str] = None) -> Dict:
+        """Async counterpart of Advisor.get_service_recommendations.
+
+        Retrieval is the same single batched query the sync path makes, run
+        in a worker thread; the categories are not queried concurrently.
+        """
+        try:
+            print(f"\nStarting service recommendation process for condition: {condition}")
+            # Follow the services alias if a reload or rollback moved it
+            await asyncio.to_thread(self.refresh_collection)
+
+            # Determine condition type
+            try:
+                condition_type = await self._aclassify_condition(condition)
+                print(f"Detected condition type: {condition_type}")
+            except Exception as e:
+                print(f"Error detecting condition type: {e}")
+                return {"error": "Failed to classify condition type."}
+
+            cached = await asyncio.to_thread(
+                self._get_cached_recommendations, condition_type, budget_level, departments
+            )
+            if cached is not None:
+                return cached
+
+            # All categories go out as one batched embedding and collection query
+            formatted_results = await asyncio.to_thread(
+                self._build_recommendations, condition_type, condition, budget_level, departments
+            )
+            await asyncio.to_thread(
+                self._cache_recommendations, condition_type, budget_level, formatted_results, departments
+            )
+            return formatted_results
+
+        except Exception as e:
+            print(f"Error in service recommendation process: {e}")
+            return {"error": "Failed to generate service recommendations."}
+
+    @traced("treatment_plan")
+    async def aget_treatment_plan(self, condition: str, budget_level: str = "standard",
+                                  departments: List[str] = None) -> Dict:
+        """Async counterpart of Advisor.get_treatment_plan."""
+        services = await self.aget_service_recommendations(condition, budget_level, departments)
+        if "error" in services:
+            return services
+
+        messages, prompt_report = self.prompt_builder.build(condition, budget_level, services)
+        treatment_plan = await self._achat("treatment_plan", messages)
+
+        return {
+            "condition": condition,
+            "budget_level": budget_level,
+            "available_services": services,
+            "treatment_plan": treatment_plan,
+            "total_estimated_cost": services["total_cost"],
+            "prompt_report": prompt_report
+        }
+
+    @traced("consultation")
+    async def consult(self, symptoms: str, condition: str, budget_level: str = "standard") -> Dict:
+        """Run symptom analysis and treatment planning concurrently."""
+        analysis, plan = await asyncio.gather(
+            self.aanalyze_symptoms(symptoms),
+            self.aget_treatment_plan(condition, budget_level)
+        )
+        return {"analysis": analysis, "treatment_plan": plan}
@@ -0,0 +1,95 @@
+"""Aliases mapping stable collection names to versioned Chroma collections."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class CollectionAlias:
+    """JSON file mapping each alias to its live collection and earlier versions.
+
+    Every alias has a history list, newest first; the first entry is the
+    live collection. The file is replaced atomically, so readers in other
+    processes see either the old or the new target and never a partial
+    write. Reads are cached until the file changes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._cached_mtime = None
+        self._cached = {}
+
+    def _read(self) -> Dict[str, List[str]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return {}
+        mtime = (stat.st_mtime_ns, stat.st_size)
+        if mtime != self._cached_mtime:
+            with open(self.path, encoding="utf-8") as f:
+                self._cached = json.load(f)
+            self._cached_mtime = mtime
+        return self._cached
+
+    def _write(self, data: Dict[str, List[str]]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        stat = self.path.stat()
+        self._cached = data
+        self._cached_mtime = (stat.st_mtime_ns, stat.st_size)
+
+    def resolve(self, alias: str) -> Optional[str]:
+        """Live collection for ``alias``, or None if it was never set."""
+        with self._lock:
+            history = self._read().get(alias) or []
+        return history[0] if history else None
+
+    def history(self, alias: str) -> List[str]:
+        """Collections the alias has pointed at, newest first."""
+        with self._lock:
+            return list(self._read().get(alias) or [])
+
+    def flip(self, alias: str, name: str, current: str = None) -> Optional[str]:
+        """Point ``alias`` at ``name`` and return the collection it replaced.
+
+        ``current`` seeds the history when the alias is new, so a collection
+        that predates aliasing can still be rolled back to.
+        """
+        with self._lock:
+            data = dict(self._read())
+            history = list(data.get(alias) or ([current] if current else []))
+            previous = history[0] if history else None
+            data[alias] = [name] + [entry for entry in history if entry != name]
+            self._write(data)
+        return previous
+
+    def rollback(self, alias: str) -> Tuple[str, str]:
+        """Point ``alias`` back at its previous collection.
+
+        Returns (new live collection, abandoned collection).
+        """
+        with self._lock:
+            data = dict(self._read())
+            history = list(data.get(alias) or [])
+            if len(history) < 2:
+                raise ValueError(f"No previous collection to roll {alias} back to")
+            data[alias] = history[1:]
+            self._write(data)
+        return history[1], history[0]
+
+    def trim(self, alias: str, keep: int) -> List[str]:
+        """Drop all but the newest ``keep`` entries; returns the dropped names."""
+        with self._lock:
+            data = dict(self._read())
+            history = list(data.get(alias) or [])
+            if len(history) <= keep:
+                return []
+            data[alias] = history[:keep]
+            self._write(data)
+        return history[keep:]
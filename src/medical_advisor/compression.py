@@ -0,0 +1,130 @@
+"""Compressed storage for service embeddings (float16, int8, PCA)."""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+# Rows converted back to float32 at a time when scanning compressed matrices
+SCAN_CHUNK_ROWS = 8192
+
+# PCA is fitted on at most this many rows
+PCA_FIT_ROWS = 20000
+
+PCA_MEAN_FILE = "pca_mean.npy"
+PCA_COMPONENTS_FILE = "pca_components.npy"
+SCALES_FILE = "int8_scales.npy"
+
+
+class EmbeddingCodec:
+    """Encodes unit embeddings for storage and maps queries into the same space.
+
+    PCA (optional) projects onto the top ``pca_dimension`` principal
+    components, or as many as the fitted rows give when there are fewer,
+    after which rows are renormalized. Rows are then stored as
+    float32, float16, or int8 with one scale per dimension. For int8 the
+    scales are folded into the query, so ``scores(query, rows)`` is a plain
+    dot product against the stored integers.
+    """
+
+    def __init__(self, dtype: str = "float32", pca_dimension: Optional[int] = None):
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unknown storage dtype: {dtype}. Choose from {', '.join(STORAGE_DTYPES)}")
+        self.dtype = dtype
+        self.pca_dimension = pca_dimension
+        self.mean = None
+        self.components = None
+        self.scales = None
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _project(self, matrix: np.ndarray) -> np.ndarray:
+        if self.components is None:
+            return matrix
+        return self._normalize((matrix - self.mean) @ self.components.T)
+
+    def fit_encode(self, embeddings) -> np.ndarray:
+        """Fit PCA and quantization scales on ``embeddings`` and encode them."""
+        matrix = self._normalize(np.asarray(embeddings, dtype=np.float32))
+
+        if self.pca_dimension and self.pca_dimension < matrix.shape[1]:
+            sample = matrix
+            if len(matrix) > PCA_FIT_ROWS:
+                sample = matrix[np.random.default_rng(0).choice(len(matrix), PCA_FIT_ROWS, replace=False)]
+            self.mean = sample.mean(axis=0)
+            # Principal axes from the SVD of the centred data; a catalog with
+            # fewer rows than pca_dimension has only that many axes
+            _, _, vt = np.linalg.svd(sample - self.mean, full_matrices=False)
+            self.components = np.ascontiguousarray(vt[:self.pca_dimension], dtype=np.float32)
+            self.pca_dimension = len(self.components)
+            matrix = self._project(matrix)
+
+        if self.dtype == "float16":
+            return matrix.astype(np.float16)
+        if self.dtype == "int8":
+            self.scales = np.abs(matrix).max(axis=0) / 127.0
+            self.scales[self.scales == 0] = 1.0
+            return np.round(matrix / self.scales).astype(np.int8)
+        return matrix.astype(np.float32)
+
+    def encode_queries(self, queries) -> np.ndarray:
+        """Map unit query embeddings into the stored space."""
+        queries = self._project(self._normalize(np.asarray(queries, dtype=np.float32)))
+        if self.scales is not None:
+            queries = queries * self.scales
+        return queries.astype(np.float32)
+
+    def scores(self, queries: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Similarity of each encoded query with each stored row."""
+        if rows.dtype == np.float32:
+            return queries @ rows.T
+        scores = np.empty((len(queries), len(rows)), dtype=np.float32)
+        for start in range(0, len(rows), SCAN_CHUNK_ROWS):
+            chunk = np.asarray(rows[start:start + SCAN_CHUNK_ROWS], dtype=np.float32)
+            scores[:, start:start + len(chunk)] = queries @ chunk.T
+        return scores
+
+    def decode(self, rows: np.ndarray) -> np.ndarray:
+        """Approximate unit embeddings in the (possibly reduced) stored space."""
+        rows = np.asarray(rows, dtype=np.float32)
+        if self.scales is not None:
+            rows = rows * self.scales
+        return self._normalize(rows)
+
+    def info(self) -> Dict:
+        return {"dtype": self.dtype, "pca_dimension": self.pca_dimension if self.components is not None else None}
+
+    def expected_info(self, dimension: Optional[int], rows: Optional[int] = None) -> Dict:
+        """``info()`` once ``rows`` embeddings of ``dimension`` are encoded (PCA only reduces)."""
+        reduces = bool(self.pca_dimension) and (not dimension or self.pca_dimension < dimension)
+        if not reduces:
+            return {"dtype": self.dtype, "pca_dimension": None}
+        fitted = min(self.pca_dimension, rows, PCA_FIT_ROWS) if rows else self.pca_dimension
+        return {"dtype": self.dtype, "pca_dimension": fitted}
+
+    def save(self, path: Path):
+        """Write PCA and quantization parameters next to the embeddings."""
+        path = Path(path)
+        if self.components is not None:
+            np.save(path / PCA_MEAN_FILE, self.mean)
+            np.save(path / PCA_COMPONENTS_FILE, self.components)
+        if self.scales is not None:
+            np.save(path / SCALES_FILE, self.scales.astype(np.float32))
+
+    @classmethod
+    def load(cls, path: Path, info: Dict) -> "EmbeddingCodec":
+        """Read a codec saved with ``save`` and described by ``info``."""
+        path = Path(path)
+        codec = cls(info.get("dtype", "float32"), info.get("pca_dimension"))
+        if codec.pca_dimension:
+            codec.mean = np.load(path / PCA_MEAN_FILE)
+            codec.components = np.load(path / PCA_COMPONENTS_FILE)
+        if codec.dtype == "int8":
+            codec.scales = np.load(path / SCALES_FILE)
+        return codec
@@ -0,0 +1,235 @@
+"""Local condition-type classification used before falling back to the LLM."""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Keywords that point strongly at a condition type
+CONDITION_KEYWORDS = {
+    "respiratory": [
+        "cough", "asthma", "pneumonia", "bronch", "lung", "breath", "wheez",
+        "sputum", "respiratory", "chest congestion", "tuberculosis", "sinus",
+        "throat", "flu", "influenza", "covid"
+    ],
+    "infectious": [
+        "infection", "fever", "malaria", "typhoid", "sepsis", "uti",
+        "urinary tract", "sti", "std", "gonorr", "syphilis", "hiv",
+        "cholera", "viral", "bacterial"
+    ],
+    "cardiovascular": [
+        "heart attack", "heart disease", "heart failure", "heartbeat",
+        "cardiac", "hypertension", "blood pressure", "palpitation",
+        "arrhythmia", "angina", "chest pain", "cholesterol", "coronary"
+    ],
+    "neurological": [
+        "headache", "migraine", "seizure", "epilep", "stroke", "numbness",
+        "dizziness", "paralysis", "neuropathy", "concussion", "memory loss",
+        "tremor", "head injury"
+    ],
+    "gastrointestinal": [
+        "stomach", "abdominal", "diarrh", "vomit", "nausea", "ulcer",
+        "constipation", "gastr", "liver", "bowel", "colon", "heartburn",
+        "acid reflux", "hepatitis", "appendic"
+    ],
+    "dermatological": [
+        "skin", "rash", "eczema", "acne", "itch", "psoriasis", "lesion",
+        "dermatitis", "hives", "fungal", "wart", "burn", "sores"
+    ]
+}
+
+# Keywords match at the start of a word; short acronyms (uti, sti, ...)
+# must match the whole word.
+_KEYWORD_PATTERNS = {
+    condition_type: [
+        re.compile(rf"\b{re.escape(kw)}\b" if len(kw) <= 3 else rf"\b{re.escape(kw)}")
+        for kw in keywords
+    ]
+    for condition_type, keywords in CONDITION_KEYWORDS.items()
+}
+
+# Labelled example conditions for nearest-neighbour matching
+LABELLED_EXAMPLES = {
+    "respiratory": [
+        "upper respiratory infection",
+        "persistent dry cough and shortness of breath",
+        "asthma attack with wheezing",
+        "pneumonia",
+        "chronic obstructive pulmonary disease",
+        "sore throat and blocked nose"
+    ],
+    "infectious": [
+        "high fever with chills",
+        "malaria",
+        "typhoid fever",
+        "urinary tract infection",
+        "sexually transmitted infection",
+        "bacterial sepsis"
+    ],
+    "cardiovascular": [
+        "high blood pressure",
+        "chest pain radiating to the left arm",
+        "irregular heartbeat and palpitations",
+        "congestive heart failure",
+        "coronary artery disease"
+    ],
+    "neurological": [
+        "severe migraine headaches",
+        "epileptic seizures",
+        "sudden weakness on one side of the body",
+        "numbness and tingling in the hands",
+        "head injury with confusion"
+    ],
+    "gastrointestinal": [
+        "diarrhoea and vomiting",
+        "stomach ulcer",
+        "severe abdominal pain",
+        "acid reflux and heartburn",
+        "liver disease with jaundice"
+    ],
+    "dermatological": [
+        "itchy skin rash",
+        "eczema flare up",
+        "fungal skin infection",
+        "severe acne",
+        "skin lesions and sores"
+    ]
+}
+
+
+class ConditionClassifier:
+    """Classify conditions into search priority types without an LLM call.
+
+    Keyword rules are tried first; fewer than ``min_keyword_hits`` matching
+    keywords only count as partial evidence. When they are inconclusive
+    and an embedding function is available, the condition is matched against
+    embeddings of labelled examples. Results, including ones supplied by
+    the caller after an LLM fallback, are kept in a bounded LRU.
+    """
+
+    def __init__(self, embedding_func=None, confidence_threshold: float = 0.7,
+                 min_similarity: float = 0.8, cache_size: int = 1024, k: int = 5,
+                 min_keyword_hits: int = 2):
+        self.embedding_func = embedding_func
+        self.confidence_threshold = confidence_threshold
+        self.min_keyword_hits = max(1, min_keyword_hits)
+        self.min_similarity = min_similarity
+        self.cache_size = cache_size
+        self.k = k
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._example_labels = None
+        self._example_matrix = None
+
+    @staticmethod
+    def normalize(condition: str) -> str:
+        """Normalize a condition string for matching and caching."""
+        return re.sub(r"\s+", " ", condition.lower()).strip()
+
+    def lookup(self, condition: str) -> Optional[str]:
+        """Return a previously classified type for ``condition``."""
+        key = self.normalize(condition)
+        with self._lock:
+            if key not in self._cache:
+                return None
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+    def remember(self, condition: str, condition_type: str):
+        """Store a classification, evicting the least recently used entry."""
+        key = self.normalize(condition)
+        with self._lock:
+            self._cache[key] = condition_type
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def classify_keywords(self, condition: str) -> Tuple[Optional[str], float]:
+        """Score condition types by keyword hits.
+
+        Confidence is the best type's share of all hits, scaled down when
+        it has fewer than ``min_keyword_hits``, so a single stray keyword
+        is not trusted on its own.
+        """
+        text = self.normalize(condition)
+        hits = {
+            condition_type: sum(1 for pattern in patterns if pattern.search(text))
+            for condition_type, patterns in _KEYWORD_PATTERNS.items()
+        }
+        total = sum(hits.values())
+        if total == 0:
+            return None, 0.0
+
+        best = max(hits, key=hits.get)
+        evidence = min(1.0, hits[best] / self.min_keyword_hits)
+        return best, hits[best] / total * evidence
+
+    def _load_examples(self):
+        """Embed the labelled examples once (served from the embedding cache)."""
+        if self._example_matrix is not None:
+            return
+        # Only the example match needs NumPy; keyword rules and the cache do not
+        import numpy as np
+
+        labels = []
+        texts = []
+        for condition_type, examples in LABELLED_EXAMPLES.items():
+            labels.extend([condition_type] * len(examples))
+            texts.extend(examples)
+
+        matrix = np.asarray(self.embedding_func(texts), dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        self._example_labels = labels
+        self._example_matrix = matrix
+
+    def warmup(self):
+        """Embed the labelled examples ahead of the first classification."""
+        if self.embedding_func is not None:
+            self._load_examples()
+
+    def classify_neighbours(self, condition: str) -> Tuple[Optional[str], float]:
+        """Vote among the nearest labelled examples, weighted by similarity."""
+        if self.embedding_func is None:
+            return None, 0.0
+        import numpy as np
+
+        self._load_examples()
+        query = np.asarray(self.embedding_func([self.normalize(condition)])[0], dtype=np.float32)
+        query /= np.linalg.norm(query)
+        similarities = self._example_matrix @ query
+
+        nearest = np.argsort(-similarities)[:self.k]
+        if similarities[nearest[0]] < self.min_similarity:
+            return None, 0.0
+
+        votes = {}
+        for idx in nearest:
+            label = self._example_labels[idx]
+            votes[label] = votes.get(label, 0.0) + float(similarities[idx])
+
+        best = max(votes, key=votes.get)
+        return best, votes[best] / sum(votes.values())
+
+    def classify(self, condition: str) -> Tuple[Optional[str], float]:
+        """Classify a condition locally, returning (type, confidence)."""
+        cached = self.lookup(condition)
+        if cached is not None:
+            return cached, 1.0
+
+        condition_type, confidence = self.classify_keywords(condition)
+        if confidence < self.confidence_threshold:
+            try:
+                nn_type, nn_confidence = self.classify_neighbours(condition)
+            except Exception as e:
+                print(f"Error matching condition against examples: {e}")
+                nn_type, nn_confidence = None, 0.0
+
+            if nn_type is not None and nn_type == condition_type:
+                confidence = max(confidence, nn_confidence)
+            elif nn_confidence > confidence:
+                condition_type, confidence = nn_type, nn_confidence
+
+        if condition_type is not None and confidence >= self.confidence_threshold:
+            self.remember(condition, condition_type)
+        return condition_type, confidence
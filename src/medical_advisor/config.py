@@ -9,9 +9,12 @@ CONFIG_DIR = PROJECT_ROOT / "config"
 DB_DIR = PROJECT_ROOT / "db"
 REPORTS_DIR = PROJECT_ROOT / "reports"
 
-# Create necessary directories
-DB_DIR.mkdir(exist_ok=True)
-REPORTS_DIR.mkdir(exist_ok=True)
+
+def ensure_directories():
+    """Create the database and reports directories if they are missing."""
+    DB_DIR.mkdir(exist_ok=True)
+    REPORTS_DIR.mkdir(exist_ok=True)
+
 
 # Environment variables
 ENV_PATH = CONFIG_DIR / ".env"
@@ -20,6 +23,81 @@ ENV_PATH = CONFIG_DIR / ".env"
 OPENAI_MODEL = "gpt-3.5-turbo"
 EMBEDDING_MODEL = "text-embedding-ada-002"
 
+# Embedding backend for new collections: "openai" or "hashed_ngram" (local CPU).
+# Existing collections are always queried with the backend they were built with.
+EMBEDDING_BACKEND = "openai"
+LOCAL_EMBEDDING_DIMENSION = 512
+
+# Condition classification
+# Local classifications below this confidence fall back to the LLM
+CLASSIFIER_CONFIDENCE_THRESHOLD = 0.7
+# Fewer matching keywords than this are only partial evidence for a type
+CLASSIFIER_MIN_KEYWORD_HITS = 2
+CLASSIFIER_CACHE_SIZE = 1024
+
+# Recommendation cache
+RECOMMENDATION_CACHE_SIZE = 512
+RECOMMENDATION_CACHE_TTL = 24 * 60 * 60  # seconds
+
+# Treatment-plan prompts are trimmed to this many tokens
+TREATMENT_PLAN_TOKEN_BUDGET = 1500
+
+# Semantic LLM response cache. The cosine similarity needed to serve a
+# stored response depends on the embedding backend: ada-002 scores even
+# unrelated medical texts around 0.8-0.9, so only near-paraphrases clear 0.98
+RESPONSE_CACHE_THRESHOLDS = {"openai": 0.98, "hashed_ngram": 0.95}
+RESPONSE_CACHE_THRESHOLD = 0.98  # backends not listed above
+RESPONSE_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+RESPONSE_CACHE_SIZE = 2000  # entries per namespace
+
+# Hybrid retrieval: Chroma and BM25 rankings fused by reciprocal rank
+HYBRID_RETRIEVAL = True
+HYBRID_VECTOR_RESULTS = 3  # vector hits requested per query
+HYBRID_LEXICAL_RESULTS = 10  # BM25 hits considered per query
+RRF_K = 60
+
+# Vector search backend: "chroma" (HNSW) or "memory" (exact NumPy search over
+# a memory-mapped snapshot of the collection in SNAPSHOT_DIR)
+VECTOR_INDEX = "chroma"
+SNAPSHOT_DIR = DB_DIR / "snapshot"
+# Snapshot embedding storage: "float32", "float16" or "int8", optionally
+# reduced by PCA to SNAPSHOT_PCA_DIMENSION (None keeps every dimension)
+SNAPSHOT_DTYPE = "float32"
+SNAPSHOT_PCA_DIMENSION = None
+
+# Local OpenAI stand-in (scripts/openai_standin.py): cassette of recorded
+# responses and the port it listens on
+STANDIN_CASSETTE = PROJECT_ROOT / "cassettes" / "openai.json"
+STANDIN_PORT = 8765
+
+# Blue/green ingestion: catalogs are built into versioned collections and
+# readers resolve SERVICES_COLLECTION through an alias file in DB_DIR
+SERVICES_COLLECTION = "medical_services"
+COLLECTION_ALIASES_FILE = "collection_aliases.json"
+PREVIOUS_COLLECTIONS_KEPT = 1  # earlier versions kept for rollback
+# A new version goes live only if at least this share of sampled services
+# retrieve themselves in the top 3 results
+VALIDATION_SAMPLES = 20
+VALIDATION_MIN_HIT_RATE = 0.8
+
+# Ingestion pipeline: batches embedded concurrently, then written through a
+# bounded queue; progress is checkpointed in DB_DIR so a build can resume
+INGEST_BATCH_SIZE = 100
+INGEST_CONCURRENCY = 4
+INGEST_QUEUE_SIZE = 8  # embedded batches waiting to be written
+INGEST_TOKENS_PER_MINUTE = 1_000_000  # OpenAI embedding rate limit; local backends are not limited
+INGEST_CHECKPOINT_FILE = "ingest_checkpoint.json"
+SERVICE_READ_CHUNK_SIZE = 5000  # service rows read from SQLite at a time
+
 # Database configuration
 CHROMA_COLLECTION = "medical_services_v2"
 MAX_RESULTS = 10
+SERVICE_QUERY_RESULTS = 3  # services retrieved per search query
+
+# Tracing spans always feed the in-process latency histograms; they are also
+# appended as JSON lines to the file named by MEDICAL_ADVISOR_TRACE_PATH, if set
+TRACE_PATH = os.getenv("MEDICAL_ADVISOR_TRACE_PATH") or None
+TRACING_ENABLED = True
+
+# Import-time budget enforced by scripts/check_import_time.py
+IMPORT_TIME_BUDGET_MS = 250
@@ -0,0 +1,117 @@
+"""On-disk embedding cache shared by the service manager and advisors."""
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from .tracing import tracer
+
+
+class EmbeddingCache:
+    """SQLite table of embeddings keyed by (model name, text hash)."""
+
+    def __init__(self, path: Path):
+        """Open (or create) the cache database at ``path``."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Hash a text so it can be used as a cache key."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        """Return cached embeddings for ``texts``, keyed by text."""
+        hashes = {self.text_hash(text): text for text in texts}
+        found = {}
+        keys = list(hashes)
+        with self._lock:
+            # Stay well under SQLite's bound parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT text_hash, embedding FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[hashes[text_hash]] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, texts: List[str], embeddings: Embeddings):
+        """Store embeddings for ``texts``."""
+        rows = [
+            (model, self.text_hash(text), array("f", [float(x) for x in embedding]).tobytes())
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, embedding) VALUES (?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
+    def count(self, model: Optional[str] = None) -> int:
+        """Count cached embeddings, optionally for a single model."""
+        with self._lock:
+            if model is None:
+                return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)
+            ).fetchone()[0]
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self.conn.close()
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Chroma embedding function that consults an EmbeddingCache first.
+
+    Only texts missing from the cache are sent to the wrapped function, in a
+    single batch, and their embeddings are written back to the cache.
+    """
+
+    def __init__(self, embedding_func: EmbeddingFunction, cache: EmbeddingCache, model_name: str):
+        self.embedding_func = embedding_func
+        self.cache = cache
+        self.model_name = model_name
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        cached = self.cache.get_many(self.model_name, texts)
+        missing = list(dict.fromkeys(text for text in texts if text not in cached))
+
+        if missing:
+            with tracer.span("embed", model=self.model_name, texts=len(missing)):
+                embeddings = self.embedding_func(missing)
+            self.cache.put_many(self.model_name, missing, embeddings)
+            cached.update(zip(missing, ([float(x) for x in e] for e in embeddings)))
+
+        return [cached[text] for text in texts]
+
+    def name(self) -> str:
+        # Report the wrapped function's name so persisted collection
+        # configurations keep matching.
+        return self.embedding_func.name()
+
+    def get_config(self) -> Dict:
+        return self.embedding_func.get_config()
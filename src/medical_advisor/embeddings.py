@@ -0,0 +1,128 @@
+"""Embedding backends that can be selected per collection."""
+
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from .config import EMBEDDING_MODEL, LOCAL_EMBEDDING_DIMENSION
+
+EMBEDDING_BACKENDS = ("openai", "hashed_ngram")
+
+# Output sizes of the hosted embedding models
+OPENAI_EMBEDDING_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072
+}
+
+
+class HashedNgramEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Local CPU embeddings built from hashed character n-grams.
+
+    Each word contributes its character n-grams (with word boundary
+    markers) and the word itself. Features are hashed into ``dimension``
+    signed buckets, weighted by log term frequency and L2-normalized. No
+    model files or network access are needed, and the output is identical
+    across processes.
+    """
+
+    def __init__(self, dimension: int = 512, ngram_range: tuple = (3, 5)):
+        self.dimension = int(dimension)
+        self.ngram_range = tuple(ngram_range)
+
+    @property
+    def model_name(self) -> str:
+        return f"hashed-ngram-{self.ngram_range[0]}-{self.ngram_range[1]}-{self.dimension}"
+
+    def _features(self, text: str) -> Counter:
+        features = Counter()
+        low, high = self.ngram_range
+        for word in re.findall(r"\w+", text.lower()):
+            features[word] += 1
+            padded = f"<{word}>"
+            for n in range(low, high + 1):
+                for i in range(len(padded) - n + 1):
+                    features[padded[i:i + n]] += 1
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a single text."""
+        features = self._features(text)
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        if not features:
+            return vector
+
+        hashes = np.fromiter(
+            (zlib.crc32(feature.encode("utf-8")) for feature in features),
+            dtype=np.uint32, count=len(features)
+        )
+        weights = 1.0 + np.log(np.fromiter(features.values(), dtype=np.float32, count=len(features)))
+        # The top bit picks the sign so colliding features tend to cancel
+        signs = np.where(hashes >> 31, 1.0, -1.0).astype(np.float32)
+        np.add.at(vector, hashes % self.dimension, signs * weights)
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return [self.embed(text) for text in input]
+
+    @staticmethod
+    def name() -> str:
+        return "hashed_ngram"
+
+    def get_config(self) -> Dict:
+        return {"dimension": self.dimension, "ngram_range": list(self.ngram_range)}
+
+    @staticmethod
+    def build_from_config(config: Dict) -> "HashedNgramEmbeddingFunction":
+        return HashedNgramEmbeddingFunction(
+            dimension=config.get("dimension", LOCAL_EMBEDDING_DIMENSION),
+            ngram_range=tuple(config.get("ngram_range", (3, 5)))
+        )
+
+
+def create_embedding_function(backend: str, api_key: str = None, cache=None,
+                              dimension: Optional[int] = None, base_url: Optional[str] = None):
+    """Build the embedding function for a backend.
+
+    OpenAI embeddings are served through ``cache`` (an EmbeddingCache) when
+    one is given, and requested from ``base_url`` when set (for example an
+    OpenAIStandIn). ``dimension`` only applies to local backends.
+    """
+    if backend == "openai":
+        from chromadb.utils import embedding_functions
+        embedding_func = embedding_functions.OpenAIEmbeddingFunction(
+            api_key=api_key,
+            model_name=EMBEDDING_MODEL,
+            api_base=base_url
+        )
+        if cache is None:
+            return embedding_func
+
+        from .embedding_cache import CachedEmbeddingFunction
+        return CachedEmbeddingFunction(embedding_func, cache, EMBEDDING_MODEL)
+
+    if backend == "hashed_ngram":
+        return HashedNgramEmbeddingFunction(dimension=dimension or LOCAL_EMBEDDING_DIMENSION)
+
+    raise ValueError(f"Unknown embedding backend: {backend}. Choose from {', '.join(EMBEDDING_BACKENDS)}")
+
+
+def embedding_metadata(backend: str, embedding_func) -> Dict:
+    """Collection metadata recording how a collection was embedded."""
+    if backend == "openai":
+        return {
+            "embedding_backend": backend,
+            "embedding_model": EMBEDDING_MODEL,
+            "embedding_dimension": OPENAI_EMBEDDING_DIMENSIONS.get(EMBEDDING_MODEL, 0)
+        }
+    return {
+        "embedding_backend": backend,
+        "embedding_model": embedding_func.model_name,
+        "embedding_dimension": embedding_func.dimension
+    }
@@ -0,0 +1,215 @@
+"""Concurrent embedding pipeline for loading services into a collection."""
+
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenRateLimiter:
+    """Token bucket shared by the embedding workers.
+
+    Up to a minute's worth of tokens can be spent at once; after that,
+    callers wait until the bucket refills at ``tokens_per_minute``.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int):
+        """Block until ``tokens`` may be spent."""
+        # A batch larger than the bucket waits for a full bucket, then overdraws it
+        needed = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.available >= needed:
+                    self.available -= tokens
+                    return
+                wait = (needed - self.available) / self.rate
+            time.sleep(wait)
+
+
+class IngestionCheckpoint:
+    """Services already written by an interrupted build, persisted as JSON lines.
+
+    A checkpoint belongs to one build, identified by ``key`` (for example
+    the catalog version and embedding model), and records the collection
+    being built and the IDs written to it. A checkpoint left by another
+    build is ignored; its collection is reported as ``abandoned``.
+
+    The first line holds the key and collection; each written batch
+    appends a line with its IDs, so recording a batch costs the same
+    however far the build has got.
+    """
+
+    def __init__(self, path: Path, key: Dict):
+        self.path = Path(path)
+        self.key = key
+        self.collection = None
+        self.abandoned = None
+        self.done = set()
+        if self.path.exists():
+            header, done = self._read()
+            if header.get("key") == key:
+                self.collection = header.get("collection")
+                self.done = done
+            else:
+                self.abandoned = header.get("collection")
+
+    def _read(self):
+        header = {}
+        done = set()
+        with open(self.path, encoding="utf-8") as f:
+            for number, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A batch line cut short by a crash; its batch is redone
+                    continue
+                if number == 0:
+                    header = record
+                done.update(record.get("done", []))
+        return header, done
+
+    def start(self, collection: str):
+        """Begin (or continue) checkpointing writes into ``collection``."""
+        if collection != self.collection:
+            self.collection = collection
+            self.done = set()
+        # Rewrite the log with everything done so far on one line
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"key": self.key, "collection": self.collection}) + "\n")
+            if self.done:
+                f.write(json.dumps({"done": sorted(self.done)}) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def mark(self, ids: List[str]):
+        """Record a written batch."""
+        self.done.update(ids)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"done": list(ids)}) + "\n")
+
+    def clear(self):
+        """Remove the checkpoint once the build has finished."""
+        if self.path.exists():
+            self.path.unlink()
+        self.collection = None
+        self.done = set()
+
+
+class IngestionPipeline:
+    """Embeds batches concurrently and writes them through a bounded queue.
+
+    Up to ``concurrency`` batches are embedded at once, subject to the
+    token rate limit. Embedded batches wait in a queue of ``queue_size``
+    for the single writer, so slow writes hold back embedding instead of
+    piling up memory. Failed embedding calls are retried with backoff.
+    With a checkpoint, services written earlier are skipped and every
+    written batch is recorded.
+    """
+
+    def __init__(self, embedding_func, batch_size: int = 100, concurrency: int = 4,
+                 tokens_per_minute: Optional[int] = None, queue_size: int = 8, max_retries: int = 3):
+        self.embedding_func = embedding_func
+        self.batch_size = batch_size
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = TokenRateLimiter(tokens_per_minute) if tokens_per_minute else None
+        self.queue_size = max(1, queue_size)
+        self.max_retries = max_retries
+
+    def _embed(self, documents: List[str]):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(sum(estimate_tokens(doc) for doc in documents))
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.embedding_func(documents)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = 2 ** attempt
+                print(f"Embedding batch failed ({e}); retrying in {delay}s")
+                time.sleep(delay)
+
+    def run(self, write: Callable, ids: List[str], documents: List[str], metadatas: List[Dict],
+            checkpoint: IngestionCheckpoint = None, action: str = "Adding") -> Dict:
+        """Embed and write every batch with ``write`` (e.g. ``collection.add``).
+
+        ``write`` is called from this thread with ids, embeddings, documents
+        and metadatas. Returns counts and timing for the run.
+        """
+        done = checkpoint.done if checkpoint is not None else set()
+        pending = [i for i, service_id in enumerate(ids) if service_id not in done]
+        if len(pending) < len(ids):
+            print(f"Resuming: {len(ids) - len(pending)} of {len(ids)} services already written")
+        batches = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+
+        results = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def embed_batch(batch):
+            if stop.is_set():
+                return
+            try:
+                item = (batch, self._embed([documents[i] for i in batch]), None)
+            except Exception as e:
+                item = (batch, None, e)
+            # Wait for room in the queue unless the writer has given up
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        began = time.perf_counter()
+        written = 0
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="embed")
+        try:
+            for batch in batches:
+                pool.submit(embed_batch, batch)
+
+            for number in range(1, len(batches) + 1):
+                batch, embeddings, error = results.get()
+                if error is not None:
+                    raise error
+                batch_ids = [ids[i] for i in batch]
+                write(
+                    ids=batch_ids,
+                    embeddings=embeddings,
+                    documents=[documents[i] for i in batch],
+                    metadatas=[metadatas[i] for i in batch]
+                )
+                if checkpoint is not None:
+                    checkpoint.mark(batch_ids)
+                written += len(batch)
+                elapsed = time.perf_counter() - began
+                print(f"{action} batch {number}/{len(batches)} ({written}/{len(pending)} services, "
+                      f"{written / elapsed:.0f} services/s)")
+        finally:
+            stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        return {
+            "batches": len(batches),
+            "skipped": len(ids) - len(pending),
+            "services": written,
+            "seconds": time.perf_counter() - began
+        }
@@ -0,0 +1,244 @@
+"""Lexical (BM25) retrieval over service codes and descriptions."""
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .tracing import tracer
+
+# Words too common in search queries to be worth matching on
+_STOPWORDS = {"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"}
+
+# SQL comparison for each Chroma where operator
+_SQL_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+_FIELD_NAME = re.compile(r"^\w+$")
+
+
+class ServiceLexicalIndex:
+    """SQLite FTS5 index over service codes and descriptions.
+
+    Rows carry the Chroma ID and metadata of each service, so lexical hits
+    have the same shape as vector results. The index records the catalog
+    version it was built from.
+    """
+
+    def __init__(self, path: Path):
+        """Open (or create) the index database at ``path``."""
+        # Imported here so importing the advisor stays cheap
+        import sqlite3
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5(
+                id UNINDEXED,
+                code,
+                description,
+                metadata UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        """)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS index_info (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+    def rebuild(self, ids: List[str], metadatas: List[Dict], catalog_version: str):
+        """Replace the index contents with the given services."""
+        self.rebuild_batches([(ids, metadatas)], catalog_version)
+
+    def rebuild_batches(self, batches: Iterable[Tuple[List[str], List[Dict]]], catalog_version: str):
+        """Replace the index contents with services given as (ids, metadatas) batches.
+
+        The batches are written in one transaction, so searches see either
+        the old contents or the new ones.
+        """
+        with self._lock:
+            try:
+                self.conn.execute("DELETE FROM services_fts")
+                for ids, metadatas in batches:
+                    self.conn.executemany(
+                        "INSERT INTO services_fts (id, code, description, metadata) VALUES (?, ?, ?, ?)",
+                        [
+                            (service_id, meta.get("code", ""), meta.get("description", ""), json.dumps(meta))
+                            for service_id, meta in zip(ids, metadatas)
+                        ]
+                    )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO index_info (key, value) VALUES ('catalog_version', ?)",
+                    (catalog_version,)
+                )
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    @property
+    def catalog_version(self) -> Optional[str]:
+        """Catalog version the index was built from."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM index_info WHERE key = 'catalog_version'"
+            ).fetchone()
+        return row[0] if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM services_fts").fetchone()[0]
+
+    @staticmethod
+    def to_match_query(text: str) -> Optional[str]:
+        """Turn free text into an FTS5 OR query; longer terms also match as prefixes."""
+        terms = []
+        for word in re.findall(r"\w+", text.lower()):
+            if len(word) < 2 or word in _STOPWORDS:
+                continue
+            term = f'"{word}"*' if len(word) >= 3 else f'"{word}"'
+            if term not in terms:
+                terms.append(term)
+        return " OR ".join(terms) if terms else None
+
+    @classmethod
+    def _where_sql(cls, where: Dict) -> Tuple[str, List]:
+        """Translate a Chroma-style ``where`` filter into SQL over the stored metadata.
+
+        Supports the same operators as InMemoryServiceIndex: equality,
+        ``$ne``, ``$gt``/``$gte``/``$lt``/``$lte``, ``$in``/``$nin``,
+        ``$and`` and ``$or``.
+        """
+        clauses = []
+        params = []
+        for key, value in where.items():
+            if key in ("$and", "$or"):
+                parts = [cls._where_sql(clause) for clause in value]
+                joiner = " AND " if key == "$and" else " OR "
+                clauses.append("(" + joiner.join(sql for sql, _ in parts) + ")")
+                for _, part_params in parts:
+                    params.extend(part_params)
+                continue
+
+            if not _FIELD_NAME.match(key):
+                raise ValueError(f"Unsupported where field: {key}")
+            field = f"json_extract(metadata, '$.{key}')"
+            condition = value if isinstance(value, dict) else {"$eq": value}
+            for op, operand in condition.items():
+                if op in _SQL_OPERATORS:
+                    clauses.append(f"{field} {_SQL_OPERATORS[op]} ?")
+                    params.append(operand)
+                elif op in ("$in", "$nin"):
+                    operand = list(operand)
+                    if not operand:
+                        clauses.append("0" if op == "$in" else "1")
+                        continue
+                    negate = "NOT " if op == "$nin" else ""
+                    clauses.append(f"{field} {negate}IN ({', '.join('?' * len(operand))})")
+                    params.extend(operand)
+                else:
+                    raise ValueError(f"Unsupported where operator: {op}")
+        return " AND ".join(clauses) or "1", params
+
+    def search(self, text: str, limit: int = 10, where: Dict = None) -> List[Tuple[str, Dict, float]]:
+        """Return (id, metadata, bm25 score) for the best matches, best first.
+
+        Code matches are weighted above description matches. Lower BM25
+        scores are better, as in SQLite. ``where`` restricts matches by
+        metadata, using the same filter syntax as ``collection.query``.
+        """
+        match_query = self.to_match_query(text)
+        if match_query is None:
+            return []
+        filter_sql, filter_params = self._where_sql(where) if where else ("1", [])
+        with tracer.span("lexical_search", limit=limit, filtered=where is not None) as span:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT id, metadata, bm25(services_fts, 0.0, 2.0, 1.0, 0.0) AS score "
+                    f"FROM services_fts WHERE services_fts MATCH ? AND {filter_sql} ORDER BY score LIMIT ?",
+                    (match_query, *filter_params, limit)
+                ).fetchall()
+            span.set(results=len(rows))
+        return [(service_id, json.loads(metadata), score) for service_id, metadata, score in rows]
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self.conn.close()
+
+
+class HybridRetriever:
+    """Collection wrapper that fuses vector and BM25 rankings.
+
+    ``query`` takes the same arguments as ``collection.query`` and ranks
+    services per query text by reciprocal rank fusion of the Chroma
+    results and the lexical index hits. A ``where`` filter is applied to
+    both sides. Any other attribute is read from the wrapped collection.
+    """
+
+    def __init__(self, collection, lexical_index: ServiceLexicalIndex,
+                 vector_results: int = 3, lexical_results: int = 10, rrf_k: int = 60):
+        self.collection = collection
+        self.lexical_index = lexical_index
+        self.vector_results = vector_results
+        self.lexical_results = lexical_results
+        self.rrf_k = rrf_k
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def query(self, query_texts: List[str], n_results: int = 10, include: List[str] = None,
+              where: Dict = None, **kwargs) -> Dict:
+        """Fused top ``n_results`` for each query text, in Chroma's result layout.
+
+        ``include`` works as for ``collection.query``. Distances are one
+        minus the fused score, so lower is better, but they are not
+        comparable with vector distances. Documents and embeddings are
+        fetched from the wrapped collection for the fused IDs.
+        """
+        include = ["metadatas", "distances"] if include is None else include
+        if where:
+            kwargs["where"] = where
+        vector = self.collection.query(
+            query_texts=query_texts,
+            n_results=min(n_results, self.vector_results),
+            include=["metadatas"],
+            **kwargs
+        )
+
+        fused_ids = []
+        fused_scores = []
+        metadatas = {}
+        for i, text in enumerate(query_texts):
+            scores = {}
+            for rank, (service_id, meta) in enumerate(zip(vector["ids"][i], vector["metadatas"][i])):
+                scores[service_id] = scores.get(service_id, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+                metadatas[service_id] = meta
+            for rank, (service_id, meta, _) in enumerate(self.lexical_index.search(text, self.lexical_results, where)):
+                scores[service_id] = scores.get(service_id, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+                metadatas.setdefault(service_id, meta)
+
+            ranked = sorted(scores, key=scores.get, reverse=True)[:n_results]
+            fused_ids.append(ranked)
+            fused_scores.append([scores[service_id] for service_id in ranked])
+
+        result = {"ids": fused_ids}
+        if "metadatas" in include:
+            result["metadatas"] = [[metadatas[service_id] for service_id in ranked] for ranked in fused_ids]
+        if "distances" in include:
+            result["distances"] = [[1.0 - score for score in scores] for scores in fused_scores]
+
+        stored_fields = [field for field in include if field in ("documents", "embeddings")]
+        if stored_fields:
+            wanted = sorted({service_id for ranked in fused_ids for service_id in ranked})
+            stored = self.collection.get(ids=wanted, include=stored_fields) if wanted else {"ids": []}
+            for field in stored_fields:
+                if not wanted:
+                    result[field] = [[] for _ in fused_ids]
+                    continue
+                values = stored.get(field)
+                if values is None:
+                    continue
+                by_id = dict(zip(stored["ids"], values))
+                result[field] = [[by_id.get(service_id) for service_id in ranked] for ranked in fused_ids]
+        return result
@@ -0,0 +1,334 @@
+"""Local OpenAI-compatible stand-in that records and replays API traffic.
+
+In record mode requests are forwarded to the real API and the responses
+written to a cassette file. In replay mode responses are served from the
+cassette only, with synthetic latency, so consultations can run without a
+key or network access. Point a client at ``OpenAIStandIn.base_url`` (or set
+``OPENAI_BASE_URL``) to use it.
+"""
+
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+STANDIN_MODES = ("record", "replay")
+
+# Request fields that change a chat completion; everything else (stream,
+# user, ...) is ignored when matching recorded responses
+_CHAT_KEY_FIELDS = ("model", "messages", "temperature", "top_p", "max_tokens", "n", "stop",
+                    "presence_penalty", "frequency_penalty", "response_format", "tools", "tool_choice", "seed")
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _encode_vector(vector) -> str:
+    return base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode("ascii")
+
+
+def _decode_vector(data: str) -> List[float]:
+    return np.frombuffer(base64.b64decode(data), dtype="<f4").tolist()
+
+
+class Cassette:
+    """Recorded chat completions and embeddings, stored as one JSON file.
+
+    Chat completions are keyed by a hash of the request fields that affect
+    the answer. Embeddings are stored per input text, so replayed batches
+    do not have to match the batches that were recorded.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.chat = {}
+        self.embeddings = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.chat = data.get("chat", {})
+            self.embeddings = data.get("embeddings", {})
+
+    @staticmethod
+    def chat_key(request: Dict) -> str:
+        return _digest({field: request[field] for field in _CHAT_KEY_FIELDS if field in request})
+
+    @staticmethod
+    def embedding_key(model: str, text: str) -> str:
+        return _digest([model, text])
+
+    def get_chat(self, request: Dict) -> Optional[Dict]:
+        with self._lock:
+            return self.chat.get(self.chat_key(request))
+
+    def put_chat(self, request: Dict, response: Dict):
+        with self._lock:
+            self.chat[self.chat_key(request)] = response
+
+    def get_embedding(self, model: str, text: str) -> Optional[List[float]]:
+        with self._lock:
+            data = self.embeddings.get(self.embedding_key(model, text))
+        return _decode_vector(data) if data is not None else None
+
+    def put_embedding(self, model: str, text: str, vector):
+        with self._lock:
+            self.embeddings[self.embedding_key(model, text)] = _encode_vector(vector)
+
+    def save(self):
+        """Write the cassette atomically."""
+        with self._lock:
+            data = {"chat": self.chat, "embeddings": self.embeddings}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            tmp_path.replace(self.path)
+
+    def __len__(self) -> int:
+        return len(self.chat) + len(self.embeddings)
+
+
+class OpenAIStandIn:
+    """HTTP server implementing ``/v1/chat/completions`` and ``/v1/embeddings``.
+
+    ``latency_ms`` is added to every response, plus up to ``jitter_ms`` of
+    seeded random delay. Streamed completions are sent in word-sized chunks
+    spaced ``token_latency_ms`` apart. In record mode responses already on
+    the cassette are served without calling ``upstream_url``.
+    """
+
+    def __init__(self, cassette: Cassette, mode: str = "replay", api_key: str = None,
+                 upstream_url: str = "https://api.openai.com/v1", host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, token_latency_ms: float = 0.0,
+                 seed: int = 0):
+        if mode not in STANDIN_MODES:
+            raise ValueError(f"Unknown stand-in mode: {mode}. Choose from {', '.join(STANDIN_MODES)}")
+        if mode == "record" and not api_key:
+            raise ValueError("Record mode needs an API key for the upstream API")
+        self.cassette = cassette
+        self.mode = mode
+        self.api_key = api_key
+        self.upstream_url = upstream_url.rstrip("/")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.token_latency_ms = token_latency_ms
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._http = None
+        self._thread = None
+        self.stats = {"requests": 0, "recorded": 0, "replayed": 0, "misses": 0}
+
+        standin = self
+
+        class Handler(_Handler):
+            server_standin = standin
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "OpenAIStandIn":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        """Stop serving and, in record mode, save the cassette."""
+        self.server.shutdown()
+        self.server.server_close()
+        if self._http is not None:
+            self._http.close()
+        if self.mode == "record":
+            self.cassette.save()
+
+    def __enter__(self) -> "OpenAIStandIn":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _upstream(self, endpoint: str, body: Dict) -> Dict:
+        """Forward a request to the real API and return its JSON response."""
+        import httpx
+
+        if self._http is None:
+            self._http = httpx.Client(timeout=httpx.Timeout(60.0, connect=10.0))
+        response = self._http.post(
+            f"{self.upstream_url}/{endpoint}",
+            json=body,
+            headers={"Authorization": f"Bearer {self.api_key}"}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def delay(self):
+        """Sleep for the configured base latency and jitter."""
+        with self._random_lock:
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        if self.latency_ms or jitter:
+            time.sleep((self.latency_ms + jitter) / 1000)
+
+    def chat_completion(self, request: Dict) -> Dict:
+        """Recorded response for a chat completion request."""
+        response = self.cassette.get_chat(request)
+        if response is not None:
+            self.stats["replayed"] += 1
+            return response
+        if self.mode == "replay":
+            self.stats["misses"] += 1
+            raise CassetteMiss("chat completion not on cassette")
+
+        body = {k: v for k, v in request.items() if k not in ("stream", "stream_options")}
+        response = self._upstream("chat/completions", body)
+        self.cassette.put_chat(request, response)
+        self.stats["recorded"] += 1
+        return response
+
+    def embeddings(self, request: Dict) -> Dict:
+        """Embeddings for every input text, recording the ones not yet on the cassette."""
+        model = request.get("model", "")
+        texts = request["input"]
+        if isinstance(texts, str):
+            texts = [texts]
+        if texts and not isinstance(texts[0], str):
+            raise ValueError("Token-array inputs are not supported")
+
+        vectors = [self.cassette.get_embedding(model, text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.stats["replayed"] += len(texts) - len(missing)
+        if missing and self.mode == "replay":
+            self.stats["misses"] += len(missing)
+            raise CassetteMiss(f"{len(missing)} embedding inputs not on cassette")
+
+        if missing:
+            body = {k: v for k, v in request.items() if k != "encoding_format"}
+            body["input"] = [texts[i] for i in missing]
+            response = self._upstream("embeddings", body)
+            for item in response["data"]:
+                i = missing[item["index"]]
+                vectors[i] = item["embedding"]
+                self.cassette.put_embedding(model, texts[i], item["embedding"])
+            self.stats["recorded"] += len(missing)
+
+        as_base64 = request.get("encoding_format") == "base64"
+        tokens = sum(len(text.split()) for text in texts)
+        return {
+            "object": "list",
+            "data": [
+                {
+                    "object": "embedding",
+                    "index": i,
+                    "embedding": _encode_vector(vector) if as_base64 else vector
+                }
+                for i, vector in enumerate(vectors)
+            ],
+            "model": model,
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_standin: OpenAIStandIn = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, error_type: str):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": None}})
+
+    def _send_stream(self, response: Dict):
+        """Replay a completion as server-sent events, one word per chunk."""
+        standin = self.server_standin
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        choice = response["choices"][0]
+        content = choice["message"].get("content") or ""
+        pieces = content.split(" ")
+        pieces = [piece + " " for piece in pieces[:-1]] + pieces[-1:]
+        base = {k: response.get(k) for k in ("id", "created", "model")}
+        base["object"] = "chat.completion.chunk"
+
+        def send(delta: Dict, finish_reason=None):
+            chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send({"role": "assistant", "content": ""})
+        for piece in pieces:
+            if standin.token_latency_ms:
+                time.sleep(standin.token_latency_ms / 1000)
+            send({"content": piece})
+        send({}, choice.get("finish_reason") or "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        standin = self.server_standin
+        standin.stats["requests"] += 1
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_error(400, "Request body is not valid JSON", "invalid_request_error")
+            return
+
+        path = self.path.split("?", 1)[0].rstrip("/")
+        try:
+            if path.endswith("/chat/completions"):
+                response = standin.chat_completion(request)
+            elif path.endswith("/embeddings"):
+                response = standin.embeddings(request)
+            else:
+                self._send_error(404, f"Unknown endpoint: {self.path}", "invalid_request_error")
+                return
+        except CassetteMiss as e:
+            self._send_error(404, f"Cassette miss: {e}", "cassette_miss")
+            return
+        except Exception as e:
+            print(f"Stand-in error on {self.path}: {e}")
+            self._send_error(502, str(e), "upstream_error")
+            return
+
+        standin.delay()
+        if request.get("stream") and path.endswith("/chat/completions"):
+            self._send_stream(response)
+        else:
+            if path.endswith("/chat/completions") and standin.token_latency_ms:
+                completion_tokens = (response.get("usage") or {}).get("completion_tokens", 0)
+                time.sleep(completion_tokens * standin.token_latency_ms / 1000)
+            self._send_json(200, response)
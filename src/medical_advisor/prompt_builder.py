@@ -0,0 +1,145 @@
+"""Token-budgeted prompt construction for treatment-plan generation."""
+
+from typing import Dict, List, Tuple
+
+CATEGORY_HEADINGS = {
+    "diagnostic": "Diagnostic Tests (in order of priority):",
+    "treatment": "Treatments (in order of priority):",
+    "monitoring": "Monitoring Services (in order of priority):"
+}
+
+
+class TreatmentPlanPromptBuilder:
+    """Build treatment-plan prompts that fit within a token budget.
+
+    The fixed instructions come first so every prompt shares the same
+    prefix. Services are then added category by category in round-robin
+    order of ``relevance_score`` until the budget is reached.
+    """
+
+    def __init__(self, token_budget: int = 1500, model: str = "gpt-3.5-turbo"):
+        self.token_budget = token_budget
+        self.encoding = None
+        try:
+            import tiktoken
+            self.encoding = tiktoken.encoding_for_model(model)
+        except ImportError:
+            pass  # Fall back to a character-based estimate
+        except Exception as e:
+            print(f"Falling back to estimated token counts: {e}")
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens locally, estimating when tiktoken is unavailable."""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return (len(text) + 3) // 4
+
+    def _count_messages(self, messages: List[Dict]) -> int:
+        # Each chat message carries a few tokens of framing
+        return sum(self.count_tokens(m["content"]) + 4 for m in messages) + 3
+
+    @staticmethod
+    def _service_line(service: Dict) -> str:
+        return f"\n- {service['description']} ({service['department']}) - KSH {service['price']:,.2f}"
+
+    @staticmethod
+    def _totals(services: Dict, selected: Dict[str, List[Dict]]) -> Tuple[float, List[str]]:
+        """Total cost and departments of the selected services.
+
+        The recommendation total includes a base charge on top of the
+        service prices; it is kept, and the dropped services are taken off.
+        """
+        categories = services.get("categories", {})
+        recommended = [service for category in categories.values() for service in category]
+        kept = [service for category in selected.values() for service in category]
+        base_cost = services.get("total_cost", 0.0) - sum(service["price"] for service in recommended)
+        departments = sorted({service["department"] for service in kept})
+        return base_cost + sum(service["price"] for service in kept), departments
+
+    def _render(self, condition: str, budget_level: str, total_cost: float, departments: List[str],
+                selected: Dict[str, List[Dict]]) -> List[Dict]:
+        service_summary = "\nRecommended Medical Services:"
+        for category, heading in CATEGORY_HEADINGS.items():
+            if selected.get(category):
+                service_summary += f"\n\n{heading}"
+                for service in selected[category]:
+                    service_summary += self._service_line(service)
+
+        return [
+            {"role": "system", "content": f"""You are a medical expert creating a treatment plan.
+            Create a treatment plan for the stated budget level that includes:
+            1. Essential diagnostic tests (start with basic tests before advanced imaging)
+            2. Recommended treatments (prioritize cost-effective options)
+            3. Required monitoring and follow-up
+            4. Timeline for all services
+            5. Cost-saving suggestions
+            6. Important precautions
+
+            Format your response in clear sections with bullet points.
+            Focus on essential services and cost-effective options first.Be thorough,remember that nothing can hav a cost of 0, if you see 0, use your own wisdom and decide a figure
+
+            Budget level: {budget_level}
+            Total estimated cost: KSH {total_cost:,.2f}
+            Departments involved: {', '.join(departments)}
+
+            Consider these available services:{service_summary}"""},
+            {"role": "user", "content": f"Create a {budget_level} budget treatment plan for: {condition}"}
+        ]
+
+    def build(self, condition: str, budget_level: str, services: Dict) -> Tuple[List[Dict], Dict]:
+        """Build the prompt messages and a report of what was dropped.
+
+        Recommendations without ``categories``, such as an ``error`` result,
+        give a prompt that lists no services.
+        """
+        categories = services.get("categories", {})
+        ranked = {
+            category: sorted(
+                categories.get(category, []),
+                key=lambda s: s.get("relevance_score", 0),
+                reverse=True
+            )
+            for category in CATEGORY_HEADINGS
+        }
+        selected = {category: [] for category in CATEGORY_HEADINGS}
+
+        # Tokens used by everything except the service lines; the untrimmed
+        # total and departments are never shorter than the trimmed ones
+        used = self._count_messages(self._render(
+            condition, budget_level, services.get("total_cost", 0.0), services.get("departments", []),
+            selected
+        ))
+        full = set()
+
+        # Take the best remaining service of each category in turn, so every
+        # category keeps its highest scoring services
+        depth = max((len(s) for s in ranked.values()), default=0)
+        for i in range(depth):
+            for category, candidates in ranked.items():
+                if category in full or i >= len(candidates):
+                    continue
+                cost = self.count_tokens(self._service_line(candidates[i]))
+                if not selected[category]:
+                    cost += self.count_tokens(f"\n\n{CATEGORY_HEADINGS[category]}")
+                if used + cost > self.token_budget:
+                    full.add(category)
+                    continue
+                selected[category].append(candidates[i])
+                used += cost
+
+        total_cost, departments = self._totals(services, selected)
+        messages = self._render(condition, budget_level, total_cost, departments, selected)
+        dropped = {
+            category: len(ranked[category]) - len(selected[category])
+            for category in CATEGORY_HEADINGS
+        }
+        report = {
+            "token_budget": self.token_budget,
+            "prompt_tokens": self._count_messages(messages),
+            "services_included": sum(len(s) for s in selected.values()),
+            "services_dropped": sum(dropped.values()),
+            "dropped_by_category": dropped
+        }
+        if report["services_dropped"]:
+            print(f"Prompt budget of {self.token_budget} tokens dropped {report['services_dropped']} services")
+        return messages, report
@@ -0,0 +1,102 @@
+"""Materialized cache of service recommendations."""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class RecommendationCache:
+    """SQLite store of recommendation results with TTL and LRU eviction.
+
+    Entries are keyed by (condition type, budget level, catalog version), so
+    a rebuilt catalog never serves recommendations computed from the old one.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 512, ttl_seconds: float = 86400):
+        """Open (or create) the cache database at ``path``."""
+        # Imported here so importing the advisor stays cheap
+        import sqlite3
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS recommendations (
+                condition_type TEXT NOT NULL,
+                budget_level TEXT NOT NULL,
+                catalog_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (condition_type, budget_level, catalog_version)
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, condition_type: str, budget_level: str, catalog_version: str) -> Optional[Dict]:
+        """Return a cached result, or None if missing or expired."""
+        key = (condition_type, budget_level, catalog_version)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT result, created_at FROM recommendations "
+                "WHERE condition_type = ? AND budget_level = ? AND catalog_version = ?",
+                key
+            ).fetchone()
+            if row is None:
+                return None
+
+            result, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self.conn.execute(
+                    "DELETE FROM recommendations "
+                    "WHERE condition_type = ? AND budget_level = ? AND catalog_version = ?",
+                    key
+                )
+                self.conn.commit()
+                return None
+
+            self.conn.execute(
+                "UPDATE recommendations SET last_access = ? "
+                "WHERE condition_type = ? AND budget_level = ? AND catalog_version = ?",
+                (now, *key)
+            )
+            self.conn.commit()
+        return json.loads(result)
+
+    def put(self, condition_type: str, budget_level: str, catalog_version: str, result: Dict):
+        """Store a result, evicting least recently used entries over the limit."""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO recommendations "
+                "(condition_type, budget_level, catalog_version, result, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (condition_type, budget_level, catalog_version, json.dumps(result), now, now)
+            )
+            self.conn.execute(
+                "DELETE FROM recommendations WHERE rowid NOT IN ("
+                "SELECT rowid FROM recommendations ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+
+    def clear(self):
+        """Drop every cached recommendation."""
+        with self._lock:
+            self.conn.execute("DELETE FROM recommendations")
+            self.conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self.conn.close()
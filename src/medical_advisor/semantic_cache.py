@@ -0,0 +1,222 @@
+"""Semantic cache for LLM responses to near-identical inputs."""
+
+import re
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Words that flip or qualify the meaning of the word after them. Inputs that
+# differ in these can embed almost identically ("chest pain" / "no chest pain")
+_NEGATIONS = {"no", "not", "never", "without", "none", "denies", "deny", "nothing", "neither", "nor",
+              "cannot", "cant", "dont", "doesnt", "didnt", "isnt", "wasnt", "arent", "werent",
+              "havent", "hasnt", "hadnt", "wont", "couldnt", "shouldnt", "wouldnt"}
+_ANSWERS = {"yes", "no", "maybe", "unsure", "true", "false"}
+
+
+class SemanticCache:
+    """SQLite-backed cache that matches inputs by embedding similarity.
+
+    Inputs are normalized and embedded; a stored response is served when
+    its input has cosine similarity of at least ``threshold`` with the new
+    one and both contain the same negations, answers and numbers (each
+    with the word after it), since those change the meaning without
+    moving the embedding much. With ``exact`` only an identical normalized
+    input matches, for inputs such as questionnaires where no
+    near-duplicate is safe to serve. A good ``threshold`` depends on the
+    embedding model (see RESPONSE_CACHE_THRESHOLDS). Entries expire after
+    ``ttl_seconds`` and the least recently used ones are evicted beyond
+    ``max_entries`` per namespace. Entries are kept apart per
+    ``model_name`` so embeddings from different backends are never
+    compared.
+    """
+
+    def __init__(self, path: Path, embedding_func, threshold: float = 0.95,
+                 ttl_seconds: float = 7 * 24 * 60 * 60, max_entries: int = 2000,
+                 model_name: str = None):
+        """Open (or create) the cache database at ``path``."""
+        # Imported here so importing the advisor stays cheap
+        import sqlite3
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.embedding_func = embedding_func
+        self.model_name = model_name
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._index = {}  # namespace -> (row ids, normalized embedding matrix, guard tokens)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                id INTEGER PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                input TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_namespace ON responses (namespace)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_input ON responses (namespace, input)")
+        self.conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace."""
+        text = re.sub(r"[^\w\s]", " ", text.lower())
+        return re.sub(r"\s+", " ", text).strip()
+
+    @staticmethod
+    def guard_tokens(normalized: str) -> Tuple:
+        """Negations, answers and numbers in a normalized input, each paired with the next word."""
+        # Normalizing splits contractions ("don't" -> "don t"); join them again
+        words = re.sub(r"\b(\w+n) t\b", r"\1t", normalized).split()
+        guards = [
+            (word, words[i + 1] if i + 1 < len(words) else "")
+            for i, word in enumerate(words)
+            if word in _NEGATIONS or word in _ANSWERS or any(ch.isdigit() for ch in word)
+        ]
+        return tuple(sorted(guards))
+
+    def _namespace(self, namespace: str) -> str:
+        return f"{self.model_name}/{namespace}" if self.model_name else namespace
+
+    def _embed(self, text: str) -> "np.ndarray":
+        import numpy as np
+
+        vector = np.asarray(self.embedding_func([text])[0], dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def _load_index(self, namespace: str):
+        """Load a namespace's embeddings into memory (lock must be held).
+
+        Exact-only entries are stored without an embedding and left out.
+        """
+        import numpy as np
+
+        if namespace in self._index:
+            return
+        self.conn.execute(
+            "DELETE FROM responses WHERE namespace = ? AND created_at < ?",
+            (namespace, time.time() - self.ttl_seconds)
+        )
+        self.conn.commit()
+        rows = self.conn.execute(
+            "SELECT id, embedding, input FROM responses WHERE namespace = ? AND length(embedding) > 0",
+            (namespace,)
+        ).fetchall()
+        ids = [row[0] for row in rows]
+        matrix = (
+            np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+            if rows else None
+        )
+        guards = [self.guard_tokens(row[2]) for row in rows]
+        self._index[namespace] = (ids, matrix, guards)
+
+    def _serve(self, row_id: int, now: float) -> Optional[str]:
+        """Response of a stored entry unless it expired (lock must be held)."""
+        row = self.conn.execute(
+            "SELECT response, created_at FROM responses WHERE id = ?", (row_id,)
+        ).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            return None
+        self.conn.execute("UPDATE responses SET last_access = ? WHERE id = ?", (now, row_id))
+        self.conn.commit()
+        self.hits += 1
+        return row[0]
+
+    def get(self, namespace: str, text: str, exact: bool = False) -> Optional[str]:
+        """Return the stored response for the most similar matching input, if close enough."""
+        namespace = self._namespace(namespace)
+        normalized = self.normalize(text)
+        now = time.time()
+        if exact:
+            with self._lock:
+                row = self.conn.execute(
+                    "SELECT id FROM responses WHERE namespace = ? AND input = ? ORDER BY created_at DESC LIMIT 1",
+                    (namespace, normalized)
+                ).fetchone()
+                response = self._serve(row[0], now) if row is not None else None
+                if response is None:
+                    self.misses += 1
+            return response
+
+        import numpy as np
+
+        query = self._embed(normalized)
+        guards = self.guard_tokens(normalized)
+        with self._lock:
+            self._load_index(namespace)
+            ids, matrix, stored_guards = self._index[namespace]
+            if matrix is not None:
+                similarities = matrix @ query
+                # Most similar first, skipping inputs that differ in negations or numbers
+                for best in np.argsort(-similarities):
+                    if similarities[best] < self.threshold:
+                        break
+                    if stored_guards[best] != guards:
+                        continue
+                    response = self._serve(ids[best], now)
+                    if response is not None:
+                        return response
+            self.misses += 1
+        return None
+
+    def put(self, namespace: str, text: str, response: str, exact: bool = False):
+        """Store a response, evicting least recently used entries over the limit.
+
+        Entries stored with ``exact`` are not embedded and only served to
+        ``get(..., exact=True)``.
+        """
+        namespace = self._namespace(namespace)
+        normalized = self.normalize(text)
+        vector = None if exact else self._embed(normalized)
+        now = time.time()
+        with self._lock:
+            self._load_index(namespace)
+            cursor = self.conn.execute(
+                "INSERT INTO responses (namespace, input, embedding, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, normalized, b"" if vector is None else vector.tobytes(), response, now, now)
+            )
+            evicted = self.conn.execute(
+                "DELETE FROM responses WHERE namespace = ? AND id NOT IN ("
+                "SELECT id FROM responses WHERE namespace = ? ORDER BY last_access DESC LIMIT ?)",
+                (namespace, namespace, self.max_entries)
+            ).rowcount
+            self.conn.commit()
+
+            if evicted:
+                # Reload so the in-memory index matches the table
+                del self._index[namespace]
+                self._load_index(namespace)
+            elif vector is not None:
+                import numpy as np
+
+                row_id = cursor.lastrowid
+                ids, matrix, guards = self._index[namespace]
+                matrix = vector[None, :] if matrix is None else np.vstack([matrix, vector])
+                self._index[namespace] = (ids + [row_id], matrix, guards + [self.guard_tokens(normalized)])
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self.conn.close()
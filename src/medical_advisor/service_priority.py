@@ -1,6 +1,30 @@
 """Service priority categorization with improved oxygen service handling."""
 
-from typing import Dict
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+
+def _compile_keyword_matcher(service_keywords: Dict) -> Tuple:
+    """Compile every keyword into one regex that reports all category hits.
+
+    The alternation sits inside a lookahead so matches may overlap, and each
+    keyword also maps to the categories of any keyword that is a prefix of
+    it. One scan therefore finds every keyword that occurs as a substring.
+    """
+    keyword_categories = {}
+    for category, keywords in service_keywords.items():
+        for kw in keywords:
+            keyword_categories.setdefault(kw, set()).add(category)
+    
+    hits = {
+        kw: frozenset().union(*(
+            cats for other, cats in keyword_categories.items() if kw.startswith(other)
+        ))
+        for kw in keyword_categories
+    }
+    alternation = "|".join(re.escape(kw) for kw in sorted(hits, key=len, reverse=True))
+    return re.compile(f"(?=({alternation}))"), hits
+
 
 class ServicePriority:
     # Keywords for different service types
@@ -35,6 +59,9 @@ class ServicePriority:
         ]
     }
     
+    # Compiled once; see match_categories
+    _KEYWORD_MATCHER = _compile_keyword_matcher(SERVICE_KEYWORDS)
+    
     # Price thresholds for different service levels
     PRICE_THRESHOLDS = {
         "basic": 500,    # Basic services up to 500 KSH
@@ -42,33 +69,65 @@ class ServicePriority:
         "advanced": float('inf')  # Advanced services (no limit)
     }
     
+    @classmethod
+    def build_where(cls, budget_level: str = None, departments: List[str] = None) -> Optional[Dict]:
+        """Translate a budget level and department allow-list into a metadata filter.
+        
+        Returns a Chroma ``where`` clause, or None when nothing is filtered.
+        Only "advanced" (or no budget level) leaves prices uncapped; any
+        other level not in PRICE_THRESHOLDS raises ValueError.
+        """
+        clauses = []
+        if budget_level is not None and budget_level not in cls.PRICE_THRESHOLDS:
+            raise ValueError(
+                f"Unknown budget level {budget_level!r}; expected one of {', '.join(cls.PRICE_THRESHOLDS)}"
+            )
+        max_price = cls.PRICE_THRESHOLDS.get(budget_level, float('inf'))
+        if max_price != float('inf'):
+            clauses.append({"price": {"$lte": max_price}})
+        if departments:
+            clauses.append({"department": {"$in": list(departments)}})
+        
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+    
+    @classmethod
+    def match_categories(cls, description: str) -> Set[str]:
+        """Find every keyword category mentioned in a description in one pass."""
+        pattern, hits = cls._KEYWORD_MATCHER
+        categories = set()
+        for match in pattern.finditer(description.lower()):
+            categories |= hits[match.group(1)]
+        return categories
+    
     @classmethod
     def get_service_priority(cls, service: Dict) -> str:
         """Determine the priority level of a service based on description and price."""
-        desc_lower = service["description"].lower()
+        categories = cls.match_categories(service["description"])
         price = float(service["price"])
         
         # Check for oxygen-related services first
-        if any(kw in desc_lower for kw in cls.SERVICE_KEYWORDS["oxygen_therapy"]):
+        if "oxygen_therapy" in categories:
             return "oxygen_therapy"
         
         # Check for monitoring services
-        if any(kw in desc_lower for kw in cls.SERVICE_KEYWORDS["monitoring"]):
+        if "monitoring" in categories:
             return "monitoring"
         
         # Check for basic tests
         if price <= cls.PRICE_THRESHOLDS["basic"]:
-            if any(kw in desc_lower for kw in cls.SERVICE_KEYWORDS["basic_test"]):
+            if "basic_test" in categories:
                 return "basic_test"
-            elif any(kw in desc_lower for kw in cls.SERVICE_KEYWORDS["basic_treatment"]):
+            elif "basic_treatment" in categories:
                 return "basic_treatment"
         
         # Check for imaging services
-        if any(kw in desc_lower for kw in cls.SERVICE_KEYWORDS["imaging"]):
+        if "imaging" in categories:
             return "imaging"
         
         # Check for advanced procedures
-        if any(kw in desc_lower for kw in cls.SERVICE_KEYWORDS["advanced"]):
+        if "advanced" in categories:
             return "advanced"
             
         # Default categorization based on price
@@ -115,7 +174,9 @@ class ServicePriority:
         non_oxygen = []
         
         for service in services:
-            if cls.get_service_priority(service) == "oxygen_therapy":
+            # Services carry the priority class computed at ingestion
+            priority = service.get("priority") or cls.get_service_priority(service)
+            if priority == "oxygen_therapy":
                 dept = service["department"]
                 if dept not in dept_services:
                     dept_services[dept] = []
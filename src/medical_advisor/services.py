@@ -1,44 +1,460 @@
 """Service management for medical advisor system."""
 
-import sqlite3
-import pandas as pd
+import hashlib
+import json
+from datetime import datetime
 from pathlib import Path
-import chromadb
-from chromadb.utils import embedding_functions
+from .collection_alias import CollectionAlias
+from .recommendation_cache import RecommendationCache
+from .lexical_index import ServiceLexicalIndex, HybridRetriever
+from .service_priority import ServicePriority
+from .config import (
+    RECOMMENDATION_CACHE_SIZE, RECOMMENDATION_CACHE_TTL, EMBEDDING_BACKEND, ensure_directories,
+    HYBRID_RETRIEVAL, HYBRID_VECTOR_RESULTS, HYBRID_LEXICAL_RESULTS, RRF_K,
+    VECTOR_INDEX, SNAPSHOT_DIR, SNAPSHOT_DTYPE, SNAPSHOT_PCA_DIMENSION,
+    SERVICES_COLLECTION, COLLECTION_ALIASES_FILE, PREVIOUS_COLLECTIONS_KEPT,
+    VALIDATION_SAMPLES, VALIDATION_MIN_HIT_RATE, INGEST_BATCH_SIZE, INGEST_CONCURRENCY,
+    INGEST_QUEUE_SIZE, INGEST_TOKENS_PER_MINUTE, INGEST_CHECKPOINT_FILE, SERVICE_READ_CHUNK_SIZE
+)
 
 class ServiceManager:
-    def __init__(self, api_key: str):
-        """Initialize service manager."""
+    def __init__(self, api_key: str, embedding_backend: str = None, base_url: str = None):
+        """Initialize service manager.
+        
+        ``embedding_backend`` selects the embeddings used when the collection
+        is (re)built; an existing collection is always queried with the
+        backend recorded in its metadata. ``base_url`` points OpenAI
+        embedding requests at another endpoint, such as an OpenAIStandIn.
+        """
+        self.api_key = api_key
+        self.base_url = base_url
         self.project_root = Path(__file__).parent.parent.parent
         self.db_dir = self.project_root / "db"
-        self.db_dir.mkdir(exist_ok=True)
+        ensure_directories()
+        
+        # Embedding concurrency and OpenAI token rate used when (re)building
+        self.ingest_concurrency = INGEST_CONCURRENCY
+        self.ingest_tokens_per_minute = INGEST_TOKENS_PER_MINUTE
+        
+        # Heavy dependencies are only imported once a manager is created
+        import chromadb
+        from .embedding_cache import EmbeddingCache
         
         # Initialize ChromaDB
         self.chroma_client = chromadb.PersistentClient(path=str(self.db_dir))
-        self.embedding_func = embedding_functions.OpenAIEmbeddingFunction(
-            api_key=api_key,
-            model_name="text-embedding-ada-002"
+        # Readers resolve the services alias to the live collection version
+        self.aliases = CollectionAlias(self.db_dir / COLLECTION_ALIASES_FILE)
+        
+        # OpenAI embeddings are looked up in the on-disk cache before calling the API
+        self.embedding_cache = EmbeddingCache(self.db_dir / "embedding_cache.sqlite3")
+        stored_backend, stored_dimension = self._stored_embedding_config()
+        if embedding_backend is None and stored_backend is not None:
+            self._use_embedding_backend(stored_backend, stored_dimension)
+        else:
+            self._use_embedding_backend(embedding_backend or EMBEDDING_BACKEND)
+        
+        # Recommendations computed against the current catalog version
+        self.recommendation_cache = RecommendationCache(
+            self.db_dir / "recommendation_cache.sqlite3",
+            max_entries=RECOMMENDATION_CACHE_SIZE,
+            ttl_seconds=RECOMMENDATION_CACHE_TTL
         )
-    
-    def _reset_collection(self, name: str):
-        """Reset a collection by deleting and recreating it."""
+        
+        # BM25 index over service codes and descriptions
         try:
-            # Delete if exists
-            self.chroma_client.delete_collection(name)
-            print(f"Deleted existing collection: {name}")
-        except ValueError:
-            print(f"Note: Collection {name} doesn't exist yet")
+            self.lexical_index = ServiceLexicalIndex(self.db_dir / "service_fts.sqlite3")
+        except Exception as e:
+            print(f"Lexical index disabled (SQLite FTS5 unavailable?): {e}")
+            self.lexical_index = None
+    
+    def _use_embedding_backend(self, backend: str, dimension: int = None):
+        """Switch the embedding function used for ingestion and queries."""
+        from .embeddings import create_embedding_function
+        
+        self.embedding_backend = backend
+        self.embedding_func = create_embedding_function(
+            backend, api_key=self.api_key, cache=self.embedding_cache, dimension=dimension,
+            base_url=self.base_url
+        )
+    
+    def _stored_embedding_config(self):
+        """Backend and dimension recorded on the existing collection, if any.
+        
+        Collections built before backends were recorded used OpenAI.
+        """
+        live_name = self.live_collection_name()
+        for collection in self.chroma_client.list_collections():
+            name = getattr(collection, "name", collection)
+            if name != live_name:
+                continue
+            metadata = getattr(collection, "metadata", None)
+            if metadata is None:
+                try:
+                    metadata = self.chroma_client.get_collection(name=name).metadata
+                except Exception:
+                    metadata = None
+            metadata = metadata or {}
+            return metadata.get("embedding_backend", "openai"), metadata.get("embedding_dimension")
+        return None, None
+    
+    def live_collection_name(self) -> str:
+        """Name of the collection readers should use.
+        
+        Catalogs loaded before collections were versioned live directly
+        under SERVICES_COLLECTION.
+        """
+        return self.aliases.resolve(SERVICES_COLLECTION) or SERVICES_COLLECTION
+    
+    def _create_version_collection(self):
+        """Create an empty, versioned side collection for a new build."""
+        from .embeddings import embedding_metadata
         
-        # Create new collection
+        name = f"{SERVICES_COLLECTION}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
         collection = self.chroma_client.create_collection(
             name=name,
-            embedding_function=self.embedding_func
+            embedding_function=self.embedding_func,
+            metadata=embedding_metadata(self.embedding_backend, self.embedding_func)
+        )
+        print(f"Created new collection version: {name}")
+        return collection
+    
+    @staticmethod
+    def _validation_sample(count: int) -> list:
+        """Positions of the services sampled to validate a catalog of ``count`` services."""
+        step = max(1, count // VALIDATION_SAMPLES)
+        return list(range(0, count, step))[:VALIDATION_SAMPLES]
+    
+    def _validate_collection(self, collection, count: int, sample_ids: list, sample_documents: list = None,
+                             sample_embeddings=None):
+        """Check a new version before it goes live; raises ValueError if it looks broken.
+        
+        The count must match the catalog, and the sampled services queried
+        by their own document text must mostly find themselves. With
+        ``sample_embeddings`` the samples are queried by their stored
+        embeddings, so nothing is embedded.
+        """
+        stored = collection.count()
+        if stored == 0 or stored != count:
+            raise ValueError(f"Collection has {stored} services, expected {count}")
+        
+        if sample_embeddings is not None:
+            results = collection.query(query_embeddings=list(sample_embeddings), n_results=3, include=[])
+        else:
+            results = collection.query(query_texts=list(sample_documents), n_results=3, include=[])
+        hits = sum(service_id in found for service_id, found in zip(sample_ids, results["ids"]))
+        hit_rate = hits / len(sample_ids)
+        print(f"Validation: {stored} services, {hits}/{len(sample_ids)} sample queries found their service")
+        if hit_rate < VALIDATION_MIN_HIT_RATE:
+            raise ValueError(f"Sample query hit rate {hit_rate:.2f} is below {VALIDATION_MIN_HIT_RATE}")
+    
+    def _promote_collection(self, collection, count: int, sample_ids: list, sample_documents: list = None,
+                            sample_embeddings=None):
+        """Validate a new version, flip the alias to it and prune old versions.
+        
+        A version that fails validation is deleted and the live collection
+        is left untouched.
+        """
+        try:
+            self._validate_collection(collection, count, sample_ids, sample_documents, sample_embeddings)
+        except Exception:
+            print(f"New collection {collection.name} failed validation; "
+                  f"{self.live_collection_name()} stays live")
+            self.chroma_client.delete_collection(collection.name)
+            raise
+        
+        existing = {getattr(c, "name", c) for c in self.chroma_client.list_collections()}
+        current = self.live_collection_name()
+        previous = self.aliases.flip(
+            SERVICES_COLLECTION, collection.name, current=current if current in existing else None
+        )
+        print(f"Live collection is now {collection.name} (previous: {previous or 'none'})")
+        
+        for name in self.aliases.trim(SERVICES_COLLECTION, 1 + PREVIOUS_COLLECTIONS_KEPT):
+            try:
+                self.chroma_client.delete_collection(name)
+                print(f"Deleted old collection version: {name}")
+            except Exception:  # ValueError, or NotFoundError on newer Chroma
+                pass
+    
+    def _ingestion_pipeline(self):
+        from .ingestion import IngestionPipeline
+        
+        return IngestionPipeline(
+            self.embedding_func,
+            batch_size=INGEST_BATCH_SIZE,
+            concurrency=self.ingest_concurrency,
+            # Only the OpenAI API meters tokens
+            tokens_per_minute=self.ingest_tokens_per_minute if self.embedding_backend == "openai" else None,
+            queue_size=INGEST_QUEUE_SIZE
         )
-        print(f"Created new collection: {name}")
+    
+    def _build_version(self, chunks, count: int, catalog_version: str):
+        """Embed a catalog into a new collection version and make it live.
+        
+        ``chunks`` yields (ids, documents, metadatas) for ``count`` services
+        in all; only one chunk is held at a time. Progress is checkpointed,
+        so a build of the same catalog with the same embeddings that was
+        interrupted resumes in the collection it had started instead of
+        embedding everything again.
+        """
+        from .embeddings import embedding_metadata
+        from .ingestion import IngestionCheckpoint
+        
+        checkpoint = IngestionCheckpoint(
+            self.db_dir / INGEST_CHECKPOINT_FILE,
+            {"catalog_version": catalog_version, **embedding_metadata(self.embedding_backend, self.embedding_func)}
+        )
+        # A partial build of another catalog will never be finished
+        if checkpoint.abandoned and checkpoint.abandoned not in self.aliases.history(SERVICES_COLLECTION):
+            try:
+                self.chroma_client.delete_collection(checkpoint.abandoned)
+                print(f"Deleted unfinished collection version: {checkpoint.abandoned}")
+            except Exception:  # ValueError, or NotFoundError on newer Chroma
+                pass
+        
+        collection = None
+        if checkpoint.collection:
+            try:
+                collection = self.chroma_client.get_collection(
+                    name=checkpoint.collection, embedding_function=self.embedding_func
+                )
+                print(f"Resuming interrupted build of {collection.name}")
+            except Exception:  # ValueError, or NotFoundError on newer Chroma
+                collection = None
+        if collection is None:
+            collection = self._create_version_collection()
+        checkpoint.start(collection.name)
+        
+        pipeline = self._ingestion_pipeline()
+        sample = set(self._validation_sample(count))
+        sample_ids, sample_documents = [], []
+        position = embedded = 0
+        seconds = 0.0
+        for ids, documents, metadatas in chunks:
+            for i in range(len(ids)):
+                if position + i in sample:
+                    sample_ids.append(ids[i])
+                    sample_documents.append(documents[i])
+            position += len(ids)
+            # Upsert, since a batch may have been written just before an interruption was checkpointed
+            stats = pipeline.run(collection.upsert, ids, documents, metadatas, checkpoint=checkpoint)
+            embedded += stats["services"]
+            seconds += stats["seconds"]
+        print(f"Embedded {embedded} services in {seconds:.1f}s")
+        collection.modify(metadata={**(collection.metadata or {}), "catalog_version": catalog_version})
+        try:
+            self._promote_collection(collection, count, sample_ids, sample_documents)
+        finally:
+            checkpoint.clear()
+        return collection
+    
+    def rollback(self) -> str:
+        """Point readers back at the previous collection version.
+        
+        The abandoned version is kept so running readers are not broken;
+        it is no longer in the alias history and can be deleted by hand.
+        """
+        live, abandoned = self.aliases.rollback(SERVICES_COLLECTION)
+        print(f"Rolled back from {abandoned} to {live}")
+        collection = self.get_collection()
+        if collection is not None:
+            self.get_retriever(collection)
+        self.recommendation_cache.clear()
+        return live
+    
+    def _incremental_collection(self, name: str):
+        """Existing collection to update in place, or None if it must be rebuilt.
+        
+        A collection embedded with another backend, model or dimension
+        cannot be mixed with new embeddings, so it is rebuilt.
+        """
+        from .embeddings import embedding_metadata
+        
+        try:
+            collection = self.chroma_client.get_collection(name=name, embedding_function=self.embedding_func)
+        except Exception:  # ValueError, or NotFoundError on newer Chroma
+            print(f"Note: Collection {name} doesn't exist yet")
+            return None
+        
+        expected = embedding_metadata(self.embedding_backend, self.embedding_func)
+        stored = collection.metadata or {}
+        if any(stored.get(key) != value for key, value in expected.items()):
+            print(f"Collection {name} was embedded differently ({stored.get('embedding_model')}); rebuilding")
+            return None
         return collection
     
-    def load_services(self):
-        """Load services from SQLite to ChromaDB."""
+    def _service_documents(self, services_df):
+        """Build Chroma IDs, documents and metadata for a frame of service rows."""
+        # Rich service descriptions, built column-wise. Prices live only in
+        # the metadata, so a price change never re-embeds a service
+        documents = (
+            "Medical service: " + services_df["description"].astype(str)
+            + "\nDepartment: " + services_df["department_name"].astype(str)
+            + "\nService code: " + services_df["code"].astype(str)
+        ).tolist()
+        ids = ("service_" + services_df["id"].astype(str)).tolist()
+        
+        # Metadata carries every field the advisors read, so query results
+        # never need the document text
+        metadatas = []
+        rows = services_df[[
+            "id", "code", "description", "department_name", "normal_rate",
+            "special_rate", "non_ea_rate", "variant_type"
+        ]].itertuples(index=False, name=None)
+        for (service_id, code, description, department, normal_rate,
+             special_rate, non_ea_rate, variant_type), document in zip(rows, documents):
+            metadata = {
+                "service_id": str(service_id),
+                "code": code,
+                "description": description,
+                "department": department,
+                "price": float(normal_rate),
+                "normal_rate": float(normal_rate),
+                "special_rate": float(special_rate),
+                "non_ea_rate": float(non_ea_rate),
+                "variant_type": variant_type,
+                "priority": ServicePriority.get_service_priority({
+                    "description": description,
+                    "price": normal_rate
+                })
+            }
+            metadata["content_hash"] = self._content_hash(document, metadata)
+            metadatas.append(metadata)
+        
+        return ids, documents, metadatas
+    
+    @staticmethod
+    def _write_batches(action: str, write, ids: list, batch_size: int = 100, **columns):
+        """Call ``write`` on consecutive batches of IDs and their columns."""
+        total_batches = (len(ids) + batch_size - 1) // batch_size
+        for i in range(0, len(ids), batch_size):
+            batch_end = min(i + batch_size, len(ids))
+            batch_num = (i // batch_size) + 1
+            
+            print(f"{action} batch {batch_num}/{total_batches} (services {i+1} to {batch_end})")
+            write(ids=ids[i:batch_end], **{key: values[i:batch_end] for key, values in columns.items()})
+    
+    @staticmethod
+    def _collection_pages(collection, include: list, page_size: int = 1000):
+        """Yield a collection's rows a page at a time, in ``get`` layout."""
+        offset = 0
+        while True:
+            page = collection.get(include=include, limit=page_size, offset=offset)
+            if not page["ids"]:
+                return
+            yield page
+            offset += len(page["ids"])
+    
+    def _sync_collection(self, collection, chunks):
+        """Bring an existing collection in line with the catalog by content hash.
+        
+        ``chunks`` yields (ids, documents, metadatas); each chunk is diffed
+        against the stored rows with the same IDs. New rows and rows whose
+        document text changed are upserted (and embedded); rows where only
+        metadata changed are updated without embedding; rows no longer in
+        the catalog are deleted. Only service IDs are kept across chunks.
+        Returns whether anything changed, and the catalog version hashed
+        from the chunks as they were read.
+        """
+        pipeline = self._ingestion_pipeline()
+        digest = hashlib.sha256()
+        seen = set()
+        unchanged = reembedded = updated = 0
+        for ids, documents, metadatas in chunks:
+            self._update_catalog_digest(digest, documents, metadatas)
+            seen.update(ids)
+            
+            existing = collection.get(ids=ids, include=["metadatas"])
+            existing_hashes = {
+                service_id: (meta or {}).get("content_hash")
+                for service_id, meta in zip(existing["ids"], existing["metadatas"])
+            }
+            changed = [i for i, service_id in enumerate(ids)
+                       if existing_hashes.get(service_id) != metadatas[i]["content_hash"]]
+            unchanged += len(ids) - len(changed)
+            
+            # Rows with unchanged text keep their embeddings even if their metadata moved
+            known = [ids[i] for i in changed if ids[i] in existing_hashes]
+            stored_documents = {}
+            if known:
+                stored = collection.get(ids=known, include=["documents"])
+                stored_documents = dict(zip(stored["ids"], stored["documents"]))
+            reembed = [i for i in changed if stored_documents.get(ids[i]) != documents[i]]
+            metadata_only = [i for i in changed if stored_documents.get(ids[i]) == documents[i]]
+            
+            if reembed:
+                pipeline.run(
+                    collection.upsert, [ids[i] for i in reembed],
+                    [documents[i] for i in reembed], [metadatas[i] for i in reembed],
+                    action="Upserting"
+                )
+            if metadata_only:
+                self._write_batches(
+                    "Updating", collection.update, [ids[i] for i in metadata_only],
+                    metadatas=[metadatas[i] for i in metadata_only]
+                )
+            reembedded += len(reembed)
+            updated += len(metadata_only)
+        
+        removed = [
+            service_id
+            for page in self._collection_pages(collection, include=[])
+            for service_id in page["ids"]
+            if service_id not in seen
+        ]
+        if removed:
+            self._write_batches("Deleting", collection.delete, removed)
+        
+        print(f"{unchanged} unchanged, {reembedded} new or changed, "
+              f"{updated} metadata-only changes, {len(removed)} removed")
+        return bool(reembedded or updated or removed), digest.hexdigest()[:16]
+    
+    def _read_services(self, conn):
+        """Yield (ids, documents, metadatas) for each chunk of services read from SQLite."""
+        import pandas as pd
+        
+        # Older databases were created without a variant_type column
+        service_columns = {row[1] for row in conn.execute("PRAGMA table_info(services)")}
+        variant_column = "s.variant_type" if "variant_type" in service_columns else "NULL"
+        
+        chunks = pd.read_sql(f"""
+            SELECT 
+                s.id, s.code, s.description, s.normal_rate,
+                s.special_rate, s.non_ea_rate,
+                {variant_column} as variant_type,
+                d.name as department_name
+            FROM services s
+            JOIN departments d ON s.department_id = d.id
+            WHERE s.normal_rate > 0
+            ORDER BY s.normal_rate DESC, s.id
+        """, conn, chunksize=SERVICE_READ_CHUNK_SIZE)
+        for chunk in chunks:
+            chunk[["special_rate", "non_ea_rate"]] = chunk[["special_rate", "non_ea_rate"]].fillna(0.0)
+            chunk["variant_type"] = chunk["variant_type"].fillna("")
+            yield self._service_documents(chunk)
+    
+    def _scan_catalog(self, chunks):
+        """Catalog version and service count, hashed chunk by chunk."""
+        digest = hashlib.sha256()
+        count = 0
+        for ids, documents, metadatas in chunks:
+            self._update_catalog_digest(digest, documents, metadatas)
+            count += len(ids)
+        return digest.hexdigest()[:16], count
+    
+    def load_services(self, incremental: bool = False):
+        """Load services from SQLite to ChromaDB.
+        
+        By default a new collection version is built, validated and then
+        made live, so readers never see a partial index. With
+        ``incremental`` the live collection, if embedded with the current
+        model, is diffed against the database by per-row content hash and
+        only new, changed and removed services are written. Services are
+        read and written in chunks of SERVICE_READ_CHUNK_SIZE, so memory
+        does not grow with the catalog.
+        """
+        import sqlite3
+        
         # Get SQLite database path
         db_path = self.project_root / "data" / "processed" / "hospital_services.db"
         
@@ -50,80 +466,251 @@ class ServiceManager:
         conn = sqlite3.connect(str(db_path))
         
         try:
-            # Load services with department info
-            print("Loading services from SQLite...")
-            services_df = pd.read_sql("""
-                SELECT 
-                    s.id, s.code, s.description, s.normal_rate,
-                    d.name as department_name
-                FROM services s
-                JOIN departments d ON s.department_id = d.id
-                WHERE s.normal_rate > 0
-                ORDER BY s.normal_rate DESC
-            """, conn)
-            
-            print(f"Found {len(services_df)} services")
-            
-            # Create fresh collection
-            print("\nResetting ChromaDB collection...")
-            collection = self._reset_collection("medical_services")
-            
-            # Prepare data for ChromaDB
-            documents = []
-            metadatas = []
-            ids = []
-            
-            print("Preparing services for ChromaDB...")
-            for _, service in services_df.iterrows():
-                # Create rich service description
-                service_desc = (
-                    f"Medical service: {service.description}\n"
-                    f"Department: {service.department_name}\n"
-                    f"Service code: {service.code}\n"
-                    f"Price: KSH {service.normal_rate:.2f}"
-                )
-                
-                # Create metadata
-                metadata = {
-                    "service_id": str(service.id),
-                    "code": service.code,
-                    "department": service.department_name,
-                    "price": float(service.normal_rate)
-                }
-                
-                documents.append(service_desc)
-                metadatas.append(metadata)
-                ids.append(f"service_{service.id}")
-            
-            # Add services in batches
-            batch_size = 100
-            total_batches = (len(documents) + batch_size - 1) // batch_size
-            
-            print(f"Adding services in {total_batches} batches...")
-            for i in range(0, len(documents), batch_size):
-                batch_end = min(i + batch_size, len(documents))
-                batch_num = (i // batch_size) + 1
-                
-                print(f"Adding batch {batch_num}/{total_batches} (services {i+1} to {batch_end})")
-                collection.add(
-                    documents=documents[i:batch_end],
-                    metadatas=metadatas[i:batch_end],
-                    ids=ids[i:batch_end]
-                )
-            
-            print(f"\nSuccessfully loaded {len(documents)} services into ChromaDB")
+            collection = self._load_chunks(lambda: self._read_services(conn), incremental)
+            print("\nSuccessfully loaded services into ChromaDB")
             print(f"Collection now has {collection.count()} services")
             return collection.count()
             
         finally:
             conn.close()
     
+    def _load_chunks(self, read_chunks, incremental: bool = False):
+        """Load the catalog produced by ``read_chunks()`` and return the live collection.
+        
+        ``read_chunks`` is called for each pass over the catalog and must
+        yield the same (ids, documents, metadatas) chunks every time.
+        """
+        collection = self._incremental_collection(self.live_collection_name()) if incremental else None
+        if collection is not None:
+            print("\nUpdating ChromaDB collection incrementally...")
+            changed, catalog_version = self._sync_collection(collection, read_chunks())
+            if not changed and self.get_catalog_version(collection) == catalog_version:
+                print("\nCollection is already up to date")
+                return collection
+            # Record the catalog version so cached recommendations are invalidated
+            collection.modify(metadata={**(collection.metadata or {}), "catalog_version": catalog_version})
+        else:
+            # The checkpoint is keyed by catalog version, so hash the catalog
+            # first; then build a new version beside the live one, which
+            # readers switch to only once it validates
+            catalog_version, count = self._scan_catalog(read_chunks())
+            print(f"Found {count} services")
+            print("\nBuilding new ChromaDB collection version...")
+            collection = self._build_version(read_chunks(), count, catalog_version)
+        
+        self._rebuild_lexical_index(collection, catalog_version)
+        self.recommendation_cache.clear()
+        return collection
+    
+    def reembed(self, embedding_backend: str, dimension: int = None) -> int:
+        """Re-embed the live catalog with another backend without downtime.
+        
+        Documents and metadata are copied, a page at a time, from the live
+        collection into a new version embedded with ``embedding_backend``;
+        it goes live once it validates. Readers pick up the new backend
+        from its metadata.
+        """
+        source = self.chroma_client.get_collection(name=self.live_collection_name())
+        
+        def read_chunks():
+            for page in self._collection_pages(source, ["documents", "metadatas"], SERVICE_READ_CHUNK_SIZE):
+                yield page["ids"], page["documents"], page["metadatas"]
+        
+        count = source.count()
+        print(f"Re-embedding {count} services from {source.name} with {embedding_backend}")
+        self._use_embedding_backend(embedding_backend, dimension)
+        catalog_version = self.get_catalog_version(source)
+        if catalog_version == "unversioned":
+            catalog_version, _ = self._scan_catalog(read_chunks())
+        collection = self._build_version(read_chunks(), count, catalog_version)
+        self.recommendation_cache.clear()
+        return collection.count()
+    
+    @staticmethod
+    def _content_hash(document: str, metadata: dict) -> str:
+        """Hash one service's document and metadata (description, department, rates, ...)."""
+        digest = hashlib.sha256(document.encode("utf-8"))
+        digest.update(json.dumps(
+            {key: value for key, value in metadata.items() if key != "content_hash"}, sort_keys=True
+        ).encode("utf-8"))
+        return digest.hexdigest()[:16]
+    
+    @staticmethod
+    def _update_catalog_digest(digest, documents: list, metadatas: list):
+        """Add a chunk of the catalog to a running catalog-version hash."""
+        for doc, meta in zip(documents, metadatas):
+            digest.update(doc.encode("utf-8"))
+            digest.update(json.dumps(meta, sort_keys=True).encode("utf-8"))
+    
+    def get_catalog_version(self, collection) -> str:
+        """Get the catalog version recorded on a collection."""
+        return (collection.metadata or {}).get("catalog_version", "unversioned")
+    
+    def close(self):
+        """Close the on-disk caches owned by this manager."""
+        self.embedding_cache.close()
+        self.recommendation_cache.close()
+        if self.lexical_index is not None:
+            self.lexical_index.close()
+    
     def get_collection(self):
         """Get the medical services collection."""
+        stored_backend, stored_dimension = self._stored_embedding_config()
+        current_dimension = getattr(self.embedding_func, "dimension", stored_dimension)
+        if stored_backend is not None and (stored_backend != self.embedding_backend
+                                           or current_dimension != stored_dimension):
+            print(f"Collection was embedded with {stored_backend}; using it for queries")
+            self._use_embedding_backend(stored_backend, stored_dimension)
+        
         try:
-            return self.chroma_client.get_collection(
-                name="medical_services",
+            collection = self.chroma_client.get_collection(
+                name=self.live_collection_name(),
                 embedding_function=self.embedding_func
             )
-        except ValueError:
+        except Exception:  # ValueError, or NotFoundError on newer Chroma
             return None
+        
+        if VECTOR_INDEX == "memory":
+            return self.get_memory_index(collection)
+        return collection
+    
+    def export_snapshot(self, collection, path: Path = None, dtype: str = None,
+                        pca_dimension: int = None, portable: bool = False) -> Path:
+        """Write a collection's embeddings, documents and metadata to a snapshot directory.
+        
+        Embeddings are stored as ``dtype`` (default SNAPSHOT_DTYPE), reduced
+        to ``pca_dimension`` (default SNAPSHOT_PCA_DIMENSION) if set. A
+        ``portable`` snapshot ignores those defaults and keeps every
+        dimension as float32, so it can be imported on another node with
+        ``import_snapshot``.
+        """
+        from .compression import EmbeddingCodec
+        from .vector_index import write_snapshot
+        
+        path = Path(path or SNAPSHOT_DIR)
+        if portable:
+            if (dtype or "float32") != "float32" or pca_dimension:
+                raise ValueError("Portable snapshots keep full-dimension float32 embeddings")
+            codec = EmbeddingCodec("float32")
+        else:
+            codec = EmbeddingCodec(dtype or SNAPSHOT_DTYPE, pca_dimension or SNAPSHOT_PCA_DIMENSION)
+        data = collection.get(include=["embeddings", "metadatas", "documents"])
+        write_snapshot(path, data["ids"], data["embeddings"], data["metadatas"],
+                       dict(collection.metadata or {}), codec=codec, documents=data["documents"])
+        print(f"Exported {len(data['ids'])} services to snapshot {path}")
+        return path
+    
+    def import_snapshot(self, path: Path) -> int:
+        """Load a snapshot into a new collection version and make it live.
+        
+        The stored embeddings are written as they are, so nothing is sent to
+        the embedding backend. The snapshot must match its checksums and be
+        uncompressed, and its embedding model must be the one this node
+        would embed queries with. A snapshot of the catalog and model that
+        are already live is not imported again.
+        """
+        from .embeddings import embedding_metadata
+        from .vector_index import InMemoryServiceIndex, verify_snapshot, read_snapshot_documents, snapshot_dir
+        
+        # Read every file from the same version, even if the snapshot is rewritten meanwhile
+        path = snapshot_dir(Path(path))
+        info = verify_snapshot(path)
+        compression = info.get("compression") or {}
+        if compression.get("dtype", "float32") != "float32" or compression.get("pca_dimension"):
+            raise ValueError(f"Snapshot is compressed ({compression}); export a float32 snapshot to import")
+        documents = read_snapshot_documents(path)
+        if documents is None:
+            raise ValueError("Snapshot has no documents; re-export it to import")
+        
+        self._use_embedding_backend(info.get("embedding_backend", "openai"), info.get("embedding_dimension"))
+        expected = embedding_metadata(self.embedding_backend, self.embedding_func)
+        mismatched = {key: info.get(key) for key, value in expected.items() if info.get(key) != value}
+        if mismatched:
+            raise ValueError(f"Snapshot was embedded with {mismatched}, but queries would use {expected}")
+        
+        catalog_version = info.get("catalog_version", "unversioned")
+        try:
+            live = self.chroma_client.get_collection(name=self.live_collection_name())
+        except Exception:  # ValueError, or NotFoundError on newer Chroma
+            live = None
+        if (live is not None and catalog_version != "unversioned"
+                and self.get_catalog_version(live) == catalog_version
+                and (live.metadata or {}).get("embedding_model") == info.get("embedding_model")):
+            print(f"Catalog {catalog_version} is already live; nothing to import")
+            return live.count()
+        
+        index = InMemoryServiceIndex.from_snapshot(path)
+        metadatas = [index._row(i) for i in range(index.count())]
+        print(f"Importing {index.count()} services from snapshot {path} ({info.get('embedding_model')})")
+        collection = self._create_version_collection()
+        self._write_batches(
+            "Importing", collection.add, index.ids, batch_size=1000,
+            embeddings=index.embeddings, documents=documents, metadatas=metadatas
+        )
+        collection.modify(metadata={**(collection.metadata or {}), "catalog_version": catalog_version})
+        sample = self._validation_sample(index.count())
+        self._promote_collection(
+            collection, index.count(), [index.ids[i] for i in sample],
+            sample_embeddings=[index.embeddings[i] for i in sample]
+        )
+        
+        self._rebuild_lexical_index(collection, catalog_version)
+        self.recommendation_cache.clear()
+        return collection.count()
+    
+    def get_memory_index(self, collection):
+        """Open the in-memory index, re-exporting the snapshot if it is stale."""
+        from .vector_index import InMemoryServiceIndex, read_snapshot_info
+        
+        from .compression import EmbeddingCodec
+        
+        info = read_snapshot_info(SNAPSHOT_DIR)
+        # PCA to as many dimensions as the embeddings have is skipped, so compare
+        # with the compression the codec would actually record
+        dimension = (collection.metadata or {}).get("embedding_dimension")
+        if not dimension and info and not (info.get("compression") or {}).get("pca_dimension"):
+            dimension = info.get("dimension")
+        compression = EmbeddingCodec(SNAPSHOT_DTYPE, SNAPSHOT_PCA_DIMENSION).expected_info(
+            dimension, collection.count()
+        )
+        if (info is None
+                or info.get("catalog_version", "unversioned") != self.get_catalog_version(collection)
+                or info.get("embedding_model") != (collection.metadata or {}).get("embedding_model")
+                or info.get("compression") != compression):
+            self.export_snapshot(collection, SNAPSHOT_DIR)
+        return InMemoryServiceIndex.from_snapshot(SNAPSHOT_DIR, embedding_func=self.embedding_func)
+    
+    def _rebuild_lexical_index(self, collection, catalog_version: str):
+        """Rebuild the lexical index from a collection's metadata, a page at a time."""
+        if self.lexical_index is None:
+            return
+        self.lexical_index.rebuild_batches(
+            ((page["ids"], page["metadatas"]) for page in self._collection_pages(collection, ["metadatas"])),
+            catalog_version
+        )
+    
+    def get_retriever(self, collection):
+        """Wrap a collection in a hybrid retriever when hybrid retrieval is enabled.
+        
+        The lexical index is rebuilt from the collection's metadata (no
+        embedding calls) if it was built from another catalog version.
+        """
+        if collection is None or self.lexical_index is None or not HYBRID_RETRIEVAL:
+            return collection
+        
+        try:
+            catalog_version = self.get_catalog_version(collection)
+            if self.lexical_index.catalog_version != catalog_version:
+                print("Building lexical index from the collection...")
+                self._rebuild_lexical_index(collection, catalog_version)
+        except Exception as e:
+            print(f"Lexical index unavailable, using vector search only: {e}")
+            return collection
+        
+        return HybridRetriever(
+            collection,
+            self.lexical_index,
+            vector_results=HYBRID_VECTOR_RESULTS,
+            lexical_results=HYBRID_LEXICAL_RESULTS,
+            rrf_k=RRF_K
+        )
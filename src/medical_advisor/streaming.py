@@ -0,0 +1,39 @@
+"""Helpers for streaming chat completion tokens."""
+
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+
+def completion_tokens(chunks: Iterable) -> Iterator[str]:
+    """Yield the text tokens from a streamed chat completion."""
+    for chunk in chunks:
+        if not chunk.choices:
+            continue
+        token = chunk.choices[0].delta.content
+        if token:
+            yield token
+
+
+class TokenStream:
+    """Iterate over streamed tokens and assemble the final result.
+
+    ``result`` holds everything known before the completion starts. Once the
+    stream has been consumed, the full text is stored under ``field`` and
+    passed to ``on_complete``.
+    """
+
+    def __init__(self, tokens: Iterable[str], result: Dict, field: str,
+                 on_complete: Optional[Callable[[str], None]] = None):
+        self._tokens = tokens
+        self.result = result
+        self.field = field
+        self.on_complete = on_complete
+
+    def __iter__(self) -> Iterator[str]:
+        parts = []
+        for token in self._tokens:
+            parts.append(token)
+            yield token
+        text = "".join(parts)
+        self.result[self.field] = text
+        if self.on_complete is not None:
+            self.on_complete(text)
@@ -0,0 +1,266 @@
+"""Tracing spans for consultations, exported to JSONL and latency histograms."""
+
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+from .config import TRACE_PATH, TRACING_ENABLED
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_consultation_id = contextvars.ContextVar("consultation_id", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_consultation_id() -> Optional[str]:
+    """Consultation ID of the surrounding consultation, if any."""
+    return _consultation_id.get()
+
+
+def usage_attributes(response) -> Dict:
+    """Token counts reported on a chat completion response."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens
+    }
+
+
+class Span:
+    """A timed operation. Attributes can be added until it ends."""
+
+    def __init__(self, tracer: "Tracer", name: str, parent_id: Optional[str], attributes: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = new_id()
+        self.parent_id = parent_id
+        self.consultation_id = _consultation_id.get()
+        self.attributes = attributes
+        self.start_time = time.time()
+        self.duration_ms = None
+        self.error = None
+        self._start = time.perf_counter()
+
+    def set(self, **attributes):
+        """Add or overwrite span attributes."""
+        self.attributes.update(attributes)
+
+    def end(self, error: Exception = None):
+        """Finish the span and export it. Later calls are ignored."""
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.tracer.export(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "consultation_id": self.consultation_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """Keeps per-span latency histograms and, given a ``path``, appends spans to it as JSONL.
+
+    Spans opened inside another span become its children, and every span
+    carries the ID of the consultation it ran in. Context is held in
+    contextvars, so it follows asyncio tasks and ``asyncio.to_thread``.
+    """
+
+    def __init__(self, path: Path = None, enabled: bool = True, max_samples: int = 1000):
+        self.path = Path(path) if path else None
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._file = None
+        self._histograms = {}
+
+    @contextmanager
+    def consultation(self, consultation_id: str = None):
+        """Run a block as one consultation, reusing the surrounding one if any."""
+        if _consultation_id.get() is not None and consultation_id is None:
+            yield _consultation_id.get()
+            return
+        token = _consultation_id.set(consultation_id or new_id())
+        try:
+            yield _consultation_id.get()
+        finally:
+            _consultation_id.reset(token)
+
+    def start_span(self, name: str, **attributes) -> Span:
+        """Start a span that the caller ends explicitly (e.g. across a stream)."""
+        parent = _current_span.get()
+        return Span(self, name, parent.span_id if parent else None, attributes)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Time a block as a child of the current span."""
+        span = self.start_span(name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.end(error=e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    @contextmanager
+    def stream_span(self, name: str, **attributes) -> Iterator[Span]:
+        """Start a span that outlives the block, for calls that return a token stream.
+
+        Spans opened inside the block are its children. It is ended with the
+        error if the block raises; otherwise the caller ends it, usually by
+        wrapping the returned tokens in ``traced_tokens``.
+        """
+        span = self.start_span(name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.end(error=e)
+            raise
+        finally:
+            _current_span.reset(token)
+
+    def export(self, span: Span):
+        """Write a finished span to the sink and its histogram."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._histograms.get(span.name)
+            if stats is None:
+                stats = self._histograms[span.name] = {
+                    "count": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                    "samples": deque(maxlen=self.max_samples)
+                }
+            stats["count"] += 1
+            stats["errors"] += 1 if span.error else 0
+            stats["total_ms"] += span.duration_ms
+            stats["max_ms"] = max(stats["max_ms"], span.duration_ms)
+            bucket = next(
+                (i for i, bound in enumerate(LATENCY_BUCKETS_MS) if span.duration_ms <= bound),
+                len(LATENCY_BUCKETS_MS)
+            )
+            stats["buckets"][bucket] += 1
+            stats["samples"].append(span.duration_ms)
+
+            if self.path is None:
+                return
+            try:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(json.dumps(span.to_dict(), default=str) + "\n")
+                self._file.flush()
+            except Exception as e:
+                print(f"Error writing trace span: {e}")
+
+    def summary(self) -> Dict:
+        """Latency statistics per span name for this process."""
+        with self._lock:
+            summary = {}
+            for name, stats in self._histograms.items():
+                samples = sorted(stats["samples"])
+                summary[name] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "mean_ms": stats["total_ms"] / stats["count"],
+                    "p50_ms": samples[int(0.50 * (len(samples) - 1))],
+                    "p95_ms": samples[int(0.95 * (len(samples) - 1))],
+                    "max_ms": stats["max_ms"],
+                    "buckets": dict(zip(
+                        [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"],
+                        stats["buckets"]
+                    ))
+                }
+            return summary
+
+    def format_summary(self) -> str:
+        """Render the latency summary as a text table, slowest total first."""
+        summary = self.summary()
+        lines = [f"{'span':<24}{'count':>7}{'errors':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, stats in sorted(summary.items(), key=lambda item: -item[1]["mean_ms"] * item[1]["count"]):
+            lines.append(
+                f"{name:<24}{stats['count']:>7}{stats['errors']:>8}{stats['mean_ms']:>10.1f}"
+                f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        """Clear the in-process histograms."""
+        with self._lock:
+            self._histograms.clear()
+
+    def close(self):
+        """Close the JSONL sink."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+tracer = Tracer(TRACE_PATH, enabled=TRACING_ENABLED)
+
+
+def traced(name: str):
+    """Decorator running a function in a span, inside a consultation."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.consultation(), tracer.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.consultation(), tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_tokens(span: Span, tokens: Iterable[str]) -> Iterator[str]:
+    """Pass streamed tokens through, ending ``span`` when the stream finishes."""
+    count = 0
+    try:
+        for token in tokens:
+            count += 1
+            yield token
+    except Exception as e:
+        span.end(error=e)
+        raise
+    finally:
+        span.set(completion_chunks=count)
+        span.end()
@@ -0,0 +1,325 @@
+"""In-process brute-force vector index loaded from a snapshot on disk."""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .compression import EmbeddingCodec, PCA_MEAN_FILE, PCA_COMPONENTS_FILE, SCALES_FILE
+from .tracing import tracer
+
+# Files making up a snapshot directory
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.json"
+DOCUMENTS_FILE = "documents.json"
+INFO_FILE = "info.json"
+# Names the version directory holding the current files of a snapshot
+CURRENT_FILE = "CURRENT"
+
+
+def _file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_dir(path: Path) -> Path:
+    """Directory holding the current files of the snapshot at ``path``.
+
+    Snapshots are written into version directories and published by
+    swapping the CURRENT pointer; snapshots written before that keep their
+    files in ``path`` itself.
+    """
+    path = Path(path)
+    try:
+        version = (path / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return path
+    return path / version
+
+
+def write_snapshot(path: Path, ids: List[str], embeddings, metadatas: List[Dict], info: Dict,
+                   codec: EmbeddingCodec = None, documents: List[str] = None):
+    """Write a snapshot: normalized embeddings, columnar metadata and info.
+
+    ``info`` should carry the collection metadata (embedding backend, model,
+    dimension and catalog version). ``codec`` compresses the stored
+    embeddings; by default they are kept as float32. ``documents`` are
+    needed to import the snapshot into Chroma. Checksums of the data files
+    are recorded in the info so copies can be verified.
+
+    Files are written into a new version directory which then replaces
+    the current one atomically, so processes that have the previous
+    embeddings memory-mapped keep reading intact files. Only the previous
+    version is kept beside the new one.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    previous = snapshot_dir(path)
+    version = f"v{time.time_ns()}"
+    target = path / version
+    target.mkdir()
+
+    codec = codec or EmbeddingCodec()
+    matrix = codec.fit_encode(embeddings)
+    np.save(target / EMBEDDINGS_FILE, matrix)
+    codec.save(target)
+
+    fields = sorted({field for meta in metadatas for field in meta})
+    columns = {field: [meta.get(field) for meta in metadatas] for field in fields}
+    with open(target / METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump({"ids": list(ids), "columns": columns}, f, ensure_ascii=False)
+
+    files = [EMBEDDINGS_FILE, METADATA_FILE]
+    if documents is not None:
+        with open(target / DOCUMENTS_FILE, "w", encoding="utf-8") as f:
+            json.dump(list(documents), f, ensure_ascii=False)
+        files.append(DOCUMENTS_FILE)
+
+    with open(target / INFO_FILE, "w", encoding="utf-8") as f:
+        json.dump({
+            **info,
+            "count": len(ids),
+            "dimension": int(matrix.shape[1]) if len(matrix) else 0,
+            "compression": codec.info(),
+            "checksums": {name: _file_checksum(target / name) for name in files}
+        }, f, indent=2)
+
+    # Publish the new version
+    pointer = path / (CURRENT_FILE + ".tmp")
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, path / CURRENT_FILE)
+
+    # Drop older versions; deleting mapped files is safe on POSIX and skipped where it is not
+    for entry in path.iterdir():
+        if entry.is_dir() and entry.name[1:].isdigit() and entry not in (target, previous):
+            shutil.rmtree(entry, ignore_errors=True)
+    if previous == path:
+        # Files of a snapshot written before versioning
+        for name in (EMBEDDINGS_FILE, METADATA_FILE, DOCUMENTS_FILE, INFO_FILE,
+                     PCA_MEAN_FILE, PCA_COMPONENTS_FILE, SCALES_FILE):
+            try:
+                (path / name).unlink()
+            except OSError:
+                pass
+    return target
+
+
+def read_snapshot_info(path: Path) -> Optional[Dict]:
+    """Info of the snapshot at ``path``, or None if there is none."""
+    info_path = snapshot_dir(path) / INFO_FILE
+    if not info_path.exists():
+        return None
+    with open(info_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_snapshot(path: Path) -> Dict:
+    """Check a snapshot's files against its recorded checksums and return its info.
+
+    Raises ValueError if a file is missing or differs from when it was written.
+    """
+    path = snapshot_dir(path)
+    info = read_snapshot_info(path)
+    if info is None:
+        raise ValueError(f"No snapshot at {path}")
+    for name, checksum in (info.get("checksums") or {}).items():
+        if not (path / name).exists():
+            raise ValueError(f"Snapshot file {name} is missing")
+        if _file_checksum(path / name) != checksum:
+            raise ValueError(f"Snapshot file {name} does not match its checksum")
+    return info
+
+
+def read_snapshot_documents(path: Path) -> Optional[List[str]]:
+    """Documents stored with a snapshot, or None if it was written without them."""
+    documents_path = snapshot_dir(path) / DOCUMENTS_FILE
+    if not documents_path.exists():
+        return None
+    with open(documents_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class InMemoryServiceIndex:
+    """Exact cosine search over a float32 matrix, with the Chroma query contract.
+
+    Embeddings are memory-mapped from the snapshot, so opening the index is
+    close to free. ``query`` embeds all texts in one call and selects the
+    top results per query with ``argpartition``. ``where`` filters are
+    applied to columnar metadata before scoring and support equality,
+    ``$ne``, ``$gt``/``$gte``/``$lt``/``$lte``, ``$in``/``$nin``, ``$and``
+    and ``$or``. Distances are cosine distances. Compressed snapshots are
+    scanned through their EmbeddingCodec. Documents are read from the
+    snapshot the first time they are asked for; an ``include`` the index
+    cannot serve raises ValueError.
+    """
+
+    def __init__(self, embeddings: np.ndarray, ids: List[str], columns: Dict[str, List],
+                 embedding_func=None, metadata: Dict = None, name: str = "medical_services",
+                 codec: EmbeddingCodec = None, documents: List[str] = None, path: Path = None):
+        self.embeddings = embeddings
+        self.documents = documents
+        self.path = path
+        self.codec = codec or EmbeddingCodec()
+        self.ids = list(ids)
+        self.columns = columns
+        self.embedding_func = embedding_func
+        self.metadata = metadata or {}
+        self.name = name
+
+        # Numpy views of each column for vectorized filtering
+        self._arrays = {}
+        for field, values in columns.items():
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values if v is not None):
+                self._arrays[field] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                self._arrays[field] = np.array(values, dtype=object)
+
+    @classmethod
+    def from_snapshot(cls, path: Path, embedding_func=None, mmap: bool = True) -> "InMemoryServiceIndex":
+        """Open a snapshot written by write_snapshot."""
+        path = snapshot_dir(path)
+        embeddings = np.load(path / EMBEDDINGS_FILE, mmap_mode="r" if mmap else None)
+        with open(path / METADATA_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+        info = read_snapshot_info(path) or {}
+        metadata = {k: v for k, v in info.items() if k not in ("count", "dimension", "compression", "checksums")}
+        codec = EmbeddingCodec.load(path, info.get("compression") or {})
+        return cls(embeddings, data["ids"], data["columns"], embedding_func=embedding_func,
+                   metadata=metadata, codec=codec, path=path)
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def _row(self, i: int) -> Dict:
+        return {field: values[i] for field, values in self.columns.items() if values[i] is not None}
+
+    def _check_include(self, include: List[str], supported: tuple):
+        unsupported = [field for field in include if field not in supported]
+        if unsupported:
+            raise ValueError(f"Unsupported include for InMemoryServiceIndex: {', '.join(unsupported)}")
+        if "documents" in include and self.documents is None:
+            self.documents = read_snapshot_documents(self.path) if self.path is not None else None
+            if self.documents is None:
+                raise ValueError("Documents were not stored with this snapshot")
+
+    def _condition_mask(self, field: str, condition) -> np.ndarray:
+        column = self._arrays.get(field)
+        if column is None:
+            return np.zeros(len(self.ids), dtype=bool)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        mask = np.ones(len(self.ids), dtype=bool)
+        for op, value in condition.items():
+            if op == "$eq":
+                mask &= column == value
+            elif op == "$ne":
+                mask &= column != value
+            elif op == "$gt":
+                mask &= column > value
+            elif op == "$gte":
+                mask &= column >= value
+            elif op == "$lt":
+                mask &= column < value
+            elif op == "$lte":
+                mask &= column <= value
+            elif op == "$in":
+                mask &= np.isin(column, list(value))
+            elif op == "$nin":
+                mask &= ~np.isin(column, list(value))
+            else:
+                raise ValueError(f"Unsupported where operator: {op}")
+        return mask
+
+    def _where_mask(self, where: Dict) -> np.ndarray:
+        """Boolean mask of rows matching a Chroma-style ``where`` filter."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, value in where.items():
+            if key == "$and":
+                for clause in value:
+                    mask &= self._where_mask(clause)
+            elif key == "$or":
+                any_mask = np.zeros(len(self.ids), dtype=bool)
+                for clause in value:
+                    any_mask |= self._where_mask(clause)
+                mask &= any_mask
+            else:
+                mask &= self._condition_mask(key, value)
+        return mask
+
+    def query(self, query_texts: List[str] = None, query_embeddings=None, n_results: int = 10,
+              where: Dict = None, include: List[str] = None) -> Dict:
+        """Top ``n_results`` rows per query, best first, in Chroma's result layout."""
+        include = ["metadatas", "distances"] if include is None else include
+        self._check_include(include, ("metadatas", "documents", "distances"))
+        if query_embeddings is None:
+            query_embeddings = self.embedding_func(query_texts)
+        queries = self.codec.encode_queries(query_embeddings)
+
+        with tracer.span("vector_search", queries=len(queries), n_results=n_results,
+                         filtered=where is not None) as span:
+            if where:
+                candidates = np.flatnonzero(self._where_mask(where))
+                matrix = self.embeddings[candidates]
+            else:
+                candidates = None
+                matrix = self.embeddings
+
+            k = min(n_results, len(matrix))
+            if k == 0:
+                top = np.zeros((len(queries), 0), dtype=np.int64)
+                top_scores = np.zeros((len(queries), 0), dtype=np.float32)
+            else:
+                scores = self.codec.scores(queries, matrix)
+                if k < scores.shape[1]:
+                    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                else:
+                    top = np.tile(np.arange(scores.shape[1]), (len(queries), 1))
+                top_scores = np.take_along_axis(scores, top, axis=1)
+                order = np.argsort(-top_scores, axis=1)
+                top = np.take_along_axis(top, order, axis=1)
+                top_scores = np.take_along_axis(top_scores, order, axis=1)
+            rows = candidates[top] if candidates is not None else top
+            span.set(candidates=len(matrix))
+
+        result = {"ids": [[self.ids[i] for i in query_rows] for query_rows in rows]}
+        if "metadatas" in include:
+            result["metadatas"] = [[self._row(i) for i in query_rows] for query_rows in rows]
+        if "documents" in include:
+            result["documents"] = [[self.documents[i] for i in query_rows] for query_rows in rows]
+        if "distances" in include:
+            result["distances"] = (1.0 - top_scores).tolist()
+        return result
+
+    def get(self, ids: List[str] = None, where: Dict = None, include: List[str] = None,
+            limit: int = None, offset: int = None) -> Dict:
+        """Rows by ID and/or filter, in Chroma's ``get`` layout.
+
+        ``offset`` and ``limit`` page through the matching rows in storage order.
+        """
+        include = ["metadatas"] if include is None else include
+        self._check_include(include, ("metadatas", "documents", "embeddings"))
+        mask = self._where_mask(where) if where else np.ones(len(self.ids), dtype=bool)
+        if ids is not None:
+            wanted = set(ids)
+            mask &= np.array([service_id in wanted for service_id in self.ids], dtype=bool)
+        rows = np.flatnonzero(mask)
+        start = offset or 0
+        rows = rows[start:] if limit is None else rows[start:start + limit]
+
+        result = {"ids": [self.ids[i] for i in rows]}
+        if "metadatas" in include:
+            result["metadatas"] = [self._row(i) for i in rows]
+        if "documents" in include:
+            result["documents"] = [self.documents[i] for i in rows]
+        if "embeddings" in include:
+            result["embeddings"] = self.codec.decode(self.embeddings[rows])
+        return result
@@ -0,0 +1,140 @@
+import sys
+from pathlib import Path
+
+# Tests import the package from src, like the scripts do
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from types import SimpleNamespace
+
+import pytest
+
+
+SERVICES = [
+    {"code": "XR1020", "description": "Chest X-ray", "department": "RADIOLOGY", "price": 1500.0,
+     "priority": "imaging"},
+    {"code": "LAB075", "description": "Full blood count", "department": "LABORATORY GENERAL", "price": 600.0,
+     "priority": "basic_test"},
+    {"code": "PHY012", "description": "Physiotherapy session", "department": "PHYSIOTHERAPY", "price": 2500.0,
+     "priority": "basic_treatment"},
+]
+
+
+def service_document(service):
+    return (
+        f"Medical service: {service['description']}\n"
+        f"Department: {service['department']}\n"
+        f"Service code: {service['code']}"
+    )
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection holding SERVICES."""
+
+    def __init__(self, name="medical_services", services=SERVICES, metadata=None, documents=None):
+        self.name = name
+        self.services = [dict(service) for service in services]
+        self.documents = documents or [service_document(service) for service in services]
+        self.metadata = metadata or {"catalog_version": "v1"}
+        self.queries = []
+
+    def count(self):
+        return len(self.services)
+
+    def query(self, query_texts=None, n_results=3, include=None, where=None, **kwargs):
+        self.queries.append(list(query_texts))
+        rows = self.services[:n_results]
+        result = {"ids": [[f"service_{i}" for i in range(len(rows))] for _ in query_texts]}
+        result["metadatas"] = [[dict(row) for row in rows] for _ in query_texts]
+        result["documents"] = [self.documents[:n_results] for _ in query_texts]
+        return result
+
+    def get(self, ids=None, include=None, **kwargs):
+        index = {f"service_{i}": i for i in range(len(self.services))}
+        ids = [i for i in (ids or index) if i in index]
+        return {
+            "ids": ids,
+            "metadatas": [dict(self.services[index[i]]) for i in ids],
+            "documents": [self.documents[index[i]] for i in ids]
+        }
+
+
+class FakeServiceManager:
+    """Just enough of ServiceManager for an Advisor."""
+
+    def __init__(self, db_dir, collections):
+        from medical_advisor.embeddings import HashedNgramEmbeddingFunction
+        from medical_advisor.recommendation_cache import RecommendationCache
+
+        self.db_dir = db_dir
+        self.collections = collections
+        self.live = next(iter(collections))
+        self.embedding_backend = "hashed_ngram"
+        self.embedding_func = HashedNgramEmbeddingFunction()
+        self.recommendation_cache = RecommendationCache(db_dir / "recommendations.sqlite3")
+
+    def live_collection_name(self):
+        return self.live
+
+    def get_collection(self):
+        return self.collections.get(self.live)
+
+    def get_retriever(self, collection):
+        return collection
+
+    def get_catalog_version(self, collection):
+        return (collection.metadata or {}).get("catalog_version", "unversioned")
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+def _chunks(content):
+    words = content.split(" ")
+    for i, word in enumerate(words):
+        token = word if i == len(words) - 1 else word + " "
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+
+class FakeOpenAI:
+    """Chat client answering every request with ``reply``."""
+
+    def __init__(self, reply="cardiovascular"):
+        self.reply = reply
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, stream=False, **kwargs):
+        self.requests.append(messages)
+        return _chunks(self.reply) if stream else _completion(self.reply)
+
+
+class FakeAsyncOpenAI(FakeOpenAI):
+    """Async chat client answering every request with ``reply``."""
+
+    def __init__(self, reply="cardiovascular"):
+        super().__init__(reply)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._acreate))
+
+    async def _acreate(self, model, messages, **kwargs):
+        self.requests.append(messages)
+        return _completion(self.reply)
+
+
+@pytest.fixture(autouse=True)
+def tracer(monkeypatch):
+    """The process-wide tracer, with no file sink and fresh histograms."""
+    from medical_advisor.tracing import tracer
+
+    monkeypatch.setattr(tracer, "path", None)
+    monkeypatch.setattr(tracer, "_file", None)
+    tracer.reset()
+    yield tracer
+    tracer.reset()
+
+
+@pytest.fixture
+def service_manager(tmp_path):
+    manager = FakeServiceManager(tmp_path, {"medical_services": FakeCollection()})
+    yield manager
+    manager.recommendation_cache.close()
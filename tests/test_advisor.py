@@ -0,0 +1,106 @@
+import pytest
+from conftest import SERVICES, FakeCollection, FakeOpenAI, FakeServiceManager, service_document
+
+from medical_advisor.advisor import Advisor
+from medical_advisor.condition_classifier import CONDITION_KEYWORDS
+from medical_advisor.search_priorities import SEARCH_PRIORITIES
+
+
+def test_legacy_metadata_is_completed_from_documents(tmp_path):
+    legacy = [{key: service[key] for key in ("code", "department", "price")} for service in SERVICES]
+    manager = FakeServiceManager(tmp_path, {"medical_services": FakeCollection(
+        services=legacy, documents=[service_document(service) for service in SERVICES]
+    )})
+    advisor = Advisor("test", client=FakeOpenAI(), service_manager=manager)
+
+    results = advisor._build_recommendations("cardiovascular", "chest pain", "advanced")
+
+    assert results["services"]
+    descriptions = {service["code"]: service["description"] for service in results["services"]}
+    assert descriptions["XR1020"] == "Chest X-ray"
+    assert all(service["priority"] for service in results["services"])
+    advisor.close()
+    manager.recommendation_cache.close()
+
+
+class DeletedCollection(FakeCollection):
+    def query(self, **kwargs):
+        raise ValueError(f"Collection {self.name} does not exist.")
+
+
+def test_advisor_follows_alias_to_new_version(tmp_path):
+    manager = FakeServiceManager(tmp_path, {
+        "medical_services_v1": FakeCollection("medical_services_v1"),
+        "medical_services_v2": FakeCollection("medical_services_v2"),
+    })
+    advisor = Advisor("test", client=FakeOpenAI(), service_manager=manager)
+
+    manager.live = "medical_services_v2"
+    advisor.get_service_recommendations("chest pain", "advanced")
+
+    assert advisor.collection_name == "medical_services_v2"
+    assert manager.collections["medical_services_v2"].queries
+    assert not manager.collections["medical_services_v1"].queries
+    advisor.close()
+    manager.recommendation_cache.close()
+
+
+def test_search_retries_on_live_version_after_deletion(tmp_path):
+    manager = FakeServiceManager(tmp_path, {
+        "medical_services_v1": DeletedCollection("medical_services_v1"),
+        "medical_services_v2": FakeCollection("medical_services_v2"),
+    })
+    advisor = Advisor("test", client=FakeOpenAI(), service_manager=manager)
+
+    # The alias moves and the old version is deleted mid-consultation
+    manager.live = "medical_services_v2"
+    results = advisor._build_recommendations("cardiovascular", "chest pain", "advanced")
+
+    assert results["services"]
+    assert advisor.collection_name == "medical_services_v2"
+    advisor.close()
+    manager.recommendation_cache.close()
+
+
+def test_treatment_plan_reports_recommendation_errors(tmp_path):
+    manager = FakeServiceManager(tmp_path, {"medical_services": FakeCollection()})
+    advisor = Advisor("test", client=FakeOpenAI(), service_manager=manager)
+
+    def unavailable(condition):
+        raise RuntimeError("classifier unavailable")
+
+    advisor._classify_condition = unavailable
+    plan = advisor.get_treatment_plan("chest pain", "standard")
+    stream = advisor.get_treatment_plan_stream("chest pain", "standard")
+
+    assert plan == {"error": "Failed to classify condition type."}
+    assert stream.result["error"] == plan["error"]
+    assert "".join(stream) == ""
+    advisor.close()
+    manager.recommendation_cache.close()
+
+
+@pytest.mark.parametrize("condition_type", sorted(CONDITION_KEYWORDS))
+def test_keyword_and_llm_classification_share_condition_types(service_manager, condition_type):
+    advisor = Advisor("test", client=FakeOpenAI(condition_type), service_manager=service_manager)
+    prompt = advisor._classification_messages("chest pain")[0]["content"]
+    offered = prompt.split("types: ")[1].split(" or other")[0].split(", ")
+
+    keywords = " and ".join(CONDITION_KEYWORDS[condition_type][:3])
+    keyword_type, _ = advisor.classifier.classify_keywords(keywords)
+    # Nothing local to go on, so the LLM answers with one of the offered types
+    llm_type = advisor._classify_condition("feeling unwell lately")
+
+    assert offered == list(SEARCH_PRIORITIES)
+    assert keyword_type == llm_type == condition_type
+    assert condition_type in offered
+    advisor.close()
+
+
+@pytest.mark.parametrize("backend, threshold", [("openai", 0.98), ("hashed_ngram", 0.95), ("other", 0.98)])
+def test_response_cache_threshold_follows_embedding_backend(service_manager, backend, threshold):
+    service_manager.embedding_backend = backend
+    advisor = Advisor("test", client=FakeOpenAI(), service_manager=service_manager)
+
+    assert advisor.response_cache.threshold == threshold
+    advisor.close()
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from conftest import FakeCollection, FakeServiceManager
+
+from medical_advisor import advisor_pool
+
+
+class ClosingServiceManager(FakeServiceManager):
+    closed = False
+
+    def close(self):
+        self.closed = True
+        self.recommendation_cache.close()
+
+
+@pytest.fixture
+def pools(tmp_path, monkeypatch):
+    """The module's pool registry, emptied, with service managers that need no database."""
+    managers = []
+
+    def service_manager(api_key, base_url=None):
+        manager = ClosingServiceManager(tmp_path / api_key, {"medical_services": FakeCollection()})
+        managers.append(manager)
+        return manager
+
+    for api_key in ("key-a", "key-b"):
+        (tmp_path / api_key).mkdir()
+    monkeypatch.setattr(advisor_pool, "ServiceManager", service_manager)
+    monkeypatch.setattr(advisor_pool, "_pools", {})
+    yield managers
+    advisor_pool.shutdown()
+
+
+def test_one_advisor_is_shared_per_key_across_threads(pools):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        advisors = list(executor.map(lambda _: advisor_pool.get_advisor("key-a"), range(32)))
+    other = advisor_pool.get_advisor("key-b")
+
+    assert len({id(advisor) for advisor in advisors}) == 1
+    assert other is not advisors[0]
+    assert advisor_pool.get_pool("key-a") is advisor_pool.get_pool("key-a")
+    # One service manager and one OpenAI client per key, reused by its advisor
+    assert len(pools) == 2
+    pool = advisor_pool.get_pool("key-a")
+    assert advisors[0].client is pool.client
+    assert advisors[0].service_manager is pool.service_manager
+
+
+def test_shutdown_closes_the_shared_http_client(pools):
+    pool = advisor_pool.get_pool("key-a")
+    advisor_pool.warmup("key-a")
+
+    advisor_pool.shutdown()
+
+    assert pool.http_client.is_closed
+    assert pool.service_manager.closed
+    assert pool._advisor is None
+    assert advisor_pool._pools == {}
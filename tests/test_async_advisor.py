@@ -0,0 +1,55 @@
+import asyncio
+
+from conftest import FakeAsyncOpenAI, FakeOpenAI
+
+from medical_advisor.async_advisor import AsyncAdvisor
+
+
+def make_advisor(service_manager):
+    return AsyncAdvisor("test", client=FakeOpenAI(), service_manager=service_manager,
+                        async_client=FakeAsyncOpenAI())
+
+
+def test_sync_api_still_works_on_async_advisor(service_manager):
+    advisor = make_advisor(service_manager)
+    stream = advisor.get_treatment_plan_stream("chest pain", "standard")
+    text = "".join(stream)
+
+    assert text.strip() == "cardiovascular"
+    assert stream.result["total_estimated_cost"] > 0
+    assert "analysis" in advisor.analyze_symptoms("cough")
+    advisor.close()
+
+
+def test_async_recommendations_use_one_batched_query(service_manager):
+    advisor = make_advisor(service_manager)
+    collection = service_manager.get_collection()
+
+    results = asyncio.run(advisor.aget_service_recommendations("chest pain", "advanced"))
+
+    assert len(collection.queries) == 1
+    assert len(collection.queries[0]) > 1
+    assert {service["category"] for service in results["services"]} == {"diagnostic", "treatment", "monitoring"}
+    advisor.close()
+
+
+def test_consult_runs_analysis_and_plan(service_manager):
+    advisor = make_advisor(service_manager)
+    consultation = asyncio.run(advisor.consult("fever and cough", "chest pain"))
+
+    assert consultation["analysis"]["analysis"] == "cardiovascular"
+    assert consultation["treatment_plan"]["treatment_plan"] == "cardiovascular"
+    advisor.close()
+
+
+def test_async_treatment_plan_reports_recommendation_errors(service_manager):
+    advisor = make_advisor(service_manager)
+
+    async def unavailable(condition):
+        raise RuntimeError("classifier unavailable")
+
+    advisor._aclassify_condition = unavailable
+    plan = asyncio.run(advisor.aget_treatment_plan("chest pain", "standard"))
+
+    assert plan == {"error": "Failed to classify condition type."}
+    advisor.close()
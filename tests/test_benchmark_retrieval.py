@@ -0,0 +1,102 @@
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import chromadb
+import pandas as pd
+import pytest
+
+from medical_advisor import services
+from medical_advisor.collection_alias import CollectionAlias
+from medical_advisor.embedding_cache import EmbeddingCache
+from medical_advisor.embeddings import HashedNgramEmbeddingFunction
+from medical_advisor.lexical_index import ServiceLexicalIndex
+from medical_advisor.recommendation_cache import RecommendationCache
+from medical_advisor.services import ServiceManager
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+SCRIPT = PROJECT_ROOT / "scripts" / "benchmark_retrieval.py"
+CASES = PROJECT_ROOT / "data" / "benchmarks" / "retrieval_cases.json"
+
+
+def catalog_rows(codes, every=25):
+    """Rows of the bundled catalog holding ``codes``, plus every ``every``-th other service."""
+    df = pd.read_excel(PROJECT_ROOT / "data" / "processed" / "cleaned_data.xlsx")
+    rows, department = [], None
+    for i, row in enumerate(df.itertuples(index=False)):
+        if pd.isna(row[2]):
+            # Department heading
+            department = str(row[0])
+            continue
+        if row[1] not in codes and i % every:
+            continue
+        rate = pd.to_numeric(row[3], errors="coerce")
+        rows.append({
+            "id": len(rows) + 1, "code": str(row[1]), "description": str(row[2]),
+            "department_name": department, "normal_rate": 0.0 if pd.isna(rate) else float(rate),
+            "special_rate": 0.0, "non_ea_rate": 0.0, "variant_type": ""
+        })
+    return rows
+
+
+@pytest.fixture
+def offline_manager(tmp_path, monkeypatch):
+    """A ServiceManager on the hashed n-gram backend, loaded with part of the bundled catalog."""
+    manager = ServiceManager.__new__(ServiceManager)
+    manager.api_key = manager.base_url = None
+    manager.project_root = manager.db_dir = tmp_path
+    manager.chroma_client = chromadb.EphemeralClient()
+    manager.aliases = CollectionAlias(tmp_path / "aliases.json")
+    manager.embedding_backend = "hashed_ngram"
+    manager.embedding_func = HashedNgramEmbeddingFunction()
+    manager.embedding_cache = EmbeddingCache(tmp_path / "embedding_cache.sqlite3")
+    manager.ingest_concurrency = 1
+    manager.ingest_tokens_per_minute = None
+    manager.recommendation_cache = RecommendationCache(tmp_path / "recommendation_cache.sqlite3")
+    manager.lexical_index = ServiceLexicalIndex(tmp_path / "service_fts.sqlite3")
+
+    with open(CASES, encoding="utf-8") as f:
+        codes = {code for case in json.load(f)["cases"] for code in case["expected_codes"]}
+    chunk = manager._service_documents(pd.DataFrame(catalog_rows(codes)))
+    manager._load_chunks(lambda: iter([chunk]))
+
+    monkeypatch.setattr(services, "SNAPSHOT_DIR", tmp_path / "snapshot")
+    monkeypatch.setattr(services, "ServiceManager", lambda api_key, base_url=None: manager)
+    return manager
+
+
+@pytest.fixture
+def script():
+    spec = importlib.util.spec_from_file_location("benchmark_retrieval", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_benchmark_runs_the_shipped_cases_offline(script, offline_manager, monkeypatch, tmp_path):
+    output = tmp_path / "results.json"
+    monkeypatch.setattr(sys, "argv", [
+        "benchmark_retrieval.py", "--configs", "vector,hybrid,memory", "--repeats", "1", "--warmup", "0",
+        "--k", "5,20", "--output", str(output)
+    ])
+
+    script.main()
+
+    with open(CASES, encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+    results = json.loads(output.read_text(encoding="utf-8"))
+    assert results["cases_file"] == str(CASES)
+    assert results["cases"] == len(cases)
+    assert results["embedding_backend"] == "hashed_ngram"
+    assert results["budget_level"] == "advanced"
+    configurations = {r["name"].split("/")[0]: r for r in results["configurations"]}
+    assert set(configurations) == {"vector", "hybrid", "memory"}
+    for r in configurations.values():
+        assert r["consultations"] == len(cases)
+        # Every category's queries go out as one batched query
+        assert r["chroma_queries_per_consultation"] == 1
+        assert set(r["latency_ms"]) == {"p50", "p95", "p99", "mean"}
+        assert 0 < r["recall"]["20"] <= 1
+        assert 0 <= r["ndcg"]["5"] <= 1
@@ -0,0 +1,41 @@
+import pytest
+
+from medical_advisor.condition_classifier import ConditionClassifier
+from medical_advisor.embeddings import HashedNgramEmbeddingFunction
+
+
+def test_single_stray_keyword_is_not_trusted():
+    classifier = ConditionClassifier()
+
+    condition_type, confidence = classifier.classify("felt a burn after the long walk")
+
+    assert condition_type == "dermatological"
+    assert confidence < classifier.confidence_threshold
+    assert classifier.lookup("felt a burn after the long walk") is None
+
+
+def test_several_keywords_of_one_type_are_trusted():
+    classifier = ConditionClassifier()
+
+    condition_type, confidence = classifier.classify("chest pain and palpitations")
+
+    assert (condition_type, confidence) == ("cardiovascular", 1.0)
+    assert classifier.lookup("Chest pain and  palpitations") == "cardiovascular"
+
+
+def test_mixed_keywords_share_confidence():
+    classifier = ConditionClassifier()
+
+    condition_type, confidence = classifier.classify_keywords("cough, wheezing and an itchy skin rash")
+
+    assert condition_type == "dermatological"
+    assert confidence == pytest.approx(0.6)
+
+
+def test_single_keyword_confirmed_by_neighbours():
+    classifier = ConditionClassifier(embedding_func=HashedNgramEmbeddingFunction(), min_similarity=0.5)
+
+    condition_type, confidence = classifier.classify("pneumonia")
+
+    assert condition_type == "respiratory"
+    assert confidence >= classifier.confidence_threshold
@@ -0,0 +1,64 @@
+import pytest
+
+from medical_advisor.embedding_cache import CachedEmbeddingFunction, EmbeddingCache
+from medical_advisor.embeddings import HashedNgramEmbeddingFunction
+
+
+class RecordingEmbeddingFunction(HashedNgramEmbeddingFunction):
+    def __init__(self):
+        super().__init__(dimension=32)
+        self.batches = []
+
+    def __call__(self, input):
+        self.batches.append(list(input))
+        return super().__call__(input)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embedding_cache.sqlite3")
+    yield cache
+    cache.close()
+
+
+def test_only_missing_texts_are_embedded(cache):
+    inner = RecordingEmbeddingFunction()
+    embed = CachedEmbeddingFunction(inner, cache, "model-a")
+
+    first = embed(["chest x-ray", "blood test", "chest x-ray"])
+    second = embed(["blood test", "urine culture", "chest x-ray"])
+
+    # Duplicates are embedded once; cached texts are never sent again
+    assert inner.batches == [["chest x-ray", "blood test"], ["urine culture"]]
+    assert second[0] == pytest.approx(first[1])
+    assert second[2] == pytest.approx(first[0])
+    assert cache.count("model-a") == 3
+
+
+def test_changing_the_model_misses_the_cache(cache, tmp_path):
+    embed = CachedEmbeddingFunction(RecordingEmbeddingFunction(), cache, "model-a")
+    embed(["chest x-ray"])
+
+    inner = RecordingEmbeddingFunction()
+    CachedEmbeddingFunction(inner, cache, "model-b")(["chest x-ray"])
+
+    assert inner.batches == [["chest x-ray"]]
+    assert cache.count("model-a") == cache.count("model-b") == 1
+
+    # Entries persist for their own model across reopening the cache
+    reopened = EmbeddingCache(tmp_path / "embedding_cache.sqlite3")
+    inner = RecordingEmbeddingFunction()
+    CachedEmbeddingFunction(inner, reopened, "model-a")(["chest x-ray"])
+    assert inner.batches == []
+    reopened.close()
+
+
+def test_openai_backend_is_served_through_the_cache(cache):
+    from medical_advisor.config import EMBEDDING_MODEL
+    from medical_advisor.embeddings import create_embedding_function
+
+    embed = create_embedding_function("openai", api_key="test", cache=cache)
+
+    assert isinstance(embed, CachedEmbeddingFunction)
+    assert embed.model_name == EMBEDDING_MODEL
+    assert embed.cache is cache
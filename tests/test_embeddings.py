@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from medical_advisor.embeddings import HashedNgramEmbeddingFunction, create_embedding_function, embedding_metadata
+
+
+def cosine(a, b):
+    return float(np.dot(a, b))
+
+
+def test_hashed_ngram_embeddings_are_deterministic_unit_vectors():
+    embed = HashedNgramEmbeddingFunction(dimension=64)
+
+    first, empty = embed(["Chest X-ray", ""])
+    again = HashedNgramEmbeddingFunction(dimension=64)(["Chest X-ray"])[0]
+
+    assert first.shape == (64,)
+    assert np.linalg.norm(first) == pytest.approx(1.0)
+    assert np.array_equal(first, again)
+    assert not empty.any()
+
+
+def test_hashed_ngram_similarity_follows_shared_words():
+    embed = HashedNgramEmbeddingFunction()
+    xray, chest_xray, blood_count = embed(["x-ray of the chest", "chest x-ray two views", "full blood count"])
+
+    assert cosine(xray, chest_xray) > cosine(xray, blood_count) + 0.2
+
+
+def test_local_backend_config_round_trips_into_collection_metadata():
+    embed = create_embedding_function("hashed_ngram", dimension=128)
+    rebuilt = HashedNgramEmbeddingFunction.build_from_config(embed.get_config())
+
+    assert rebuilt.model_name == embed.model_name == "hashed-ngram-3-5-128"
+    assert embedding_metadata("hashed_ngram", embed) == {
+        "embedding_backend": "hashed_ngram",
+        "embedding_model": "hashed-ngram-3-5-128",
+        "embedding_dimension": 128,
+    }
+    with pytest.raises(ValueError, match="Unknown embedding backend"):
+        create_embedding_function("word2vec")
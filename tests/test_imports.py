@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+
+
+def test_importing_the_advisor_loads_no_heavy_dependencies():
+    code = (
+        "import sys, medical_advisor.advisor; "
+        "print(' '.join(m for m in ('numpy', 'sqlite3', 'pandas', 'chromadb', 'openai') if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == ""
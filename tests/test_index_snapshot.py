@@ -0,0 +1,40 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "index_snapshot.py"
+
+
+class FailingManager:
+    closed = False
+
+    def __init__(self, api_key):
+        pass
+
+    def import_snapshot(self, path):
+        raise ValueError("Snapshot checksum mismatch")
+
+    def close(self):
+        FailingManager.closed = True
+
+
+@pytest.fixture
+def script():
+    spec = importlib.util.spec_from_file_location("index_snapshot", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_failed_import_exits_nonzero(script, monkeypatch, tmp_path):
+    monkeypatch.setattr(script, "ServiceManager", FailingManager)
+    monkeypatch.setattr(sys, "argv", ["index_snapshot.py", "import", str(tmp_path)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        script.main()
+
+    assert exit_info.value.code == 1
+    assert FailingManager.closed
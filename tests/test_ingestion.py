@@ -0,0 +1,83 @@
+import pytest
+
+from medical_advisor.ingestion import IngestionCheckpoint, IngestionPipeline
+
+
+IDS = [f"service_{i}" for i in range(10)]
+DOCUMENTS = [f"Medical service: test {i}" for i in range(10)]
+METADATAS = [{"code": f"T{i}"} for i in range(10)]
+KEY = {"catalog_version": "v1", "embedding_model": "test"}
+
+
+def embed(documents):
+    return [[float(len(doc)), 1.0] for doc in documents]
+
+
+class Writer:
+    def __init__(self, fail_after=None):
+        self.written = []
+        self.fail_after = fail_after
+
+    def __call__(self, ids, embeddings, documents, metadatas):
+        if self.fail_after is not None and len(self.written) >= self.fail_after:
+            raise RuntimeError("Chroma went away")
+        self.written.extend(ids)
+
+
+def run(checkpoint, writer):
+    pipeline = IngestionPipeline(embed, batch_size=3, concurrency=2)
+    return pipeline.run(writer, IDS, DOCUMENTS, METADATAS, checkpoint=checkpoint)
+
+
+def test_interrupted_build_resumes_where_it_stopped(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    checkpoint = IngestionCheckpoint(path, KEY)
+    checkpoint.start("services_v2")
+    with pytest.raises(RuntimeError):
+        run(checkpoint, Writer(fail_after=6))
+
+    resumed = IngestionCheckpoint(path, KEY)
+    assert resumed.collection == "services_v2"
+    written_before = set(resumed.done)
+    assert len(written_before) == 6
+    resumed.start("services_v2")
+    writer = Writer()
+    stats = run(resumed, writer)
+
+    assert stats["skipped"] == 6
+    assert set(writer.written) == set(IDS) - written_before
+    assert IngestionCheckpoint(path, KEY).done == set(IDS)
+
+
+def test_batches_are_appended_not_rewritten(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    checkpoint = IngestionCheckpoint(path, KEY)
+    checkpoint.start("services_v2")
+    run(checkpoint, Writer())
+
+    # One header line, then one line per batch of three
+    assert len(path.read_text().splitlines()) == 1 + 4
+
+
+def test_truncated_last_line_only_loses_that_batch(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    checkpoint = IngestionCheckpoint(path, KEY)
+    checkpoint.start("services_v2")
+    checkpoint.mark(IDS[:3])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"done": ["service_3", "serv')
+
+    assert IngestionCheckpoint(path, KEY).done == set(IDS[:3])
+
+
+def test_checkpoint_of_another_build_is_abandoned(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    checkpoint = IngestionCheckpoint(path, KEY)
+    checkpoint.start("services_v2")
+    checkpoint.mark(IDS[:3])
+
+    other = IngestionCheckpoint(path, {**KEY, "catalog_version": "v2"})
+
+    assert other.abandoned == "services_v2"
+    assert other.collection is None
+    assert other.done == set()
@@ -0,0 +1,45 @@
+import pytest
+
+from conftest import SERVICES, FakeCollection, service_document
+
+from medical_advisor.lexical_index import HybridRetriever, ServiceLexicalIndex
+
+
+IDS = [f"service_{i}" for i in range(len(SERVICES))]
+
+
+@pytest.fixture
+def lexical_index(tmp_path):
+    index = ServiceLexicalIndex(tmp_path / "fts.sqlite3")
+    index.rebuild(IDS, SERVICES, "v1")
+    yield index
+    index.close()
+
+
+def test_rrf_fuses_vector_and_lexical_ranks(lexical_index):
+    # The vector side ranks service_0 then service_1; BM25 ranks service_1 first
+    retriever = HybridRetriever(FakeCollection(), lexical_index, vector_results=2, rrf_k=60)
+
+    results = retriever.query(query_texts=["full blood count"], n_results=3)
+
+    assert results["ids"] == [["service_1", "service_0"]]
+    expected = [1 / 62 + 1 / 61, 1 / 61]
+    assert results["distances"][0] == pytest.approx([1 - score for score in expected])
+    assert [meta["code"] for meta in results["metadatas"][0]] == ["LAB075", "XR1020"]
+    assert "documents" not in results
+
+
+def test_query_honours_include(lexical_index):
+    retriever = HybridRetriever(FakeCollection(), lexical_index, vector_results=1)
+
+    results = retriever.query(query_texts=["physiotherapy", "x-ray"], n_results=2, include=["documents"])
+
+    assert set(results) == {"ids", "documents"}
+    for ids, documents in zip(results["ids"], results["documents"]):
+        assert documents == [service_document(SERVICES[IDS.index(i)]) for i in ids]
+
+
+def test_lexical_search_applies_where_filter(lexical_index):
+    hits = lexical_index.search("chest blood", where={"department": "RADIOLOGY"})
+
+    assert [service_id for service_id, _, _ in hits] == ["service_0"]
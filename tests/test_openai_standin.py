@@ -0,0 +1,70 @@
+import openai
+import pytest
+
+from medical_advisor.openai_standin import Cassette, OpenAIStandIn
+
+
+MESSAGES = [{"role": "user", "content": "Analyze these symptoms: cough"}]
+COMPLETION = {
+    "id": "chatcmpl-1", "object": "chat.completion", "created": 1700000000, "model": "gpt-3.5-turbo",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Likely a viral cough."},
+                 "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 9, "completion_tokens": 4, "total_tokens": 13},
+}
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    path = tmp_path / "openai.json"
+    cassette = Cassette(path)
+    cassette.put_chat({"model": "gpt-3.5-turbo", "messages": MESSAGES}, COMPLETION)
+    cassette.put_embedding("text-embedding-ada-002", "cough", [0.25, -0.5, 1.0])
+    cassette.save()
+    return path
+
+
+def client_for(standin):
+    return openai.OpenAI(api_key="offline", base_url=standin.base_url, max_retries=0)
+
+
+def test_replay_serves_recorded_chat_and_embeddings(cassette_path):
+    with OpenAIStandIn(Cassette(cassette_path)) as standin:
+        client = client_for(standin)
+
+        reply = client.chat.completions.create(model="gpt-3.5-turbo", messages=MESSAGES)
+        stream = client.chat.completions.create(model="gpt-3.5-turbo", messages=MESSAGES, stream=True)
+        streamed = "".join(chunk.choices[0].delta.content or "" for chunk in stream)
+        embedding = client.embeddings.create(model="text-embedding-ada-002", input=["cough"])
+
+    assert reply.choices[0].message.content == "Likely a viral cough."
+    assert streamed == "Likely a viral cough."
+    assert embedding.data[0].embedding == [0.25, -0.5, 1.0]
+    assert standin.stats["misses"] == 0
+
+
+def test_replay_rejects_unrecorded_requests(cassette_path):
+    with OpenAIStandIn(Cassette(cassette_path)) as standin:
+        client = client_for(standin)
+        with pytest.raises(openai.NotFoundError):
+            client.chat.completions.create(model="gpt-4", messages=MESSAGES)
+        with pytest.raises(openai.NotFoundError):
+            client.embeddings.create(model="text-embedding-ada-002", input=["cough", "fever"])
+
+    # One chat request and the one embedding input that was never recorded
+    assert standin.stats["misses"] == 2
+
+
+def test_record_mode_saves_upstream_responses(cassette_path, tmp_path):
+    recorded_path = tmp_path / "recorded.json"
+    # A replaying stand-in plays the part of the real API
+    with OpenAIStandIn(Cassette(cassette_path)) as upstream:
+        with OpenAIStandIn(Cassette(recorded_path), mode="record", api_key="key",
+                           upstream_url=upstream.base_url) as recorder:
+            client = client_for(recorder)
+            client.chat.completions.create(model="gpt-3.5-turbo", messages=MESSAGES)
+            client.embeddings.create(model="text-embedding-ada-002", input="cough")
+
+    assert recorder.stats["recorded"] == 2
+    recorded = Cassette(recorded_path)
+    assert recorded.get_chat({"model": "gpt-3.5-turbo", "messages": MESSAGES})["choices"] == COMPLETION["choices"]
+    assert recorded.get_embedding("text-embedding-ada-002", "cough") == [0.25, -0.5, 1.0]
@@ -0,0 +1,68 @@
+from medical_advisor.prompt_builder import CATEGORY_HEADINGS, TreatmentPlanPromptBuilder
+
+
+def recommendations():
+    categories = {
+        "diagnostic": [
+            {"description": "Chest X-ray", "department": "RADIOLOGY", "price": 1500.0, "relevance_score": 3.0},
+            {"description": "CT scan of the chest", "department": "CT SCAN", "price": 12000.0,
+             "relevance_score": 1.0},
+        ],
+        "treatment": [
+            {"description": "Physiotherapy session", "department": "PHYSIOTHERAPY", "price": 2500.0,
+             "relevance_score": 2.0},
+        ],
+        "monitoring": [],
+    }
+    services = [service for category in categories.values() for service in category]
+    return {
+        "services": services,
+        "categories": categories,
+        # Base consultation charge plus every service
+        "total_cost": 599.0 + sum(service["price"] for service in services),
+        "departments": sorted({service["department"] for service in services}),
+    }
+
+
+def test_trimmed_prompt_states_totals_of_kept_services():
+    builder = TreatmentPlanPromptBuilder()
+    services = recommendations()
+    empty = {category: [] for category in services["categories"]}
+    base = builder._count_messages(builder._render(
+        "chest pain", "standard", services["total_cost"], services["departments"], empty
+    ))
+    # Room for the best diagnostic and treatment services, but not the CT scan
+    kept = [services["categories"]["diagnostic"][0], services["categories"]["treatment"][0]]
+    lines = [builder._service_line(service) for service in kept]
+    lines += [f"\n\n{CATEGORY_HEADINGS[category]}" for category in ("diagnostic", "treatment")]
+    builder.token_budget = base + sum(builder.count_tokens(line) for line in lines)
+
+    messages, report = builder.build("chest pain", "standard", services)
+
+    prompt = messages[0]["content"]
+    assert report["services_dropped"] == 1
+    assert "CT scan" not in prompt
+    assert "Total estimated cost: KSH 4,599.00" in prompt
+    assert "Departments involved: PHYSIOTHERAPY, RADIOLOGY" in prompt
+    assert report["prompt_tokens"] <= builder.token_budget
+
+
+def test_untrimmed_prompt_keeps_recommendation_totals():
+    services = recommendations()
+
+    messages, report = TreatmentPlanPromptBuilder(token_budget=10_000).build("chest pain", "standard", services)
+
+    assert report["services_dropped"] == 0
+    assert f"Total estimated cost: KSH {services['total_cost']:,.2f}" in messages[0]["content"]
+    assert "Departments involved: CT SCAN, PHYSIOTHERAPY, RADIOLOGY" in messages[0]["content"]
+
+
+def test_error_result_gives_prompt_without_services():
+    messages, report = TreatmentPlanPromptBuilder().build(
+        "chest pain", "standard", {"error": "Failed to generate service recommendations."}
+    )
+
+    assert report["services_included"] == 0
+    assert report["services_dropped"] == 0
+    assert "Total estimated cost: KSH 0.00" in messages[0]["content"]
+    assert "Recommended Medical Services:" in messages[0]["content"]
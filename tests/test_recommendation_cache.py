@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import pytest
+
+from medical_advisor import recommendation_cache
+from medical_advisor.recommendation_cache import RecommendationCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_000.0)
+    monkeypatch.setattr(recommendation_cache, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = RecommendationCache(tmp_path / "recommendations.sqlite3", max_entries=2, ttl_seconds=60)
+    yield cache
+    cache.close()
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put("respiratory", "standard", "v1", {"services": ["XR1020"]})
+
+    clock.now += 59
+    assert cache.get("respiratory", "standard", "v1") == {"services": ["XR1020"]}
+    clock.now += 2
+    assert cache.get("respiratory", "standard", "v1") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache, clock):
+    cache.put("respiratory", "standard", "v1", {"services": ["XR1020"]})
+    clock.now += 1
+    cache.put("infectious", "standard", "v1", {"services": ["LAB075"]})
+    clock.now += 1
+    # Reading the older entry makes the other one least recently used
+    cache.get("respiratory", "standard", "v1")
+    clock.now += 1
+    cache.put("neurological", "standard", "v1", {"services": ["CT001"]})
+
+    assert len(cache) == 2
+    assert cache.get("infectious", "standard", "v1") is None
+    assert cache.get("respiratory", "standard", "v1") is not None
+    assert cache.get("neurological", "standard", "v1") is not None
+
+
+def test_entries_are_kept_apart_per_catalog_version(cache, clock):
+    cache.put("respiratory", "standard", "v1", {"services": ["XR1020"]})
+
+    assert cache.get("respiratory", "standard", "v2") is None
+    assert cache.get("respiratory", "advanced", "v1") is None
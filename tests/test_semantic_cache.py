@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from medical_advisor.embeddings import HashedNgramEmbeddingFunction
+from medical_advisor.semantic_cache import SemanticCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SemanticCache(tmp_path / "responses.sqlite3", HashedNgramEmbeddingFunction(), threshold=0.95)
+    yield cache
+    cache.close()
+
+
+def test_near_duplicate_is_served(cache):
+    cache.put("analyze_symptoms", "I have chest pain and a cough", "assessment")
+    assert cache.get("analyze_symptoms", "I have chest pain, and a cough!") == "assessment"
+
+
+def test_negated_input_is_not_served(cache):
+    cache.put("analyze_symptoms", "I have chest pain", "chest pain assessment")
+    assert cache.get("analyze_symptoms", "I have no chest pain") is None
+    assert cache.get("analyze_symptoms", "I don't have chest pain") is None
+
+
+def test_different_numbers_are_not_served(cache):
+    cache.put("analyze_symptoms", "fever for 3 days", "short fever")
+    assert cache.get("analyze_symptoms", "fever for 3 weeks") is None
+    assert cache.get("analyze_symptoms", "fever for 8 days") is None
+
+
+def test_exact_entries_need_identical_input(cache):
+    answers = "burning urination\nfever yes\nback pain no"
+    swapped = "burning urination\nfever no\nback pain yes"
+    cache.put("analyze_responses", answers, "assessment", exact=True)
+
+    assert cache.get("analyze_responses", swapped, exact=True) is None
+    assert cache.get("analyze_responses", "Burning urination\nFever: yes\nBack pain: no", exact=True) == "assessment"
+    # Exact entries are never served to a semantic lookup
+    assert cache.get("analyze_responses", answers) is None
+
+
+def test_expired_entries_are_not_served(cache):
+    cache.ttl_seconds = 0.05
+    cache.put("analyze_symptoms", "sore throat", "old answer")
+    time.sleep(0.1)
+    assert cache.get("analyze_symptoms", "sore throat") is None
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    cache.max_entries = 2
+    cache.put("analyze_symptoms", "sore throat", "throat")
+    cache.put("analyze_symptoms", "ankle sprain", "ankle")
+    assert cache.get("analyze_symptoms", "sore throat") == "throat"
+    cache.put("analyze_symptoms", "skin rash", "rash")
+
+    assert cache.get("analyze_symptoms", "ankle sprain") is None
+    assert cache.get("analyze_symptoms", "sore throat") == "throat"
+    assert cache.get("analyze_symptoms", "skin rash") == "rash"
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from medical_advisor.service_priority import ServicePriority
+
+CATALOG = Path(__file__).parent.parent / "data" / "processed" / "cleaned_data.xlsx"
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    """(description, price) of every service in the bundled catalog."""
+    df = pd.read_excel(CATALOG)
+    # Department heading rows have no description
+    services = df[df[2].notna()]
+    prices = pd.to_numeric(services[3], errors="coerce").fillna(0.0)
+    return list(zip(services[2].astype(str), prices))
+
+
+def any_keyword_priority(service):
+    """get_service_priority as it was before the compiled matcher, one any() scan per category."""
+    desc_lower = service["description"].lower()
+    price = float(service["price"])
+    keywords = ServicePriority.SERVICE_KEYWORDS
+    basic = ServicePriority.PRICE_THRESHOLDS["basic"]
+
+    if any(kw in desc_lower for kw in keywords["oxygen_therapy"]):
+        return "oxygen_therapy"
+    if any(kw in desc_lower for kw in keywords["monitoring"]):
+        return "monitoring"
+    if price <= basic:
+        if any(kw in desc_lower for kw in keywords["basic_test"]):
+            return "basic_test"
+        elif any(kw in desc_lower for kw in keywords["basic_treatment"]):
+            return "basic_treatment"
+    if any(kw in desc_lower for kw in keywords["imaging"]):
+        return "imaging"
+    if any(kw in desc_lower for kw in keywords["advanced"]):
+        return "advanced"
+    if price <= basic:
+        return "basic_treatment"
+    elif price <= ServicePriority.PRICE_THRESHOLDS["standard"]:
+        return "standard"
+    return "advanced"
+
+
+@pytest.mark.parametrize("category", sorted(ServicePriority.SERVICE_KEYWORDS))
+def test_compiled_matcher_finds_the_same_categories_as_any_scan(catalog, category):
+    keywords = ServicePriority.SERVICE_KEYWORDS[category]
+    mismatches = [
+        description for description, _ in catalog
+        if (category in ServicePriority.match_categories(description))
+        != any(kw in description.lower() for kw in keywords)
+    ]
+
+    assert len(catalog) > 3000
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("price_scale", [0.0, 1.0, 10.0])
+def test_priority_matches_any_scan_classification(catalog, price_scale):
+    # Scaling prices moves services across the basic and standard thresholds
+    mismatches = []
+    for description, price in catalog:
+        service = {"description": description, "price": price * price_scale}
+        if ServicePriority.get_service_priority(service) != any_keyword_priority(service):
+            mismatches.append(description)
+
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("budget_level, departments, expected", [
+    ("basic", None, {"price": {"$lte": 500}}),
+    ("standard", None, {"price": {"$lte": 2000}}),
+    ("advanced", None, None),
+    (None, None, None),
+    ("advanced", ["RADIOLOGY"], {"department": {"$in": ["RADIOLOGY"]}}),
+    ("standard", ["RADIOLOGY", "CT SCAN"], {"$and": [
+        {"price": {"$lte": 2000}},
+        {"department": {"$in": ["RADIOLOGY", "CT SCAN"]}},
+    ]}),
+])
+def test_where_clause_caps_price_and_departments(budget_level, departments, expected):
+    assert ServicePriority.build_where(budget_level, departments) == expected
+
+
+@pytest.mark.parametrize("budget_level", ["premium", "standrad", ""])
+def test_unknown_budget_level_is_rejected(budget_level):
+    with pytest.raises(ValueError, match="Unknown budget level"):
+        ServicePriority.build_where(budget_level)
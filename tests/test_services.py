@@ -0,0 +1,225 @@
+import sqlite3
+import uuid
+
+import chromadb
+import pandas as pd
+import pytest
+
+from medical_advisor.collection_alias import CollectionAlias
+from medical_advisor.config import SERVICES_COLLECTION
+from medical_advisor.embeddings import HashedNgramEmbeddingFunction
+from medical_advisor.recommendation_cache import RecommendationCache
+from medical_advisor.services import ServiceManager
+
+
+ROWS = [
+    {"id": 1, "code": "XR1020", "description": "Chest X-ray", "department_name": "RADIOLOGY",
+     "normal_rate": 1500.0, "special_rate": 1400.0, "non_ea_rate": 2000.0, "variant_type": ""},
+    {"id": 2, "code": "LAB075", "description": "Full blood count", "department_name": "LABORATORY GENERAL",
+     "normal_rate": 600.0, "special_rate": 550.0, "non_ea_rate": 900.0, "variant_type": ""},
+    {"id": 3, "code": "PHY012", "description": "Physiotherapy session", "department_name": "PHYSIOTHERAPY",
+     "normal_rate": 2500.0, "special_rate": 2300.0, "non_ea_rate": 3000.0, "variant_type": ""},
+]
+
+
+class CountingEmbeddingFunction(HashedNgramEmbeddingFunction):
+    def __init__(self):
+        super().__init__()
+        self.embedded = []
+
+    def __call__(self, input):
+        self.embedded.extend(input)
+        return super().__call__(input)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    # Only the attributes ingestion uses; no SQLite database or API key needed
+    manager = ServiceManager.__new__(ServiceManager)
+    manager.chroma_client = chromadb.EphemeralClient()
+    manager.aliases = CollectionAlias(tmp_path / "aliases.json")
+    manager.embedding_backend = "hashed_ngram"
+    manager.embedding_func = CountingEmbeddingFunction()
+    manager.ingest_concurrency = 1
+    manager.ingest_tokens_per_minute = None
+    manager.project_root = tmp_path
+    manager.db_dir = tmp_path
+    manager.lexical_index = None
+    manager.recommendation_cache = RecommendationCache(tmp_path / "recommendation_cache.sqlite3")
+    return manager
+
+
+@pytest.fixture
+def collection():
+    return chromadb.EphemeralClient().create_collection(f"services_{uuid.uuid4().hex[:8]}")
+
+
+def sync(manager, collection, rows):
+    ids, documents, metadatas = manager._service_documents(pd.DataFrame(rows))
+    manager.embedding_func.embedded.clear()
+    changed, _ = manager._sync_collection(collection, [(ids, documents, metadatas)])
+    return changed
+
+
+def test_price_change_updates_metadata_without_embedding(manager, collection):
+    sync(manager, collection, ROWS)
+    repriced = [dict(ROWS[0], normal_rate=1750.0)] + ROWS[1:]
+
+    assert sync(manager, collection, repriced)
+
+    assert manager.embedding_func.embedded == []
+    stored = collection.get(ids=["service_1"], include=["metadatas", "documents"])
+    assert stored["metadatas"][0]["price"] == 1750.0
+    assert "1750" not in stored["documents"][0]
+
+
+def test_incremental_diff_reembeds_only_changed_text_and_deletes_removed(manager, collection):
+    sync(manager, collection, ROWS)
+    assert len(manager.embedding_func.embedded) == 3
+    assert not sync(manager, collection, ROWS)
+
+    renamed = [dict(ROWS[0], description="Chest X-ray, two views"), ROWS[1]]
+    assert sync(manager, collection, renamed)
+
+    assert manager.embedding_func.embedded == [
+        "Medical service: Chest X-ray, two views\nDepartment: RADIOLOGY\nService code: XR1020"
+    ]
+    assert sorted(collection.get()["ids"]) == ["service_1", "service_2"]
+
+
+def write_database(path, rows):
+    path.parent.mkdir(parents=True)
+    with sqlite3.connect(str(path)) as conn:
+        conn.execute("CREATE TABLE departments (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.execute("""CREATE TABLE services (id INTEGER PRIMARY KEY, department_id INTEGER, code TEXT,
+                        description TEXT, normal_rate REAL, special_rate REAL, non_ea_rate REAL)""")
+        departments = {name: i for i, name in enumerate(sorted({row["department_name"] for row in rows}), 1)}
+        conn.executemany("INSERT INTO departments (id, name) VALUES (?, ?)",
+                         [(i, name) for name, i in departments.items()])
+        conn.executemany(
+            "INSERT INTO services VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(row["id"], departments[row["department_name"]], row["code"], row["description"],
+              row["normal_rate"], row["special_rate"], row["non_ea_rate"]) for row in rows]
+        )
+
+
+def live_contents(manager):
+    live = manager.chroma_client.get_collection(manager.live_collection_name())
+    data = live.get(include=["documents", "metadatas", "embeddings"])
+    rows = sorted(zip(data["ids"], data["documents"], data["metadatas"], data["embeddings"].tolist()))
+    return rows, manager.get_catalog_version(live)
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_chunked_load_matches_single_pass_load(manager, tmp_path, monkeypatch, incremental):
+    from medical_advisor import services
+
+    rows = ROWS + [
+        {"id": 3 + i, "code": f"LAB{100 + i}", "description": f"Culture and sensitivity panel {i}",
+         "department_name": "LABORATORY GENERAL", "normal_rate": 800.0, "special_rate": 750.0,
+         "non_ea_rate": 1000.0, "variant_type": ""}
+        for i in range(1, 6)
+    ]
+    write_database(tmp_path / "data" / "processed" / "hospital_services.db", rows)
+    loaded = {}
+    for chunk_size in (100, 3):
+        monkeypatch.setattr(services, "SERVICE_READ_CHUNK_SIZE", chunk_size)
+        manager.aliases = CollectionAlias(tmp_path / f"aliases_{chunk_size}.json")
+        if incremental:
+            # Start from a stale live version so every chunk goes through the diff
+            # and a service missing from the catalog is deleted
+            build_version(manager, [dict(ROWS[0], description="Chest X-ray, one view"), ROWS[1], dict(ROWS[2], id=99)])
+        assert manager.load_services(incremental=incremental) == len(rows)
+        loaded[chunk_size] = live_contents(manager)
+
+    assert loaded[3] == loaded[100]
+    assert len(loaded[3][0]) == len(rows)
+
+
+def build_version(manager, rows):
+    ids, documents, metadatas = manager._service_documents(pd.DataFrame(rows))
+    collection = manager._create_version_collection()
+    collection.add(ids=ids, documents=documents, metadatas=metadatas)
+    manager._promote_collection(collection, len(ids), ids, documents)
+    return collection.name
+
+
+def collection_names(manager):
+    return {getattr(c, "name", c) for c in manager.chroma_client.list_collections()}
+
+
+def test_promotion_flips_alias_and_prunes_old_versions(manager):
+    first = build_version(manager, ROWS)
+    second = build_version(manager, ROWS[:2])
+    third = build_version(manager, ROWS[1:])
+
+    assert manager.live_collection_name() == third
+    assert manager.aliases.history(SERVICES_COLLECTION) == [third, second]
+    assert first not in collection_names(manager)
+    assert {second, third} <= collection_names(manager)
+
+
+def test_failed_validation_keeps_live_version(manager):
+    live = build_version(manager, ROWS)
+    ids, documents, metadatas = manager._service_documents(pd.DataFrame(ROWS))
+    broken = manager._create_version_collection()
+    broken.add(ids=ids[:1], documents=documents[:1], metadatas=metadatas[:1])
+
+    with pytest.raises(ValueError):
+        manager._promote_collection(broken, len(ids), ids, documents)
+
+    assert manager.live_collection_name() == live
+    assert broken.name not in collection_names(manager)
+
+
+def test_local_backend_is_recorded_and_a_new_dimension_forces_a_rebuild(manager):
+    manager.embedding_cache = None
+    manager.api_key = manager.base_url = None
+    manager._use_embedding_backend("hashed_ngram", 64)
+    live = build_version(manager, ROWS)
+
+    assert manager._stored_embedding_config() == ("hashed_ngram", 64)
+    assert manager._incremental_collection(live) is not None
+    manager._use_embedding_backend("hashed_ngram", 128)
+    assert manager._incremental_collection(live) is None
+
+
+def test_alias_rollback_returns_to_previous_version(tmp_path):
+    aliases = CollectionAlias(tmp_path / "aliases.json")
+    aliases.flip("services", "v1")
+    aliases.flip("services", "v2")
+
+    assert aliases.rollback("services") == ("v1", "v2")
+    assert aliases.resolve("services") == "v1"
+    # Another process sees the rolled-back alias
+    assert CollectionAlias(tmp_path / "aliases.json").resolve("services") == "v1"
+    with pytest.raises(ValueError):
+        aliases.rollback("services")
+
+
+def test_alias_flip_seeds_history_and_trim_drops_oldest(tmp_path):
+    aliases = CollectionAlias(tmp_path / "aliases.json")
+    assert aliases.flip("services", "v1", current="legacy") == "legacy"
+    aliases.flip("services", "v2")
+
+    assert aliases.trim("services", 2) == ["legacy"]
+    assert aliases.history("services") == ["v2", "v1"]
+
+
+def test_portable_export_keeps_full_dimension(manager, tmp_path, monkeypatch):
+    from medical_advisor import services
+    from medical_advisor.vector_index import read_snapshot_info, verify_snapshot
+
+    monkeypatch.setattr(services, "SNAPSHOT_PCA_DIMENSION", 2)
+    monkeypatch.setattr(services, "SNAPSHOT_DTYPE", "int8")
+    collection = manager.chroma_client.get_collection(build_version(manager, ROWS))
+
+    manager.export_snapshot(collection, tmp_path / "snapshot", portable=True)
+
+    info = read_snapshot_info(tmp_path / "snapshot")
+    assert info["compression"].get("dtype", "float32") == "float32"
+    assert not info["compression"].get("pca_dimension")
+    assert info["dimension"] == manager.embedding_func.dimension
+    verify_snapshot(tmp_path / "snapshot")
+    with pytest.raises(ValueError):
+        manager.export_snapshot(collection, tmp_path / "compressed", pca_dimension=2, portable=True)
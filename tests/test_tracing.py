@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from conftest import FakeOpenAI
+
+from medical_advisor.advisor import Advisor
+from medical_advisor.tracing import tracer
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    exported = []
+    monkeypatch.setattr(tracer, "export", exported.append)
+    return exported
+
+
+def test_stream_span_covers_token_iteration(service_manager, spans):
+    advisor = Advisor("test", client=FakeOpenAI("Rest and fluids."), service_manager=service_manager)
+
+    with tracer.consultation() as consultation_id:
+        stream = advisor.get_treatment_plan_stream("cardiovascular", "standard")
+        assert "treatment_plan" not in [span.name for span in spans]
+        began = time.perf_counter()
+        for _ in stream:
+            time.sleep(0.01)
+        consumed_ms = (time.perf_counter() - began) * 1000
+
+    assert stream.result["treatment_plan"] == "Rest and fluids."
+    by_name = {span.name: span for span in spans}
+    plan = by_name["treatment_plan"]
+    assert plan.duration_ms >= consumed_ms
+    assert by_name["service_recommendations"].parent_id == plan.span_id
+    assert all(span.consultation_id == consultation_id for span in spans)
+    advisor.close()
+
+
+def test_cached_analysis_stream_still_ends_its_span(service_manager, spans):
+    advisor = Advisor("test", client=FakeOpenAI("Likely a tension headache."), service_manager=service_manager)
+    assert "".join(advisor.analyze_symptoms_stream("headache")) == "Likely a tension headache."
+    spans.clear()
+
+    stream = advisor.analyze_symptoms_stream("headache")
+    assert spans == []
+    assert "".join(stream) == "Likely a tension headache."
+
+    [span] = [span for span in spans if span.name == "analyze_symptoms"]
+    assert span.attributes["cached"] is True
+    assert span.consultation_id is not None
+    advisor.close()
+
+
+def test_spans_are_written_only_to_a_configured_file(tmp_path):
+    from medical_advisor.tracing import Tracer
+
+    silent = Tracer()
+    with silent.span("lookup"):
+        pass
+    assert silent.summary()["lookup"]["count"] == 1
+
+    path = tmp_path / "traces.jsonl"
+    sink = Tracer(path)
+    with sink.consultation(), sink.span("lookup", hit=True):
+        pass
+    sink.close()
+    [line] = path.read_text().splitlines()
+    assert '"name": "lookup"' in line
+
+
+def test_trace_file_is_opt_in(monkeypatch):
+    import importlib
+
+    from medical_advisor import config
+
+    monkeypatch.delenv("MEDICAL_ADVISOR_TRACE_PATH", raising=False)
+    assert importlib.reload(config).TRACE_PATH is None
+    monkeypatch.setenv("MEDICAL_ADVISOR_TRACE_PATH", "/tmp/traces.jsonl")
+    assert importlib.reload(config).TRACE_PATH == "/tmp/traces.jsonl"
+    monkeypatch.delenv("MEDICAL_ADVISOR_TRACE_PATH")
+    importlib.reload(config)
@@ -0,0 +1,186 @@
+import numpy as np
+import pytest
+
+from medical_advisor.compression import EmbeddingCodec
+from medical_advisor.vector_index import (
+    CURRENT_FILE, EMBEDDINGS_FILE, InMemoryServiceIndex, read_snapshot_info, snapshot_dir, write_snapshot
+)
+
+
+def random_catalog(rows=50, dimension=16, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(rows, dimension)).astype(np.float32)
+    ids = [f"service_{i}" for i in range(rows)]
+    metadatas = [{"code": f"C{i}", "price": float(i * 100), "department": "LAB" if i % 2 else "XRAY"}
+                 for i in range(rows)]
+    return ids, embeddings, metadatas
+
+
+def test_snapshot_round_trip_and_query(tmp_path):
+    ids, embeddings, metadatas = random_catalog()
+    write_snapshot(tmp_path, ids, embeddings, metadatas, {"catalog_version": "v1"})
+    index = InMemoryServiceIndex.from_snapshot(tmp_path)
+
+    result = index.query(query_embeddings=embeddings[:3], n_results=2)
+    assert [row[0] for row in result["ids"]] == ids[:3]
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+
+    filtered = index.query(query_embeddings=embeddings[:1], n_results=5, where={"department": "LAB"})
+    assert all(meta["department"] == "LAB" for meta in filtered["metadatas"][0])
+    assert index.metadata["catalog_version"] == "v1"
+
+
+def test_rewrite_leaves_mapped_snapshot_intact(tmp_path):
+    ids, embeddings, metadatas = random_catalog()
+    write_snapshot(tmp_path, ids, embeddings, metadatas, {"catalog_version": "v1"})
+    old = InMemoryServiceIndex.from_snapshot(tmp_path)
+    before = np.array(old.embeddings)
+
+    _, other, _ = random_catalog(seed=1)
+    write_snapshot(tmp_path, ids, other, metadatas, {"catalog_version": "v2"})
+
+    np.testing.assert_array_equal(np.asarray(old.embeddings), before)
+    assert read_snapshot_info(tmp_path)["catalog_version"] == "v2"
+    new = InMemoryServiceIndex.from_snapshot(tmp_path)
+    assert not np.allclose(np.asarray(new.embeddings), before)
+
+
+def test_only_the_previous_version_is_kept(tmp_path):
+    ids, embeddings, metadatas = random_catalog()
+    for version in range(4):
+        write_snapshot(tmp_path, ids, embeddings, metadatas, {"catalog_version": str(version)})
+
+    versions = [entry for entry in tmp_path.iterdir() if entry.is_dir()]
+    assert len(versions) == 2
+    assert snapshot_dir(tmp_path) in versions
+    assert (tmp_path / CURRENT_FILE).exists()
+
+
+def test_snapshot_written_before_versioning_is_readable_and_replaced(tmp_path):
+    ids, embeddings, metadatas = random_catalog()
+    write_snapshot(tmp_path, ids, embeddings, metadatas, {"catalog_version": "old"})
+    # Recreate the flat layout
+    version = snapshot_dir(tmp_path)
+    for entry in version.iterdir():
+        entry.rename(tmp_path / entry.name)
+    version.rmdir()
+    (tmp_path / CURRENT_FILE).unlink()
+    (tmp_path / "unrelated.txt").write_text("keep me")
+
+    assert read_snapshot_info(tmp_path)["catalog_version"] == "old"
+    write_snapshot(tmp_path, ids, embeddings, metadatas, {"catalog_version": "new"})
+    assert read_snapshot_info(tmp_path)["catalog_version"] == "new"
+    assert not (tmp_path / EMBEDDINGS_FILE).exists()
+    assert (tmp_path / "unrelated.txt").exists()
+
+
+@pytest.mark.parametrize("dtype,pca_dimension", [
+    ("float32", None), ("float16", None), ("int8", None), ("float32", 8), ("int8", 8)
+])
+def test_codec_round_trip_keeps_nearest_neighbours(tmp_path, dtype, pca_dimension):
+    ids, embeddings, metadatas = random_catalog(rows=200, dimension=32)
+    write_snapshot(tmp_path, ids, embeddings, metadatas, {}, codec=EmbeddingCodec(dtype, pca_dimension))
+    index = InMemoryServiceIndex.from_snapshot(tmp_path)
+
+    assert index.codec.info() == {"dtype": dtype, "pca_dimension": pca_dimension}
+    found = index.query(query_embeddings=embeddings[:20], n_results=1)["ids"]
+    hits = sum(row[0] == ids[i] for i, row in enumerate(found))
+    assert hits >= (20 if pca_dimension is None else 10)
+
+
+def test_expected_info_matches_codec_when_pca_does_not_reduce():
+    _, embeddings, _ = random_catalog(dimension=16)
+    for pca_dimension in (None, 16, 32, 8):
+        codec = EmbeddingCodec("float16", pca_dimension)
+        expected = codec.expected_info(16)
+        codec.fit_encode(embeddings)
+        assert codec.info() == expected
+
+
+def test_pca_is_clamped_to_a_small_catalog(tmp_path):
+    ids, embeddings, metadatas = random_catalog(rows=5, dimension=16)
+    codec = EmbeddingCodec("float32", 8)
+    expected = codec.expected_info(16, rows=5)
+
+    write_snapshot(tmp_path, ids, embeddings, metadatas, {}, codec=codec)
+    index = InMemoryServiceIndex.from_snapshot(tmp_path)
+
+    assert codec.info() == expected == {"dtype": "float32", "pca_dimension": 5}
+    assert read_snapshot_info(tmp_path)["compression"]["pca_dimension"] == 5
+    assert index.embeddings.shape == (5, 5)
+    assert index.query(query_embeddings=embeddings[:1], n_results=1)["ids"] == [[ids[0]]]
+
+
+@pytest.fixture
+def paired_indexes(tmp_path):
+    """The same catalog as a snapshot index and as a Chroma collection."""
+    import uuid
+
+    import chromadb
+
+    ids, embeddings, metadatas = random_catalog(rows=40)
+    documents = [f"Medical service: {meta['code']}" for meta in metadatas]
+    write_snapshot(tmp_path, ids, embeddings, metadatas, {}, documents=documents)
+    collection = chromadb.EphemeralClient().create_collection(
+        f"contract_{uuid.uuid4().hex[:8]}", metadata={"hnsw:space": "cosine"}
+    )
+    collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+    return InMemoryServiceIndex.from_snapshot(tmp_path), collection, embeddings
+
+
+@pytest.mark.parametrize("where", [
+    {"department": "LAB"},
+    {"department": {"$eq": "XRAY"}},
+    {"department": {"$ne": "LAB"}},
+    {"price": {"$gt": 1500.0}},
+    {"price": {"$gte": 1500.0}},
+    {"price": {"$lt": 800.0}},
+    {"price": {"$lte": 800.0}},
+    {"code": {"$in": ["C1", "C7", "C30"]}},
+    {"code": {"$nin": ["C1", "C7", "C30"]}},
+    {"$and": [{"department": "LAB"}, {"price": {"$lte": 2000.0}}]},
+    {"$or": [{"price": {"$lt": 300.0}}, {"code": "C39"}]},
+])
+def test_where_filters_match_chroma(paired_indexes, where):
+    index, collection, _ = paired_indexes
+
+    assert sorted(index.get(where=where)["ids"]) == sorted(collection.get(where=where)["ids"])
+
+
+def test_get_matches_chroma(paired_indexes):
+    index, collection, _ = paired_indexes
+    wanted = ["service_3", "service_12", "service_27"]
+
+    def by_id(result):
+        return sorted(zip(result["ids"], result["documents"], result["metadatas"]))
+
+    include = ["documents", "metadatas"]
+    assert by_id(index.get(ids=wanted, include=include)) == by_id(collection.get(ids=wanted, include=include))
+    pages = [index.get(include=[], limit=15, offset=offset)["ids"] for offset in (0, 15, 30)]
+    assert [len(page) for page in pages] == [15, 15, 10]
+    assert sorted(sum(pages, [])) == sorted(collection.get(include=[])["ids"])
+
+
+def test_query_matches_chroma(paired_indexes):
+    index, collection, embeddings = paired_indexes
+    include = ["documents", "metadatas", "distances"]
+    where = {"department": "LAB"}
+
+    ours = index.query(query_embeddings=embeddings[:4], n_results=3, where=where, include=include)
+    theirs = collection.query(query_embeddings=embeddings[:4], n_results=3, where=where, include=include)
+
+    assert ours["ids"] == theirs["ids"]
+    assert ours["documents"] == theirs["documents"]
+    assert ours["metadatas"] == theirs["metadatas"]
+    assert np.allclose(ours["distances"], theirs["distances"], atol=1e-4)
+
+
+def test_unsupported_include_is_rejected(tmp_path):
+    ids, embeddings, metadatas = random_catalog(rows=5)
+    write_snapshot(tmp_path, ids, embeddings, metadatas, {})
+    index = InMemoryServiceIndex.from_snapshot(tmp_path)
+
+    with pytest.raises(ValueError, match="not stored"):
+        index.get(include=["documents"])
+    with pytest.raises(ValueError, match="Unsupported include"):
+        index.query(query_embeddings=embeddings[:1], include=["uris"])